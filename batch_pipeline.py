@@ -0,0 +1,187 @@
+"""Run many local pipelines concurrently.
+
+This script reads a file of topics and pushes each one through the full
+local pipeline from `test_pipeline.py` on a pool of worker processes.  Every
+run executes in its own directory (`<output_root>/<run_id>/`), so its
+`outputs/` folder and log never collide with another run's.  When all runs
+have finished, per-run timings and aggregate throughput in videos per minute
+are printed and written to `<output_root>/batch_summary.json`.
+
+The topics file has one run per line, either just a topic or a run ID and a
+topic separated by a tab.  Blank lines and lines starting with `#` are
+ignored.  Runs without an explicit run ID are numbered `batch-0001`,
+`batch-0002` and so on.
+
+Usage:
+
+```bash
+python3 batch_pipeline.py topics.txt --concurrency 4 --output_root batch_outputs
+```
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+import test_pipeline
+
+
+def read_topics(path: str) -> List[Tuple[str, str]]:
+    """Parse a topics file into `(run_id, topic)` pairs.
+
+    Raises:
+        ValueError: If a run ID appears more than once or is not a plain
+            directory name.
+    """
+    runs: List[Tuple[str, str]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "\t" in line:
+                run_id, topic = (part.strip() for part in line.split("\t", 1))
+            else:
+                run_id, topic = f"batch-{len(runs) + 1:04d}", line
+            runs.append((run_id, topic))
+    separators = {"/", os.sep, os.altsep} - {None}
+    seen = set()
+    for run_id, _ in runs:
+        if not run_id or run_id in (".", "..") or any(sep in run_id for sep in separators):
+            raise ValueError(f"Invalid run ID in {path}: {run_id!r}")
+        if run_id in seen:
+            raise ValueError(f"Duplicate run ID in {path}: {run_id}")
+        seen.add(run_id)
+    return runs
+
+
+def _run_one(run_id: str, topic: str, output_root: str, handoff: str) -> Dict:
+    """Run one pipeline inside its own directory and report how it went.
+
+    Executed in a worker process; the working directory change only affects
+    that process, and the pipeline's console output goes to the run's log.
+    """
+    run_dir = os.path.abspath(os.path.join(output_root, run_id))
+    os.makedirs(run_dir, exist_ok=True)
+    previous_dir = os.getcwd()
+    start = time.perf_counter()
+    result = {"run_id": run_id, "topic": topic, "run_dir": run_dir}
+    try:
+        os.chdir(run_dir)
+        with open("pipeline.log", "w", encoding="utf-8") as log, contextlib.redirect_stdout(log):
+            timings = test_pipeline.main(topic, run_id, handoff)
+        result.update(status="succeeded", timings=timings)
+    except Exception as e:  # noqa: BLE001 - one failed run must not stop the batch
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    finally:
+        os.chdir(previous_dir)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(
+    runs: List[Tuple[str, str]],
+    concurrency: int,
+    output_root: str,
+    handoff: str = "files",
+) -> Dict:
+    """Run every `(run_id, topic)` pair with at most `concurrency` at once.
+
+    Returns:
+        A summary with a `runs` list (in input order) and aggregate figures.
+    """
+    os.makedirs(output_root, exist_ok=True)
+    results: Dict[str, Dict] = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=concurrency) as pool:
+        futures = {
+            pool.submit(_run_one, run_id, topic, output_root, handoff): run_id
+            for run_id, topic in runs
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results[result["run_id"]] = result
+            print(f"[{result['status']:>9}] {result['run_id']} in {result['seconds']:.2f} s")
+    wall_seconds = time.perf_counter() - start
+
+    ordered = [results[run_id] for run_id, _ in runs]
+    succeeded = [r for r in ordered if r["status"] == "succeeded"]
+    busy_seconds = sum(r["seconds"] for r in ordered)
+    return {
+        "concurrency": concurrency,
+        "handoff": handoff,
+        "runs": ordered,
+        "succeeded": len(succeeded),
+        "failed": len(ordered) - len(succeeded),
+        "wall_seconds": wall_seconds,
+        "videos_per_minute": len(succeeded) * 60.0 / wall_seconds if wall_seconds else 0.0,
+        # Throughput a single worker would reach back to back, for comparison.
+        "serial_videos_per_minute": len(succeeded) * 60.0 / busy_seconds if busy_seconds else 0.0,
+    }
+
+
+def print_summary(summary: Dict) -> None:
+    """Print a per-run table followed by the aggregate throughput."""
+    print(f"\n{'run_id':<20}{'status':<11}{'seconds':>9}{'videos/min':>12}")
+    for r in summary["runs"]:
+        per_minute = 60.0 / r["seconds"] if r["status"] == "succeeded" and r["seconds"] else 0.0
+        print(f"{r['run_id']:<20}{r['status']:<11}{r['seconds']:>9.2f}{per_minute:>12.2f}")
+        if r["status"] == "failed":
+            print(f"{'':<20}{r['error']}")
+    print(
+        f"\n{summary['succeeded']} succeeded, {summary['failed']} failed in "
+        f"{summary['wall_seconds']:.2f} s at concurrency {summary['concurrency']}: "
+        f"{summary['videos_per_minute']:.2f} videos/min "
+        f"(serial equivalent {summary['serial_videos_per_minute']:.2f})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run many black news pipelines concurrently.")
+    parser.add_argument("topics_file", help="File with one topic (or run_id<TAB>topic) per line")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Maximum number of pipelines running at once (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--output_root",
+        default="batch_outputs",
+        help="Directory that receives one sub-directory per run (default: batch_outputs)",
+    )
+    parser.add_argument(
+        "--handoff",
+        choices=("files", "memory", "store", "manifest"),
+        default="files",
+        help="Frame handoff mode passed to each pipeline (see test_pipeline.py)",
+    )
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    try:
+        runs = read_topics(args.topics_file)
+    except ValueError as e:
+        parser.error(str(e))
+    if not runs:
+        print(f"No topics found in {args.topics_file}", file=sys.stderr)
+        sys.exit(1)
+
+    summary = run_batch(runs, args.concurrency, args.output_root, args.handoff)
+    print_summary(summary)
+    summary_path = os.path.join(args.output_root, "batch_summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Summary written to {summary_path}")
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
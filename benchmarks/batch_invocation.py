@@ -0,0 +1,102 @@
+"""Per-job invocations against one batch invocation of a handler.
+
+A burst of jobs sent one request each can land on fresh instances, each of
+which imports the handler, warms it up and opens its clients before doing
+any work.  `handle_batch` pays that once for all its jobs.  This script
+imitates both with fresh interpreters:
+
+* `single`: one interpreter per job, each calling `handle` once,
+* `batch`: one interpreter calling `handle_batch` with every job.
+
+Each job is a short synthetic script given to the chosen handler as a
+script index.  Runs happen in a temporary directory.
+
+Usage:
+
+```bash
+python3 benchmarks/batch_invocation.py --handler media_sourcing --jobs 16
+```
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+from functions.common.script_index import ScriptIndex  # noqa: E402
+
+HANDLERS = ["media_sourcing", "narrator"]
+
+_CALL = """
+import json, sys
+sys.path.insert(0, {root!r})
+import functions.{handler}.main as handler
+payload = json.load(sys.stdin)
+response = getattr(handler, {entry!r})(payload)
+failed = response.get("failed", 1 if "error" in response else 0)
+sys.exit(1 if failed else 0)
+"""
+
+
+def build_jobs(handler: str, n_jobs: int, sentences: int) -> List[Dict]:
+    """Return `n_jobs` payloads for `handler`, each with its own run ID."""
+    jobs = []
+    for i in range(n_jobs):
+        text = " ".join(f"Story {i} sentence {j} for the batch benchmark." for j in range(sentences))
+        index = ScriptIndex.from_text(text, script_uri=f"outputs/job{i}_script.txt").to_dict()
+        job = {"script_index": index, "gcs_bucket": "local"}
+        if handler == "narrator":
+            job["run_id"] = f"job{i}"
+        jobs.append(job)
+    return jobs
+
+
+def _invoke(handler: str, entry: str, payload: Dict, workdir: str) -> None:
+    subprocess.run(
+        [sys.executable, "-c", _CALL.format(root=REPO_ROOT, handler=handler, entry=entry)],
+        input=json.dumps(payload),
+        text=True,
+        cwd=workdir,
+        check=True,
+    )
+
+
+def run(handler: str, n_jobs: int, sentences: int) -> Dict[str, float]:
+    """Time `n_jobs` jobs sent one per interpreter and as one batch."""
+    jobs = build_jobs(handler, n_jobs, sentences)
+    timings = {}
+    with tempfile.TemporaryDirectory(prefix="batch_bench_") as workdir:
+        start = time.perf_counter()
+        for job in jobs:
+            _invoke(handler, "handle", job, workdir)
+        timings["single"] = time.perf_counter() - start
+        start = time.perf_counter()
+        _invoke(handler, "handle_batch", {"jobs": jobs}, workdir)
+        timings["batch"] = time.perf_counter() - start
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-job and batch invocations of a handler.")
+    parser.add_argument("--handler", choices=HANDLERS, default="media_sourcing", help="Handler to invoke")
+    parser.add_argument("--jobs", type=int, default=16, help="Number of jobs (default: 16)")
+    parser.add_argument("--sentences", type=int, default=3, help="Sentences per job (default: 3)")
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    timings = run(args.handler, args.jobs, args.sentences)
+    for mode, seconds in timings.items():
+        print(f"{mode:<7}{seconds:>9.3f} s{seconds / args.jobs * 1000:>10.1f} ms/job")
+    print(f"batch speed-up x{timings['single'] / timings['batch']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
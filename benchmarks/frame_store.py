@@ -0,0 +1,98 @@
+"""PNG frames against a memory-mapped frame store.
+
+Renders the same synthetic sentences through media sourcing both ways and
+then reads them back the way video assembly does:
+
+* `png`: one `frame_<n>.png` per sentence, each decoded with `cv2.imread`,
+* `store`: one frame store file, each frame read as a view of the mapping.
+
+Every frame read is checked against the rendered one, so both consumers
+touch all of its pixels.  Runs happen in a temporary directory; the script
+reports write and read times, the number of files and their total size.
+
+Usage:
+
+```bash
+python3 benchmarks/frame_store.py --frames 500
+```
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+from functions.common.frame_store import FrameStore  # noqa: E402
+from functions.media_sourcing import main as media_sourcing  # noqa: E402
+
+_WORDS = (
+    "community leaders report new funding for local schools while health workers expand clinics "
+    "across the region and families share stories of progress resilience and hope in 2024"
+).split()
+
+
+def sentences(n: int) -> List[str]:
+    """Return `n` distinct news-like sentences."""
+    return [f"{i}: " + " ".join(_WORDS[(i + j) % len(_WORDS)] for j in range(8 + i % 24)) + "." for i in range(n)]
+
+
+def run(texts: List[str], workdir: str) -> Dict[str, Dict[str, float]]:
+    """Write and read back `texts` as PNG files and as a frame store."""
+    import cv2  # type: ignore
+    import numpy as np  # type: ignore
+
+    media_sourcing._init_worker()
+    reference = [media_sourcing._draw_frame_array(text) for text in texts]
+    results: Dict[str, Dict[str, float]] = {}
+
+    png_dir = os.path.join(workdir, "media")
+    jobs = [(text, os.path.join(png_dir, f"frame_{i}.png")) for i, text in enumerate(texts, start=1)]
+    start = time.perf_counter()
+    paths = media_sourcing._render_frames(jobs)
+    write = time.perf_counter() - start
+    start = time.perf_counter()
+    for path, expected in zip(paths, reference):
+        if not np.array_equal(cv2.imread(path), expected):
+            raise AssertionError(f"{path} differs from the rendered frame")
+    read = time.perf_counter() - start
+    results["png"] = {"write": write, "read": read, "files": len(paths), "bytes": sum(map(os.path.getsize, paths))}
+
+    store_path = os.path.join(workdir, "bench_frames.bnf")
+    start = time.perf_counter()
+    media_sourcing._render_store(texts, store_path)
+    write = time.perf_counter() - start
+    start = time.perf_counter()
+    store = FrameStore(store_path)
+    for index, (frame, expected) in enumerate(zip(store, reference)):
+        if not np.array_equal(frame, expected):
+            raise AssertionError(f"Frame {index} of the store differs from the rendered frame")
+    read = time.perf_counter() - start
+    results["store"] = {"write": write, "read": read, "files": 1, "bytes": os.path.getsize(store_path)}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare PNG frame files with a memory-mapped frame store.")
+    parser.add_argument("--frames", type=int, default=500, help="Frames to write and read (default: 500)")
+    args = parser.parse_args()
+    if args.frames < 1:
+        parser.error("--frames must be at least 1")
+
+    with tempfile.TemporaryDirectory(prefix="frame_store_bench_") as workdir:
+        results = run(sentences(args.frames), workdir)
+    for mode, r in results.items():
+        print(
+            f"{mode:<6} write {r['write']:8.3f} s  read {r['read']:8.3f} s  "
+            f"{r['files']:>6} files  {r['bytes'] / (1024 * 1024):9.1f} MiB"
+        )
+    png, store = results["png"], results["store"]
+    print(f"store speed-up: write x{png['write'] / store['write']:.1f}, read x{png['read'] / store['read']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Import-time report and budget check for the Cloud Function handlers.
+
+Cold starts pay for everything a handler imports at module load.  This
+script imports each `functions/*/main.py` in a fresh interpreter with
+`python -X importtime` and reports:
+
+* the handler's cumulative import time (median of `--repeat` runs),
+* its most expensive imports,
+* any heavy library (OpenCV, Pillow, NumPy, the Google Cloud client
+  libraries and `requests`) loaded at import, which should be deferred to
+  first use,
+* with `--warm-up`, how long the handler's `warm_up()` hook takes.
+
+The script exits with status 1 if a handler imports more slowly than its
+budget in `IMPORT_BUDGET_MS` (or `--budget-ms`) or loads a heavy library at
+import, so it can gate CI.
+
+Usage:
+
+```bash
+python3 benchmarks/import_times.py
+python3 benchmarks/import_times.py --warm-up --repeat 9 --output imports.json
+```
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HANDLERS = ["scriptwriter", "media_sourcing", "narrator", "video_assembly", "uploader"]
+# Cumulative import time allowed per handler, in milliseconds.  Each handler
+# only needs the standard library and functions/common at import, which
+# takes around 20 ms on a typical machine, so these leave ample headroom
+# while still catching a native library slipping back to module level.
+IMPORT_BUDGET_MS = {name: 75.0 for name in HANDLERS}
+# Modules that must only be imported on first use.
+HEAVY_MODULES = ["cv2", "PIL", "numpy", "google.cloud", "google.auth", "requests"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import functions.{handler}.main as handler
+import_seconds = time.perf_counter() - start
+result = {{"loaded_heavy": [m for m in {heavy!r} if m in sys.modules], "wall_ms": import_seconds * 1000}}
+if {warm_up!r} and hasattr(handler, "warm_up"):
+    start = time.perf_counter()
+    handler.warm_up()
+    result["warm_up_ms"] = (time.perf_counter() - start) * 1000
+print(json.dumps(result))
+"""
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, float]]:
+    """Parse `-X importtime` output into `(module, depth, cumulative_ms)`."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(cumulative) / 1000))
+    return rows
+
+
+def probe(handler: str, warm_up: bool = False) -> Dict:
+    """Import one handler in a fresh interpreter and measure it."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(handler=handler, heavy=HEAVY_MODULES, warm_up=warm_up)],
+        cwd=REPO_ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+        # Measure a cold import, not one that warms up on load.
+        env={k: v for k, v in os.environ.items() if k != "WARM_UP_ON_LOAD"},
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    rows = _parse_importtime(completed.stderr)
+    module = f"functions.{handler}.main"
+    handler_depth = next(depth for name, depth, _ in rows if name == module)
+    result["import_ms"] = next(ms for name, _, ms in rows if name == module)
+    # Direct imports of the handler module are the rows one level deeper
+    # that precede it in the output.
+    index = next(i for i, (name, _, _) in enumerate(rows) if name == module)
+    children = []
+    for name, depth, ms in reversed(rows[:index]):
+        if depth <= handler_depth:
+            break
+        if depth == handler_depth + 1:
+            children.append((name, ms))
+    result["top_imports"] = sorted(children, key=lambda item: -item[1])[:5]
+    return result
+
+
+def measure(handlers: List[str], repeat: int, warm_up: bool) -> Dict[str, Dict]:
+    """Probe every handler `repeat` times and keep the median figures."""
+    report = {}
+    for handler in handlers:
+        runs = [probe(handler, warm_up) for _ in range(repeat)]
+        median_run = sorted(runs, key=lambda r: r["import_ms"])[len(runs) // 2]
+        entry = {
+            "import_ms": statistics.median(r["import_ms"] for r in runs),
+            "top_imports": median_run["top_imports"],
+            "loaded_heavy": sorted({m for r in runs for m in r["loaded_heavy"]}),
+        }
+        if warm_up and "warm_up_ms" in runs[0]:
+            entry["warm_up_ms"] = statistics.median(r["warm_up_ms"] for r in runs)
+        report[handler] = entry
+    return report
+
+
+def check(report: Dict[str, Dict], budget_ms: Optional[float] = None) -> List[str]:
+    """Return a description of every budget violation in `report`."""
+    failures = []
+    for handler, entry in report.items():
+        budget = budget_ms if budget_ms is not None else IMPORT_BUDGET_MS.get(handler, 75.0)
+        if entry["import_ms"] > budget:
+            failures.append(f"{handler}: import took {entry['import_ms']:.1f} ms, budget {budget:.1f} ms")
+        if entry["loaded_heavy"]:
+            failures.append(f"{handler}: imports {', '.join(entry['loaded_heavy'])} at module load")
+    return failures
+
+
+def print_report(report: Dict[str, Dict]) -> None:
+    print(f"{'handler':<16}{'import':>10}{'warm_up':>10}  heaviest imports")
+    for handler, entry in report.items():
+        warm = f"{entry['warm_up_ms']:.1f} ms" if "warm_up_ms" in entry else "-"
+        top = ", ".join(f"{name} {ms:.1f}" for name, ms in entry["top_imports"][:3])
+        print(f"{handler:<16}{entry['import_ms']:>7.1f} ms{warm:>10}  {top}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report and check the import time of each handler.")
+    parser.add_argument("--handlers", nargs="+", choices=HANDLERS, default=HANDLERS, help="Handlers to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per handler (default: 5)")
+    parser.add_argument("--warm-up", action="store_true", help="Also time each handler's warm_up() hook")
+    parser.add_argument("--budget-ms", type=float, help="Import budget for every handler, overriding the defaults")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    report = measure(args.handlers, args.repeat, args.warm_up)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failures = check(report, args.budget_ms)
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+    if failures:
+        sys.exit(1)
+    print("All handlers within their import budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Micro-benchmark: text measurement calls per frame in media_sourcing.
+
+Compares the original word-wrap loop from `_create_image`, which measures
+the growing line for every word and each finished line twice more, with the
+cached `TextLayout` from `functions/media_sourcing/layout.py`.  Both are run
+over the same synthetic sentences and the number of measurement calls and
+the time per frame are reported.
+
+Usage:
+
+```bash
+python3 benchmarks/layout_measurements.py --frames 200 --words 40
+```
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import warnings
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+from functions.media_sourcing.layout import TextLayout, _text_size
+
+WIDTH, HEIGHT = 1280, 720
+
+VOCABULARY = (
+    "community news update report local leaders policy education health "
+    "economy culture history voters council families students business "
+    "housing justice reform support latest stories impacting worldwide"
+).split()
+
+
+class CountingDraw:
+    """Wraps an `ImageDraw` and counts `textsize` calls."""
+
+    def __init__(self, draw):
+        self._draw = draw
+        self.calls = 0
+
+    def textsize(self, text, font=None):
+        self.calls += 1
+        return _text_size(self._draw, text, font)
+
+
+def legacy_layout(draw, text: str, font):
+    """The wrap-and-centre logic `_create_image` used before `TextLayout`."""
+    max_width = WIDTH - 100
+    lines = []
+    current_line = ""
+    for word in text.split():
+        test_line = f"{current_line} {word}".strip()
+        w, _ = draw.textsize(test_line, font=font)
+        if w <= max_width:
+            current_line = test_line
+        else:
+            lines.append(current_line)
+            current_line = word
+    if current_line:
+        lines.append(current_line)
+    total_height = sum(draw.textsize(line, font=font)[1] + 10 for line in lines)
+    y = (HEIGHT - total_height) // 2
+    boxes = []
+    for line in lines:
+        w, h = draw.textsize(line, font=font)
+        boxes.append((line, (WIDTH - w) // 2, y))
+        y += h + 10
+    return boxes
+
+
+def make_sentences(frames: int, words: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(VOCABULARY) for _ in range(words)) for _ in range(frames)]
+
+
+def run(frames: int, words: int) -> None:
+    font = ImageFont.load_default()
+    sentences = make_sentences(frames, words)
+    draw = CountingDraw(ImageDraw.Draw(Image.new("RGB", (1, 1))))
+
+    start = time.perf_counter()
+    legacy = [legacy_layout(draw, s, font) for s in sentences]
+    legacy_time = time.perf_counter() - start
+    legacy_calls = draw.calls
+
+    layout = TextLayout(font)
+    start = time.perf_counter()
+    first = layout.layout(sentences[0], (WIDTH, HEIGHT))
+    first_calls = layout.measure_calls
+    cached = [first] + [layout.layout(s, (WIDTH, HEIGHT)) for s in sentences[1:]]
+    cached_time = time.perf_counter() - start
+
+    mismatches = sum(
+        1
+        for old, new in zip(legacy, cached)
+        if old != [(box.text, box.x, box.y) for box in new]
+    )
+
+    print(f"{frames} frames, {words} words per sentence")
+    print(f"{'':<18}{'calls/frame':>12}{'first frame':>13}{'us/frame':>10}")
+    print(
+        f"{'legacy wrap':<18}{legacy_calls / frames:>12.1f}"
+        f"{legacy_calls / frames:>13.0f}{legacy_time / frames * 1e6:>10.1f}"
+    )
+    print(
+        f"{'cached layout':<18}{layout.measure_calls / frames:>12.2f}"
+        f"{first_calls:>13d}{cached_time / frames * 1e6:>10.1f}"
+    )
+    print(f"layout mismatches: {mismatches}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Count text measurement calls per frame.")
+    parser.add_argument("--frames", type=int, default=200, help="Number of synthetic frames")
+    parser.add_argument("--words", type=int, default=40, help="Words per sentence")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", DeprecationWarning)
+    run(args.frames, args.words)
+
+
+if __name__ == "__main__":
+    main()
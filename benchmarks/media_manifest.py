@@ -0,0 +1,93 @@
+"""Inline `media_uris` against a media manifest in the workflow handoff.
+
+For each frame count, builds the media sourcing response and the video
+assembly request `workflow.yaml` sends in both forms:
+
+* `inline`: every frame URI in `media_uris`,
+* `manifest`: the `media_manifest_uri` and `frame_count` of a media manifest
+  listing them.
+
+It reports the size of each JSON body, the two of which the workflow also
+writes to its log, and the peak memory the consumer needs to read every URI:
+decoding the inline list against streaming the manifest's entries.
+
+Usage:
+
+```bash
+python3 benchmarks/media_manifest.py --frames 100 1000 10000
+```
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+from functions.common.media_manifest import iter_media_manifest, write_media_manifest  # noqa: E402
+
+_BUCKET = "gs://carbon-broker-466711-d0-media"
+_RUN_ID = "0b5c1c9e-6f0a-4d5e-9a7b-3f1f2d8e4c21"
+
+
+def _peak_bytes(read) -> int:
+    tracemalloc.start()
+    try:
+        read()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(frames: int, workdir: str) -> Dict[str, Dict[str, int]]:
+    """Measure both handoff forms for a run of `frames` frames."""
+    uris = [f"{_BUCKET}/{_RUN_ID}_media/frame_{i}.png" for i in range(1, frames + 1)]
+    manifest_path = os.path.join(workdir, f"{_RUN_ID}_media_manifest.txt")
+    write_media_manifest(manifest_path, uris)
+    manifest_uri = f"{_BUCKET}/{_RUN_ID}_media_manifest.txt"
+    assembly = {"narration_uri": f"{_BUCKET}/{_RUN_ID}_narration.wav", "gcs_bucket": _BUCKET}
+
+    inline_response = json.dumps({"media_uris": uris})
+    manifest_response = json.dumps({"media_manifest_uri": manifest_uri, "frame_count": frames})
+
+    def consume(entries) -> None:
+        for _ in entries:
+            pass
+
+    return {
+        "inline": {
+            "response": len(inline_response),
+            "request": len(json.dumps({**assembly, "media_uris": uris})),
+            "peak": _peak_bytes(lambda: consume(json.loads(inline_response)["media_uris"])),
+        },
+        "manifest": {
+            "response": len(manifest_response),
+            "request": len(json.dumps({**assembly, "media_manifest_uri": manifest_uri})),
+            "peak": _peak_bytes(lambda: consume(iter_media_manifest(manifest_path))),
+            "file": os.path.getsize(manifest_path),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare inline media_uris with a media manifest.")
+    parser.add_argument(
+        "--frames", type=int, nargs="+", default=[100, 1000, 10000], help="Frame counts (default: 100 1000 10000)"
+    )
+    args = parser.parse_args()
+
+    print(f"{'frames':>7}  {'form':<9}{'response':>11}{'request':>11}{'read peak':>12}{'file':>11}")
+    with tempfile.TemporaryDirectory(prefix="media_manifest_bench_") as workdir:
+        for frames in args.frames:
+            for form, r in run(frames, workdir).items():
+                file_size = f"{r['file']:>11,}" if "file" in r else f"{'-':>11}"
+                print(f"{frames:>7}  {form:<9}{r['response']:>11,}{r['request']:>11,}{r['peak']:>12,}{file_size}")
+
+
+if __name__ == "__main__":
+    main()
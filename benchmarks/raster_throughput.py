@@ -0,0 +1,119 @@
+"""Frame rasterisation throughput: glyph atlas against Pillow.
+
+Renders the same synthetic sentences with both media sourcing rasterisers
+and reports frames per second for each, plus how far the atlas frames are
+from Pillow's:
+
+* `pil`: `_draw_frame` (canvas copy and `ImageDraw.text` per line) and a
+  conversion to a BGR array,
+* `atlas`: `FrameRasteriser.render` straight into a BGR array.
+
+Only rasterisation is timed; PNG encoding costs the same for both.  By
+default the frames use media sourcing's font; pass `--font` and
+`--font-size` to measure a TrueType font instead.  The script exits with
+status 1 if any pixel differs by more than `--tolerance`.
+
+Usage:
+
+```bash
+python3 benchmarks/raster_throughput.py --frames 500
+python3 benchmarks/raster_throughput.py --font /path/to/font.ttf --font-size 40
+```
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+from functions.media_sourcing import main as media_sourcing  # noqa: E402
+from functions.media_sourcing.layout import get_layout  # noqa: E402
+from functions.media_sourcing.raster import FrameRasteriser  # noqa: E402
+
+_WORDS = (
+    "community leaders report new funding for local schools while health workers expand clinics "
+    "across the region and families share stories of progress resilience and hope in 2024"
+).split()
+
+
+def sentences(n: int, seed: int = 0) -> List[str]:
+    """Return `n` news-like sentences of 8 to 40 words."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 40))).capitalize() + "." for _ in range(n)]
+
+
+def run(texts: List[str], font) -> Dict:
+    """Render every text with both rasterisers and compare the frames."""
+    import numpy as np  # type: ignore
+    from PIL import Image
+
+    size = media_sourcing.FRAME_SIZE
+    layout = get_layout(font)
+    atlas = FrameRasteriser(font, size, media_sourcing.TEXT_COLOR, media_sourcing.BACKGROUND_COLOR)
+    canvas = Image.new("RGB", size, color=media_sourcing.BACKGROUND_COLOR)
+    # One untimed pass fills the layout cache and the atlas for both.
+    for text in texts:
+        atlas.render(layout.layout(text, size))
+
+    def pil(text):
+        return media_sourcing._to_bgr_array(media_sourcing._draw_frame(text, font=font, canvas=canvas))
+
+    start = time.perf_counter()
+    for text in texts:
+        pil(text)
+    pil_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for text in texts:
+        atlas.render(layout.layout(text, size))
+    atlas_seconds = time.perf_counter() - start
+
+    max_diff = differing = 0
+    for text in texts:
+        diff = np.abs(pil(text).astype(np.int16) - atlas.render(layout.layout(text, size)).astype(np.int16))
+        max_diff = max(max_diff, int(diff.max()))
+        differing += int((diff.max(axis=2) > 0).sum())
+    return {
+        "frames": len(texts),
+        "pil_fps": len(texts) / pil_seconds,
+        "atlas_fps": len(texts) / atlas_seconds,
+        "max_pixel_diff": max_diff,
+        "differing_pixels_per_frame": differing / len(texts),
+        "exact": atlas.exact,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare glyph-atlas and Pillow frame rasterisation.")
+    parser.add_argument("--frames", type=int, default=500, help="Frames to render with each rasteriser (default: 500)")
+    parser.add_argument("--font", help="TrueType font file; defaults to media sourcing's font")
+    parser.add_argument("--font-size", type=int, default=40, help="Size of --font in pixels (default: 40)")
+    parser.add_argument("--tolerance", type=int, default=0, help="Largest allowed per-channel difference (default: 0)")
+    args = parser.parse_args()
+
+    if args.font:
+        from PIL import ImageFont
+
+        font = ImageFont.truetype(args.font, args.font_size)
+    else:
+        media_sourcing._init_worker()
+        font = media_sourcing._worker_font
+    result = run(sentences(args.frames), font)
+    print(f"pil    {result['pil_fps']:9.1f} frames/s")
+    print(f"atlas  {result['atlas_fps']:9.1f} frames/s  (x{result['atlas_fps'] / result['pil_fps']:.1f})")
+    print(
+        f"max pixel difference {result['max_pixel_diff']}, "
+        f"{result['differing_pixels_per_frame']:.1f} differing pixels per frame"
+        f"{' (bitmap font: identical by construction)' if result['exact'] else ''}"
+    )
+    if result["max_pixel_diff"] > args.tolerance:
+        print(f"Difference exceeds the tolerance of {args.tolerance}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Per-stage benchmark suite with scaling curves.
+
+Drives every `functions/*/main.py:handle` and the full `test_pipeline.main`
+over synthetic scripts of increasing length (3, 100, 1,000 and 5,000
+sentences by default) and records:
+
+* wall time for every case,
+* frames per second for media sourcing and video assembly,
+* seconds of audio written per second for the narrator,
+* peak resident set size.
+
+Each case runs in a fresh subprocess inside its own temporary directory, so
+peak RSS is measured per case and outputs never interfere.  Inputs a stage
+needs (for example the frames video assembly consumes) are prepared by a
+separate, untimed subprocess first.
+
+Results are written to a JSON file.  Pass `--baseline` with an earlier
+results file to compare against it; any case whose wall time or peak RSS
+grew by more than `--threshold` (a fraction, 0.10 = 10%), and by more than a
+small absolute floor, is flagged as a regression and the script exits with
+status 1.
+
+Usage:
+
+```bash
+python3 benchmarks/run_benchmarks.py --output bench.json
+python3 benchmarks/run_benchmarks.py --sizes 3 100 --baseline bench.json --threshold 0.15
+```
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+DEFAULT_SIZES = [3, 100, 1000, 5000]
+CASES = ["scriptwriter", "media_sourcing", "narrator", "video_assembly", "uploader", "pipeline"]
+# Metrics compared against the baseline (larger is worse for both) and the
+# smallest absolute change that counts, so timer noise on tiny cases is not
+# reported as a regression.
+COMPARED_METRICS = {"wall_seconds": 0.05, "peak_rss_mb": 5.0}
+RUN_ID = "bench"
+
+VOCABULARY = (
+    "community news update report local leaders policy education health "
+    "economy culture history voters council families students business "
+    "housing justice reform support latest stories impacting worldwide"
+).split()
+
+
+def synthetic_script(sentences: int, seed: int = 0) -> str:
+    """Build a script of `sentences` sentences of 8-20 words each."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(sentences):
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(8, 20))]
+        lines.append(" ".join(words).capitalize() + ".")
+    return "\n".join(lines)
+
+
+def _script_path() -> str:
+    return os.path.join("outputs", f"{RUN_ID}_script.txt")
+
+
+def _write_script(sentences: int) -> str:
+    path = _script_path()
+    os.makedirs("outputs", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(synthetic_script(sentences))
+    return path
+
+
+def _peak_rss_mb() -> float:
+    """Peak RSS of this process or any of its waited-for children, in MiB."""
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _prepare(case: str, sentences: int) -> None:
+    """Create the inputs `case` needs in the current directory (untimed)."""
+    if case == "scriptwriter":
+        return
+    script_path = _write_script(sentences)
+    if case in ("video_assembly", "uploader"):
+        from functions.media_sourcing.main import handle as media_sourcing_handle
+
+        media = media_sourcing_handle({"script": script_path, "gcs_bucket": "local"})
+        with open("media.json", "w", encoding="utf-8") as f:
+            json.dump(media, f)
+    if case == "uploader":
+        from functions.video_assembly.main import handle as video_assembly_handle
+
+        with open("media.json", "r", encoding="utf-8") as f:
+            media = json.load(f)
+        video_assembly_handle({"media_uris": media["media_uris"]})
+
+
+def _run_case(case: str, sentences: int) -> Dict:
+    """Run one timed case in the current directory and return its metrics."""
+    metrics: Dict = {}
+    script_path = _script_path()
+    if case == "scriptwriter":
+        from functions.scriptwriter.main import handle
+
+        start = time.perf_counter()
+        handle({"topic": "benchmark", "bucket": "local", "run_id": RUN_ID})
+        metrics["wall_seconds"] = time.perf_counter() - start
+    elif case == "media_sourcing":
+        from functions.media_sourcing.main import handle
+
+        start = time.perf_counter()
+        response = handle({"script": script_path, "gcs_bucket": "local"})
+        elapsed = time.perf_counter() - start
+        frames = len(response["media_uris"])
+        metrics.update(wall_seconds=elapsed, frames=frames, frames_per_second=frames / elapsed)
+    elif case == "narrator":
+        from functions.narrator.main import handle
+
+        start = time.perf_counter()
+        response = handle({"script_content": script_path, "gcs_bucket": "local", "run_id": RUN_ID})
+        elapsed = time.perf_counter() - start
+        audio = response["duration_sec"]
+        metrics.update(
+            wall_seconds=elapsed,
+            audio_seconds=audio,
+            audio_seconds_per_second=audio / elapsed,
+        )
+    elif case == "video_assembly":
+        from functions.video_assembly.main import handle
+
+        with open("media.json", "r", encoding="utf-8") as f:
+            media_uris = json.load(f)["media_uris"]
+        start = time.perf_counter()
+        handle({"media_uris": media_uris})
+        elapsed = time.perf_counter() - start
+        frames = len(media_uris)
+        metrics.update(wall_seconds=elapsed, frames=frames, frames_per_second=frames / elapsed)
+    elif case == "uploader":
+        from functions.uploader.main import handle
+
+        start = time.perf_counter()
+        handle({"final_uri": os.path.join("outputs", f"{RUN_ID}_final.mp4"), "script_content": script_path, "run_id": RUN_ID})
+        metrics["wall_seconds"] = time.perf_counter() - start
+    elif case == "pipeline":
+        import contextlib
+        import io
+
+        import test_pipeline
+
+        scriptwriter = test_pipeline.scriptwriter_handle
+
+        def synthetic_scriptwriter(request):
+            # Run the real scriptwriter, then swap in the synthetic script
+            # and its index, which is what the later stages read.
+            from functions.common.script_index import ScriptIndex
+
+            response = scriptwriter(request)
+            path = _write_script(sentences)
+            with open(path, "r", encoding="utf-8") as f:
+                index = ScriptIndex.from_text(f.read(), script_uri=response["script_uri"]).to_dict()
+            with open(response["script_index_uri"], "w", encoding="utf-8") as f:
+                json.dump(index, f, separators=(",", ":"))
+            return {**response, "script_index": index}
+
+        test_pipeline.scriptwriter_handle = synthetic_scriptwriter
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings = test_pipeline.main("benchmark", RUN_ID, incremental=False)
+        metrics["wall_seconds"] = time.perf_counter() - start
+        metrics["stage_seconds"] = timings
+    else:
+        raise ValueError(f"Unknown benchmark case: {case}")
+    metrics["peak_rss_mb"] = _peak_rss_mb()
+    return metrics
+
+
+def _subprocess(mode: str, case: str, sentences: int, workdir: str) -> str:
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), mode, case, str(sentences)],
+        cwd=workdir,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return completed.stdout
+
+
+def run_suite(sizes: List[int], cases: List[str]) -> Dict:
+    """Run every case at every size and collect the results."""
+    results = []
+    for sentences in sizes:
+        for case in cases:
+            with tempfile.TemporaryDirectory(prefix=f"bench_{case}_") as workdir:
+                _subprocess("--_prepare", case, sentences, workdir)
+                output = _subprocess("--_case", case, sentences, workdir)
+            metrics = json.loads(output.strip().splitlines()[-1])
+            metrics.update(case=case, sentences=sentences)
+            results.append(metrics)
+            print(_format_row(metrics), flush=True)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def _format_row(metrics: Dict) -> str:
+    rate = ""
+    if "frames_per_second" in metrics:
+        rate = f"{metrics['frames_per_second']:.1f} fps"
+    elif "audio_seconds_per_second" in metrics:
+        rate = f"{metrics['audio_seconds_per_second']:.0f} audio s/s"
+    return (
+        f"{metrics['case']:<16}{metrics['sentences']:>7}{metrics['wall_seconds']:>11.3f} s"
+        f"{metrics['peak_rss_mb']:>10.1f} MiB  {rate}"
+    )
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Tuple[str, int, str, float, float]]:
+    """Return `(case, sentences, metric, baseline, current)` for regressions."""
+    previous = {(r["case"], r["sentences"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get((result["case"], result["sentences"]))
+        if before is None:
+            continue
+        for metric, min_delta in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None or new - old < min_delta:
+                continue
+            if new > old * (1 + threshold):
+                regressions.append((result["case"], result["sentences"], metric, old, new))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in ("--_prepare", "--_case"):
+        # Internal entry points used by `_subprocess`.
+        mode, case, sentences = argv[0], argv[1], int(argv[2])
+        if mode == "--_prepare":
+            _prepare(case, sentences)
+        else:
+            print(json.dumps(_run_case(case, sentences)))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark each pipeline stage at several script sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Script lengths in sentences")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES, help="Stages to benchmark")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the results JSON")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Allowed relative increase before a metric counts as a regression (default: 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<16}{'sents':>7}{'wall':>13}{'peak RSS':>14}  rate")
+    results = run_suite(args.sizes, args.cases)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for case, sentences, metric, old, new in regressions:
+            print(f"REGRESSION {case} @ {sentences}: {metric} {old:.3f} -> {new:.3f} (+{(new / old - 1) * 100:.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Cost of passing the script index against re-reading the script per stage.
+
+Before the script index, media sourcing, the narrator and the uploader each
+fetched the script and split it again.  This script stores a long synthetic
+script in memory storage (`mem://`), so every load is a real download
+through the storage layer, and times:
+
+* `segment_sentences` on the script (throughput in MB/s),
+* three stages each loading the script from storage and indexing it,
+* three stages each loading the index passed inline in their payload.
+
+Usage:
+
+```bash
+python3 benchmarks/script_index.py --sentences 20000
+```
+"""
+
+import argparse
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+from functions.common import storage  # noqa: E402
+from functions.common.script_index import ScriptIndex, load_script_index, segment_sentences  # noqa: E402
+
+# Stages that used to re-read the script.
+CONSUMERS = 3
+_SENTENCES = [
+    "Dr. Amara Okafor said the U.S. programme grew 3.5 percent this year.",
+    "Community leaders met on Monday to discuss the results!",
+    "Was the funding enough?",
+    "Organisers said yes... and promised more\nevents across the region.",
+]
+
+
+def build_script(n_sentences: int) -> str:
+    """Return a script of `n_sentences` sentences, in paragraphs of ten."""
+    parts = []
+    for i in range(n_sentences):
+        parts.append(_SENTENCES[i % len(_SENTENCES)])
+        parts.append("\n\n" if i % 10 == 9 else " ")
+    return "".join(parts)
+
+
+def _timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the script index against per-stage re-parsing.")
+    parser.add_argument("--sentences", type=int, default=20000, help="Sentences in the script (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is kept (default: 3)")
+    args = parser.parse_args()
+
+    text = build_script(args.sentences)
+    backend = storage.get_backend("mem://bench")
+    script_uri = backend.put_bytes(text.encode("utf-8"), "bench_script.txt")
+    index = ScriptIndex.from_text(text, script_uri=script_uri).to_dict()
+    segment_seconds = _timed(lambda: segment_sentences(text), args.repeat)
+    reparse_seconds = _timed(lambda: [load_script_index(None, script_uri) for _ in range(CONSUMERS)], args.repeat)
+    inline_seconds = _timed(lambda: [load_script_index(index) for _ in range(CONSUMERS)], args.repeat)
+
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    print(f"script: {args.sentences} sentences, {size_mb:.2f} MiB, {len(index['sentences'])} indexed")
+    print(f"segment_sentences   {segment_seconds * 1000:9.1f} ms  {size_mb / segment_seconds:8.1f} MiB/s")
+    print(f"re-read per stage   {reparse_seconds * 1000:9.1f} ms  ({CONSUMERS} stages)")
+    print(f"inline index        {inline_seconds * 1000:9.1f} ms  ({CONSUMERS} stages)")
+    print(f"speed-up x{reparse_seconds / inline_seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Segment-parallel video encoding against the single writer.
+
+Renders synthetic slides with media sourcing (into a frame store, or PNG
+files with `--source png`), then assembles the same timeline with video
+assembly at each `--workers` count.  `1` is the single `VideoWriter`; higher
+counts encode that many segments in parallel processes and join them.
+
+Every output is decoded again and checked against the single-writer
+video: the frame count must be equal and every decoded frame must show the
+slide the timeline puts there, so a dropped, repeated or reordered frame
+fails the check.  Slides are told apart by a small thumbnail, since the
+encoding is lossy.  The script prints the encode time and speed-up for each
+worker count and exits with status 1 if a check fails.
+
+Usage:
+
+```bash
+python3 benchmarks/segment_encode.py --slides 120 --length 600 --workers 1 2 4
+python3 benchmarks/segment_encode.py --mode vfr --slides 2000 --workers 1 2 4
+```
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+from functions.common.script_index import ScriptIndex  # noqa: E402
+from functions.media_sourcing.main import handle as media_sourcing_handle  # noqa: E402
+from functions.video_assembly.main import _repeat_counts  # noqa: E402
+from functions.video_assembly.main import handle as video_assembly_handle  # noqa: E402
+
+_WORDS = (
+    "community leaders report new funding for local schools while health workers expand clinics "
+    "across the region and families share stories of progress resilience and hope in 2024"
+).split()
+_THUMBNAIL = (64, 36)
+
+
+def sentences(n: int, seed: int = 0) -> List[str]:
+    """Return `n` news-like sentences of 4 to 40 words."""
+    rng = random.Random(seed)
+    return [
+        f"Story {i}: " + " ".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 40))).capitalize() + "."
+        for i in range(n)
+    ]
+
+
+def _thumbnail(frame):
+    import cv2  # type: ignore
+    import numpy as np  # type: ignore
+
+    return cv2.resize(frame, _THUMBNAIL, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+def decoded_slides(path: str, thumbnails) -> List[int]:
+    """Return, for every frame of a video, the index of the slide it shows."""
+    import cv2  # type: ignore
+    import numpy as np  # type: ignore
+
+    stack = np.stack(thumbnails)
+    capture = cv2.VideoCapture(path)
+    shown = []
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            distances = np.abs(stack - _thumbnail(frame)).mean(axis=(1, 2, 3))
+            shown.append(int(distances.argmin()))
+    finally:
+        capture.release()
+    return shown
+
+
+def run(slides: int, length: float, mode: str, fps: float, workers: List[int], source: str) -> List[Dict]:
+    """Assemble the same timeline at each worker count and check every output."""
+    texts = sentences(slides)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="segment_bench_") as workdir:
+        with contextlib.ExitStack() as stack:
+            previous = os.getcwd()
+            os.chdir(workdir)
+            stack.callback(os.chdir, previous)
+            index = ScriptIndex.from_text(" ".join(texts), script_uri="outputs/bench_script.txt").to_dict()
+            media = media_sourcing_handle(
+                {"script_index": index, "output": "store" if source == "store" else "files"}
+            )
+            if "error" in media:
+                raise RuntimeError(media["error"])
+            body = {"frame_durations": [length / slides] * slides, "timeline": mode, "fps": fps, "run_id": "bench"}
+            if source == "store":
+                body["frame_store_uri"] = media["frame_store_uri"]
+                from functions.common.frame_store import FrameStore
+
+                thumbnails = [_thumbnail(frame) for frame in FrameStore(media["frame_store_uri"])]
+            else:
+                import cv2  # type: ignore
+
+                body["media_uris"] = media["media_uris"]
+                thumbnails = [_thumbnail(cv2.imread(path)) for path in media["media_uris"]]
+            if mode == "cfr":
+                counts = _repeat_counts(body["frame_durations"], fps)
+                expected = [i for i, count in enumerate(counts) for _ in range(count)]
+            else:
+                expected = list(range(slides))
+
+            reference = None
+            for n_workers in workers:
+                start = time.perf_counter()
+                response = video_assembly_handle({**body, "encode_workers": n_workers})
+                seconds = time.perf_counter() - start
+                if "error" in response:
+                    raise RuntimeError(response["error"])
+                shown = decoded_slides(response["output_uri"], thumbnails)
+                if reference is None:
+                    reference = shown
+                results.append(
+                    {
+                        "workers": n_workers,
+                        "seconds": seconds,
+                        "frames": len(shown),
+                        "duration_sec": response["duration_sec"],
+                        "matches_timeline": shown == expected,
+                        "matches_single_writer": shown == reference,
+                    }
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare segment-parallel and single-writer video encoding.")
+    parser.add_argument("--slides", type=int, default=120, help="Slides in the timeline (default: 120)")
+    parser.add_argument("--length", type=float, default=600.0, help="Video length in seconds (default: 600)")
+    parser.add_argument("--mode", choices=("cfr", "vfr"), default="cfr", help="Timeline mode (default: cfr)")
+    parser.add_argument("--fps", type=float, default=25.0, help="Frame rate in cfr mode (default: 25)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts (default: 1 2 4)")
+    parser.add_argument("--source", choices=("store", "png"), default="store", help="Frame source (default: store)")
+    args = parser.parse_args()
+    workers = sorted(set([1] + args.workers))
+
+    results = run(args.slides, args.length, args.mode, args.fps, workers, args.source)
+    single = results[0]["seconds"]
+    print(f"{'workers':>7}{'seconds':>10}{'speed-up':>10}{'frames':>9}{'duration':>10}  check")
+    failed = False
+    for r in results:
+        ok = r["matches_timeline"] and r["matches_single_writer"]
+        failed = failed or not ok
+        print(
+            f"{r['workers']:>7}{r['seconds']:>10.2f}{single / r['seconds']:>9.2f}x{r['frames']:>9}"
+            f"{r['duration_sec']:>10.1f}  {'ok' if ok else 'MISMATCH'}"
+        )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Encode time against video length for the two timeline modes.
+
+Video assembly shows each slide for its timeline duration.  In `vfr` mode
+every slide is encoded once and the MP4's sample durations are rewritten, so
+encoding cost depends only on the number of slides.  In `cfr` mode a slide
+is repeated at a constant frame rate, so cost grows with the length of the
+video.  This script encodes the same slides at several total lengths in both
+modes and prints the encode time, frames written and file size of each.
+
+Slides are rendered by media sourcing in memory mode beforehand, so only
+encoding is timed.
+
+Usage:
+
+```bash
+python3 benchmarks/timeline_encode.py --slides 20 --lengths 30 120 600
+```
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+from functions.media_sourcing.main import _iter_rendered  # noqa: E402
+from functions.video_assembly.main import handle as video_assembly_handle  # noqa: E402
+
+DEFAULT_LENGTHS = [30.0, 120.0, 600.0]
+
+
+def _frames_written(path: str) -> int:
+    import cv2  # type: ignore
+
+    capture = cv2.VideoCapture(path)
+    try:
+        return int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        capture.release()
+
+
+def run(slides: int, lengths: List[float], fps: float) -> List[Dict]:
+    """Encode `slides` slides at every total length in both modes."""
+    frames = list(_iter_rendered([(f"Slide {i} of the benchmark timeline", None) for i in range(slides)]))
+    results = []
+    with tempfile.TemporaryDirectory(prefix="timeline_bench_") as workdir:
+        with contextlib.ExitStack() as stack:
+            previous = os.getcwd()
+            os.chdir(workdir)
+            stack.callback(os.chdir, previous)
+            for length in lengths:
+                durations = [length / slides] * slides
+                for mode in ("vfr", "cfr"):
+                    start = time.perf_counter()
+                    response = video_assembly_handle(
+                        {
+                            "frames": iter(frames),
+                            "frame_durations": durations,
+                            "timeline": mode,
+                            "fps": fps,
+                            "run_id": f"{mode}_{int(length)}",
+                        }
+                    )
+                    elapsed = time.perf_counter() - start
+                    if "error" in response:
+                        raise RuntimeError(response["error"])
+                    path = response["output_uri"]
+                    results.append(
+                        {
+                            "mode": mode,
+                            "length_sec": length,
+                            "encode_seconds": elapsed,
+                            "frames_written": _frames_written(path),
+                            "size_mb": os.path.getsize(path) / (1024 * 1024),
+                            "duration_sec": response["duration_sec"],
+                        }
+                    )
+                    r = results[-1]
+                    print(
+                        f"{mode:<5}{length:>9.0f} s{elapsed:>10.3f} s{r['frames_written']:>9}"
+                        f"{r['size_mb']:>10.2f} MiB{elapsed / length * 60:>11.3f} s/min",
+                        flush=True,
+                    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark timeline encoding against video length.")
+    parser.add_argument("--slides", type=int, default=20, help="Number of distinct slides (default: 20)")
+    parser.add_argument(
+        "--lengths",
+        type=float,
+        nargs="+",
+        default=DEFAULT_LENGTHS,
+        help="Total video lengths in seconds (default: 30 120 600)",
+    )
+    parser.add_argument("--fps", type=float, default=25.0, help="Frame rate of the cfr mode (default: 25)")
+    args = parser.parse_args()
+
+    print(f"{'mode':<5}{'length':>11}{'encode':>12}{'frames':>9}{'size':>14}{'cost':>15}")
+    results = run(args.slides, args.lengths, args.fps)
+    by_mode = {mode: [r for r in results if r["mode"] == mode] for mode in ("vfr", "cfr")}
+    if len(args.lengths) > 1:
+        for mode, rows in by_mode.items():
+            growth = rows[-1]["encode_seconds"] / rows[0]["encode_seconds"]
+            print(f"{mode}: encode time x{growth:.1f} from {rows[0]['length_sec']:.0f} s to {rows[-1]['length_sec']:.0f} s of video")
+
+
+if __name__ == "__main__":
+    main()
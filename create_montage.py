@@ -2,12 +2,75 @@
 import argparse
 import os
 from math import ceil, sqrt
+from typing import Sequence
 
 from PIL import Image
 
 
-def create_montage(input_files: list[str], output_path: str, max_size: int = 2048) -> None:
-    images = [Image.open(img_path) for img_path in input_files]
+def _output_size(grid_width: int, grid_height: int, max_size: int) -> tuple[int, int, float]:
+    max_dimension = max(grid_width, grid_height)
+    if max_dimension > max_size:
+        scale = max_size / max_dimension
+        return int(grid_width * scale), int(grid_height * scale), scale
+    return grid_width, grid_height, 1.0
+
+
+def _open_image(source) -> Image.Image:
+    # An input is an image path or a BGR frame array, such as a frame of a
+    # frame store (`functions/common/frame_store.py`).
+    if isinstance(source, str):
+        return Image.open(source)
+    # Frame store frames are read straight from the mapped file; no PNG is
+    # decoded.
+    height, width = source.shape[:2]
+    return Image.frombuffer("RGB", (width, height), source, "raw", "BGR", 0, 1)
+
+
+def _create_montage_streaming(input_files: Sequence, output_path: str, max_size: int) -> None:
+    # Only the output canvas and one input image are held at a time: each
+    # image is opened, reduced straight to its cell of the final montage,
+    # pasted and closed before the next one is read.
+    grid_size = ceil(sqrt(len(input_files)))
+    with _open_image(input_files[0]) as first:
+        img_width, img_height = first.size
+
+    out_width, out_height, scale = _output_size(grid_size * img_width, grid_size * img_height, max_size)
+    montage = Image.new("RGBA", (out_width, out_height), (255, 255, 255, 0))
+    for idx, img_path in enumerate(input_files):
+        col, row = idx % grid_size, idx // grid_size
+        # Cell edges are computed from the unscaled grid so neighbouring
+        # tiles meet exactly and the last one ends on the montage edge.
+        left, right = int(col * img_width * scale), min(int((col + 1) * img_width * scale), out_width)
+        top, bottom = int(row * img_height * scale), min(int((row + 1) * img_height * scale), out_height)
+        if right <= left or bottom <= top:
+            continue
+        with _open_image(img_path) as img:
+            # Match the full-size grid, where an odd-sized image is clipped
+            # to its cell, before reducing it.
+            tile = img.convert("RGBA")
+            if tile.size != (img_width, img_height):
+                cell = Image.new("RGBA", (img_width, img_height), (255, 255, 255, 0))
+                cell.paste(tile.crop((0, 0, min(tile.width, img_width), min(tile.height, img_height))), (0, 0))
+                tile = cell
+            if tile.size != (right - left, bottom - top):
+                tile = tile.resize((right - left, bottom - top), Image.Resampling.LANCZOS)
+            montage.paste(tile, (left, top))
+            del tile
+
+    montage.save(output_path)
+
+
+def create_montage(
+    input_files: Sequence,
+    output_path: str,
+    max_size: int = 2048,
+    streaming: bool = False,
+) -> None:
+    if streaming:
+        _create_montage_streaming(input_files, output_path, max_size)
+        return
+
+    images = [_open_image(img_path) for img_path in input_files]
     num_images = len(images)
 
     grid_size = ceil(sqrt(num_images))
@@ -24,11 +87,8 @@ def create_montage(input_files: list[str], output_path: str, max_size: int = 204
         y = (idx // grid_size) * img_height
         grid_image.paste(img, (x, y))
 
-    max_dimension = max(grid_width, grid_height)
-    if max_dimension > max_size:
-        scale = max_size / max_dimension
-        new_width = int(grid_width * scale)
-        new_height = int(grid_height * scale)
+    new_width, new_height, scale = _output_size(grid_width, grid_height, max_size)
+    if scale < 1.0:
         grid_image = grid_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
 
     grid_image.save(output_path)
@@ -39,6 +99,7 @@ def main() -> None:
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--input_files", nargs="+", help="List of input image file paths")
     group.add_argument("--input_dir", help="Directory containing input images")
+    group.add_argument("--frame_store", help="Frame store file written by media sourcing")
     parser.add_argument("--output", required=True, help="Path to save the output montage")
     parser.add_argument(
         "--max_size",
@@ -46,12 +107,23 @@ def main() -> None:
         default=2048,
         help="Maximum size for the longest side of the output image (default: 2048)",
     )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Reduce and paste one image at a time so memory is bounded by the output size",
+    )
 
     args = parser.parse_args()
 
     # Handle input files
     if args.input_files:
         input_files = args.input_files
+    elif args.frame_store:
+        from functions.common.frame_store import FrameStore
+
+        input_files = list(FrameStore(args.frame_store))
+        if not input_files:
+            raise ValueError("The frame store holds no frames.")
     else:
         # Get all PNG files from directory
         input_files = [
@@ -62,7 +134,7 @@ def main() -> None:
         if not input_files:
             raise ValueError("No PNG files found in the specified directory.")
 
-    create_montage(input_files, args.output, args.max_size)
+    create_montage(input_files, args.output, args.max_size, streaming=args.streaming)
 
 
 if __name__ == "__main__":
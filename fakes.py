@@ -0,0 +1,272 @@
+"""In-process fakes of the Google Cloud services used by the pipeline.
+
+These stand-ins let the orchestration and upload code be exercised locally
+without credentials or network access.  They implement only the calls the pipeline
+makes and keep counters so callers can check how many API calls were made.
+
+Example:
+
+```python
+from fakes import FakeExecutionsClient
+from orchestrator import ExecutionTracker
+
+client = FakeExecutionsClient(duration=lambda args: 2.0)
+tracker = ExecutionTracker(client=client, initial_interval=0.1)
+outcomes = asyncio.run(tracker.track_many("p", "r", "wf", [{"topic": "a"}]))
+```
+"""
+
+import enum
+import io
+import itertools
+import json
+import os
+import re
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, Optional, Union
+
+try:
+    from requests.exceptions import ConnectionError as TransportConnectionError
+except ImportError:  # pragma: no cover - requests comes with google-auth
+    TransportConnectionError = ConnectionError  # type: ignore
+
+try:
+    from google.api_core.exceptions import ServiceUnavailable
+except ImportError:  # pragma: no cover - google-api-core comes with the workflows client
+    ServiceUnavailable = ConnectionError  # type: ignore
+
+
+class FakeExecutionsClient:
+    """Async stand-in for `executions_v1.ExecutionsAsyncClient`.
+
+    Every execution stays `ACTIVE` for `duration(arguments)` seconds of wall
+    time after it is created and then finishes with the state returned by
+    `outcome(arguments)`.
+
+    Failures can be injected by poll number (1-based, counting every
+    `get_execution` call): `fail_polls` makes those calls raise
+    `ServiceUnavailable`, as the API does on a transient 503.
+
+    Args:
+        duration: Seconds an execution runs for, given its arguments.
+        outcome: Final state name (`"SUCCEEDED"`, `"FAILED"` or
+            `"CANCELLED"`) given its arguments.
+        fail_polls: Poll numbers whose call raises `ServiceUnavailable`.
+    """
+
+    class State(enum.IntEnum):
+        STATE_UNSPECIFIED = 0
+        ACTIVE = 1
+        SUCCEEDED = 2
+        FAILED = 3
+        CANCELLED = 4
+
+    def __init__(
+        self,
+        duration: Callable[[dict], float] = lambda args: 1.0,
+        outcome: Callable[[dict], str] = lambda args: "SUCCEEDED",
+        fail_polls: Iterable[int] = (),
+    ) -> None:
+        self._duration = duration
+        self._outcome = outcome
+        self.fail_polls = set(fail_polls)
+        self._ids = itertools.count(1)
+        self._executions: Dict[str, Dict] = {}
+        self.create_calls = 0
+        self.get_calls = 0
+
+    @staticmethod
+    def workflow_path(project: str, location: str, workflow: str) -> str:
+        return f"projects/{project}/locations/{location}/workflows/{workflow}"
+
+    def _snapshot(self, name: str):
+        record = self._executions[name]
+        state = self.State.ACTIVE
+        if time.monotonic() >= record["finishes_at"]:
+            state = self.State[record["outcome"]]
+        result = error = None
+        if state == self.State.SUCCEEDED:
+            result = json.dumps({"status": "uploaded", "arguments": record["arguments"]})
+        elif state != self.State.ACTIVE:
+            error = SimpleNamespace(payload=f"fake execution ended {state.name}")
+        return SimpleNamespace(name=name, state=state, result=result, error=error)
+
+    async def create_execution(self, parent: str, execution) -> SimpleNamespace:
+        self.create_calls += 1
+        argument = execution["argument"] if isinstance(execution, dict) else execution.argument
+        arguments = json.loads(argument)
+        name = f"{parent}/executions/fake-{next(self._ids)}"
+        self._executions[name] = {
+            "arguments": arguments,
+            "finishes_at": time.monotonic() + self._duration(arguments),
+            "outcome": self._outcome(arguments),
+        }
+        return self._snapshot(name)
+
+    async def get_execution(self, name: str) -> SimpleNamespace:
+        self.get_calls += 1
+        if self.get_calls in self.fail_polls:
+            raise ServiceUnavailable(f"injected failure on poll {self.get_calls}")
+        if name not in self._executions:
+            raise KeyError(f"Execution {name} not found")
+        return self._snapshot(name)
+
+    def execution_arguments(self, name: str) -> Optional[dict]:
+        """Return the arguments an execution was created with."""
+        record = self._executions.get(name)
+        return record["arguments"] if record else None
+
+
+class FakeStorageClient:
+    """Stand-in for `google.cloud.storage.Client` supporting streamed reads.
+
+    Objects are given per bucket as either bytes or the path of a local file;
+    file-backed objects are read straight from disk, so large sources do not
+    have to fit in memory.
+
+    Args:
+        objects: `{bucket: {object_name: bytes_or_path}}`.
+    """
+
+    def __init__(self, objects: Dict[str, Dict[str, Union[bytes, str]]]) -> None:
+        self.objects = objects
+        self.open_calls = 0
+        self.bytes_read = 0
+
+    def bucket(self, name: str) -> "_FakeBucket":
+        return _FakeBucket(self, name)
+
+
+class _FakeBucket:
+    def __init__(self, client: FakeStorageClient, name: str) -> None:
+        self.client = client
+        self.name = name
+
+    def blob(self, name: str) -> "_FakeBlob":
+        return _FakeBlob(self, name)
+
+
+class _FakeBlob:
+    def __init__(self, bucket: _FakeBucket, name: str) -> None:
+        self.bucket = bucket
+        self.name = name
+        self.size: Optional[int] = None
+
+    def _content(self) -> Union[bytes, str]:
+        try:
+            return self.bucket.client.objects[self.bucket.name][self.name]
+        except KeyError:
+            raise KeyError(f"gs://{self.bucket.name}/{self.name} not found") from None
+
+    def reload(self) -> None:
+        content = self._content()
+        self.size = len(content) if isinstance(content, bytes) else os.path.getsize(content)
+
+    def open(self, mode: str = "rb", chunk_size: Optional[int] = None):
+        if mode != "rb":
+            raise ValueError("FakeStorageClient only supports reading")
+        client = self.bucket.client
+        client.open_calls += 1
+        content = self._content()
+        f = io.BytesIO(content) if isinstance(content, bytes) else open(content, "rb")
+        read = f.read
+
+        def counted_read(size: int = -1) -> bytes:
+            data = read(size)
+            client.bytes_read += len(data)
+            return data
+
+        f.read = counted_read  # type: ignore[method-assign]
+        return f
+
+
+class FakeDriveUploadTransport:
+    """Requests-style stand-in for the Drive resumable upload endpoint.
+
+    Implements the parts of the protocol the uploader uses: a POST opens a
+    session and returns its URI in `Location`; a PUT with
+    `Content-Range: bytes a-b/total` appends a chunk and answers 308 with the
+    committed `Range`, or 200 with `{"id": ...}` once everything has arrived;
+    a PUT with `Content-Range: bytes */total` reports progress.
+
+    Failures can be injected by chunk number (1-based, counting every chunk
+    PUT): `fail_chunks` makes those requests raise the connection error an
+    `AuthorizedSession` raises (`requests.exceptions.ConnectionError`) before
+    anything is committed, and `error_chunks` makes them answer HTTP 503.
+    With `keep_data=False` only sizes and a running count are kept.
+
+    Args:
+        fail_chunks: Chunk numbers whose request raises a connection error.
+        error_chunks: Chunk numbers whose request returns HTTP 503.
+        keep_data: Whether to keep the uploaded bytes for inspection.
+    """
+
+    def __init__(
+        self,
+        fail_chunks: Iterable[int] = (),
+        error_chunks: Iterable[int] = (),
+        keep_data: bool = True,
+    ) -> None:
+        self.fail_chunks = set(fail_chunks)
+        self.error_chunks = set(error_chunks)
+        self.keep_data = keep_data
+        self.sessions: Dict[str, Dict] = {}
+        self._ids = itertools.count(1)
+        self.chunk_calls = 0
+        self.query_calls = 0
+        self.max_chunk_bytes = 0
+
+    @staticmethod
+    def _response(status_code: int, headers: Optional[Dict[str, str]] = None, body: Optional[Dict] = None):
+        return SimpleNamespace(status_code=status_code, headers=headers or {}, json=lambda: body)
+
+    def _progress(self, session: Dict):
+        if session["committed"] == session["total"]:
+            return self._response(200, body={"id": session["file_id"]})
+        headers = {"Range": f"bytes=0-{session['committed'] - 1}"} if session["committed"] else {}
+        return self._response(308, headers)
+
+    def request(self, method: str, url: str, data=None, headers: Optional[Dict[str, str]] = None):
+        headers = headers or {}
+        if method == "POST":
+            n = next(self._ids)
+            uri = f"https://fake-upload.invalid/session/{n}"
+            self.sessions[uri] = {
+                "metadata": json.loads(data),
+                "total": int(headers["X-Upload-Content-Length"]),
+                "committed": 0,
+                "data": bytearray(),
+                "file_id": f"fake-file-{n}",
+            }
+            return self._response(200, {"Location": uri})
+
+        session = self.sessions.get(url)
+        if method != "PUT" or session is None:
+            return self._response(404)
+        content_range = headers.get("Content-Range", "")
+        if content_range.startswith("bytes */"):
+            self.query_calls += 1
+            return self._progress(session)
+
+        self.chunk_calls += 1
+        if self.chunk_calls in self.fail_chunks:
+            raise TransportConnectionError(f"injected failure on chunk {self.chunk_calls}")
+        if self.chunk_calls in self.error_chunks:
+            return self._response(503)
+        match = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+)", content_range)
+        if not match or int(match.group(1)) != session["committed"]:
+            # Real sessions reject chunks that do not continue the upload.
+            return self._response(400)
+        self.max_chunk_bytes = max(self.max_chunk_bytes, len(data))
+        session["committed"] += len(data)
+        if self.keep_data:
+            session["data"] += data
+        return self._progress(session)
+
+    def uploaded(self, file_id: str) -> Optional[bytes]:
+        """Return the bytes of a completed upload, if they were kept."""
+        for session in self.sessions.values():
+            if session["file_id"] == file_id and session["committed"] == session["total"]:
+                return bytes(session["data"])
+        return None
@@ -0,0 +1,7 @@
+"""Helpers shared by every Cloud Function in the `functions` package.
+
+Each function is deployed from its own directory, so the deploy workflow
+copies this package next to each function's `main.py`.  Handlers therefore
+import it as `functions.common` when run locally and fall back to `common`
+when deployed.
+"""
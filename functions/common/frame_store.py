@@ -0,0 +1,200 @@
+"""Memory-mapped frame store: every frame of a run in one file.
+
+Writing one PNG per sentence means thousands of small files for a long run.
+Each of them is compressed by media sourcing and decompressed again by video
+assembly and `create_montage.py`.  A frame store holds the run's frames
+uncompressed in a single file:
+
+* a fixed 64-byte header: the magic `BNFRAME1`, then little-endian `uint32`
+  frame count, width, height and channels, and the `uint64` offset of the
+  first frame,
+* the frames, each `height * width * channels` bytes of BGR `uint8`, one
+  after another from that offset, which is page-aligned.
+
+Frame `i` therefore starts at `offset + i * frame_bytes`.  Readers map the
+file and get every frame as a NumPy view of the mapping, so a frame is paged
+in from the file when it is used and never copied or decoded.  Writers map
+the file the same way and render straight into each frame's slot; separate
+processes can fill different slots of the same store at once.
+
+`export_pngs` converts a store back into the `frame_<n>.png` files of the
+PNG layout:
+
+```bash
+python3 -m functions.common.frame_store outputs/<run_id>_frames.bnf outputs/<run_id>_media
+```
+"""
+
+import argparse
+import os
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+MAGIC = b"BNFRAME1"
+HEADER_SIZE = 64
+# Frames start on a page boundary so each one maps cleanly.
+DATA_OFFSET = 4096
+EXTENSION = ".bnf"
+_HEADER = struct.Struct("<8sIIIIQ")
+
+
+def _read_header(path: str) -> Tuple[int, int, int, int, int]:
+    """Return `(count, width, height, channels, offset)` of a store file.
+
+    Raises:
+        ValueError: If the file is not a frame store or is truncated.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        size = os.fstat(f.fileno()).st_size
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path} is not a frame store")
+    magic, count, width, height, channels, offset = _HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a frame store")
+    if size < offset + count * width * height * channels:
+        raise ValueError(f"Frame store {path} is truncated")
+    return count, width, height, channels, offset
+
+
+class FrameStore:
+    """Read-only view of the frames in a store file.
+
+    Indexing or iterating yields each frame as a read-only BGR array backed
+    by the mapping; nothing is copied.  The file stays mapped while any of
+    those arrays is alive.
+
+    Args:
+        path: Local path of the store file.
+
+    Raises:
+        ValueError: If the file is not a frame store.
+    """
+
+    def __init__(self, path: str) -> None:
+        import numpy as np  # type: ignore
+
+        self.path = path
+        count, width, height, channels, offset = _read_header(path)
+        self.size = (width, height)
+        if count:
+            self._frames = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(count, height, width, channels))
+        else:
+            self._frames = np.empty((0, height, width, channels), dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __getitem__(self, index: int):
+        return self._frames[index]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._frames)
+
+
+class FrameStoreWriter:
+    """Writable store of `count` frames of one size.
+
+    Creating a writer creates (or replaces) the file at its full size; open
+    an existing store with `create=False` to fill some of its slots from
+    another process.
+
+    Args:
+        path: Local path of the store file.
+        count: Number of frames; ignored with `create=False`.
+        size: `(width, height)` of every frame; ignored with `create=False`.
+        channels: Bytes per pixel.
+        create: Create a new store rather than open an existing one.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        count: int = 0,
+        size: Tuple[int, int] = (0, 0),
+        channels: int = 3,
+        create: bool = True,
+    ) -> None:
+        import numpy as np  # type: ignore
+
+        self.path = path
+        if create:
+            width, height = size
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, count, width, height, channels, DATA_OFFSET).ljust(HEADER_SIZE, b"\0"))
+                # Sparse until rendered into; no frame bytes are written here.
+                f.truncate(DATA_OFFSET + count * width * height * channels)
+            offset = DATA_OFFSET
+        else:
+            count, width, height, channels, offset = _read_header(path)
+        self.size = (width, height)
+        self.count = count
+        self._frames = None
+        if count:
+            self._frames = np.memmap(path, dtype=np.uint8, mode="r+", offset=offset, shape=(count, height, width, channels))
+
+    def frame(self, index: int):
+        """Return the writable array of frame `index`, backed by the file."""
+        if self._frames is None:
+            raise IndexError("frame index out of range")
+        return self._frames[index]
+
+    def close(self) -> None:
+        """Flush the frames to the file and release the mapping."""
+        if self._frames is not None:
+            self._frames.flush()
+            self._frames = None
+
+    def __enter__(self) -> "FrameStoreWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def is_frame_store(path: str) -> bool:
+    """Return whether `path` is a frame store file."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def export_pngs(path: str, output_dir: str, first_index: int = 1) -> List[str]:
+    """Write every frame of a store as `frame_<n>.png` in `output_dir`.
+
+    Args:
+        path: Local path of the store file.
+        output_dir: Folder for the PNG files; created if needed.
+        first_index: Number of the first frame's file (media sourcing
+            numbers frames from 1).
+
+    Returns:
+        The PNG paths in frame order.
+    """
+    from PIL import Image
+
+    store = FrameStore(path)
+    width, height = store.size
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for index, frame in enumerate(store, start=first_index):
+        out = os.path.join(output_dir, f"frame_{index}.png")
+        Image.frombuffer("RGB", (width, height), frame, "raw", "BGR", 0, 1).save(out)
+        paths.append(out)
+    return paths
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export the frames of a frame store as PNG files.")
+    parser.add_argument("store", help="Frame store file")
+    parser.add_argument("output_dir", help="Folder to write frame_<n>.png files to")
+    args = parser.parse_args(argv)
+    paths = export_pngs(args.store, args.output_dir)
+    print(f"Exported {len(paths)} frames to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Lightweight timing instrumentation for the Cloud Function handlers.
+
+Every handler creates a `Metrics` object per request and wraps its phases
+(payload parse, text layout, raster, PNG encode, frame decode, video write,
+WAV write, ...) in `metrics.span(name)`.  Spans accumulate the total time and
+call count for each phase, so per-frame work shows up as one line per phase
+rather than one entry per frame.  Spans are thread-safe and may be recorded
+from worker threads; nesting is tracked per thread.
+
+Recording is always on because it only costs two `perf_counter` calls per
+span.  What happens to the figures is decided per request:
+
+* `"metrics": true` in the payload adds them to the response under
+  `metrics`;
+* `"trace_memory": true` also collects tracemalloc peaks, overall and for
+  each outermost span opened on the thread that created the `Metrics`
+  (this slows the handler down noticeably).  Spans opened on worker
+  threads record time only; their allocations count towards the peak of
+  the handler-thread span they run under.  Tracing
+  is shared by every request in the process: it starts with the first
+  request that asks for it and stops when the last one finishes, and the
+  peaks of requests running at the same time include each other's
+  allocations;
+* the `METRICS_SINK` environment variable names a JSON-lines file to which
+  every request's figures are appended.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+SINK_ENV = "METRICS_SINK"
+
+_tracing_lock = threading.Lock()
+# Requests currently relying on tracemalloc having been started for them.
+_tracing_users = 0
+
+
+def _start_tracing() -> bool:
+    """Take a reference on tracemalloc, starting it if needed.
+
+    Returns:
+        Whether a reference was taken.  Tracing started outside `Metrics`
+        is left alone and is not stopped by it either.
+    """
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0:
+            if tracemalloc.is_tracing():
+                return False
+            tracemalloc.start()
+        _tracing_users += 1
+        return True
+
+
+def _stop_tracing() -> None:
+    """Drop a reference taken by `_start_tracing`, stopping tracing with the last."""
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
+
+
+class Metrics:
+    """Per-request collection of phase timings.
+
+    Args:
+        handler: Name of the handler being measured.
+        sink: Optional JSON-lines file to append reports to; defaults to the
+            `METRICS_SINK` environment variable.
+    """
+
+    def __init__(self, handler: str, sink: Optional[str] = None) -> None:
+        self.handler = handler
+        self.sink = sink if sink is not None else os.environ.get(SINK_ENV)
+        self.include_in_response = False
+        self.trace_memory = False
+        self._started_tracemalloc = False
+        self._phases: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        # Span nesting depth of each thread.
+        self._local = threading.local()
+        self._thread = threading.get_ident()
+        self._start = time.perf_counter()
+
+    def configure(self, data: Dict[str, Any]) -> None:
+        """Apply the `metrics` and `trace_memory` options from a payload."""
+        self.include_in_response = bool(data.get("metrics"))
+        if data.get("trace_memory") and not self.trace_memory:
+            self.trace_memory = True
+            self._started_tracemalloc = _start_tracing()
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the enclosed block and add it to phase `name`."""
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        trace_peak = self.trace_memory and depth == 0 and threading.get_ident() == self._thread
+        if trace_peak:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._local.depth = depth
+            with self._lock:
+                phase = self._phases.setdefault(name, {"seconds": 0.0, "count": 0})
+                phase["seconds"] += elapsed
+                phase["count"] += 1
+                if trace_peak:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    phase["tracemalloc_peak_bytes"] = max(phase.get("tracemalloc_peak_bytes", 0), peak)
+
+    def add(self, name: str, seconds: float, count: int = 1) -> None:
+        """Record time measured elsewhere, for example in a worker process."""
+        with self._lock:
+            phase = self._phases.setdefault(name, {"seconds": 0.0, "count": 0})
+            phase["seconds"] += seconds
+            phase["count"] += count
+
+    def report(self) -> Dict[str, Any]:
+        """Return the figures collected so far."""
+        with self._lock:
+            phases = {name: dict(values) for name, values in self._phases.items()}
+        report: Dict[str, Any] = {
+            "handler": self.handler,
+            "total_seconds": time.perf_counter() - self._start,
+            "phases": phases,
+        }
+        if self.trace_memory and tracemalloc.is_tracing():
+            report["tracemalloc_peak_bytes"] = max(
+                [tracemalloc.get_traced_memory()[1]]
+                + [p.get("tracemalloc_peak_bytes", 0) for p in phases.values()]
+            )
+        return report
+
+    def finish(self, response: Any) -> Any:
+        """Emit the report and return `response`, with metrics if requested."""
+        report = self.report()
+        if self._started_tracemalloc:
+            _stop_tracing()
+            self._started_tracemalloc = False
+        if self.sink:
+            record = dict(report, timestamp=time.time())
+            with open(self.sink, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        if self.include_in_response and isinstance(response, dict):
+            response = dict(response, metrics=report)
+        return response
+
+
+class _NullMetrics:
+    """Stand-in used when a helper is called without a `Metrics` object."""
+
+    @contextmanager
+    def span(self, name: str):
+        yield
+
+    def add(self, name: str, seconds: float, count: int = 1) -> None:
+        pass
+
+
+NULL_METRICS = _NullMetrics()
@@ -0,0 +1,95 @@
+"""Compact manifest of a run's frame URIs.
+
+Returning every frame URI inline in `media_uris` makes the media sourcing
+response, the video assembly request and the workflow state that carries one
+to the other grow with the number of sentences.  A media manifest holds the
+list in a file instead, so the handoff is one URI and a count:
+
+* the first line is a JSON header with the format `version`, the frame
+  `count` and the `base` prefix every entry shares (typically the run's
+  media folder),
+* each following line is one frame's URI with `base` removed, in frame
+  order.
+
+`iter_media_manifest` reads the entries lazily, a line at a time, so a
+consumer never holds the whole list.
+"""
+
+import json
+import os
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+MANIFEST_VERSION = 1
+# Every manifest starts with its header's first key.
+_HEADER_PREFIX = b'{"version": '
+
+
+def _base_prefix(uris) -> str:
+    """Return the longest folder prefix shared by every URI."""
+    prefix = os.path.commonprefix(uris) if uris else ""
+    cut = max(prefix.rfind("/"), prefix.rfind(os.sep))
+    return prefix[:cut + 1]
+
+
+def write_media_manifest(path: str, uris: Iterable[str]) -> int:
+    """Write the frame URIs `uris`, in order, as a media manifest at `path`.
+
+    Returns:
+        The number of entries written.
+
+    Raises:
+        ValueError: If a URI contains a line break.
+    """
+    uris = list(uris)
+    if any("\n" in uri or "\r" in uri for uri in uris):
+        raise ValueError("Frame URIs must not contain line breaks")
+    base = _base_prefix(uris)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(json.dumps({"version": MANIFEST_VERSION, "count": len(uris), "base": base}) + "\n")
+        for uri in uris:
+            f.write(uri[len(base):] + "\n")
+    return len(uris)
+
+
+def read_media_manifest_header(path: str) -> Dict[str, Any]:
+    """Return the header of the media manifest at `path`.
+
+    Raises:
+        ValueError: If the file is not a media manifest of a known version.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        line = f.readline()
+    try:
+        header = json.loads(line)
+    except json.JSONDecodeError:
+        raise ValueError(f"{path} is not a media manifest") from None
+    if not isinstance(header, dict) or header.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"{path} is not a media manifest")
+    return header
+
+
+def is_media_manifest(path: str) -> bool:
+    """Return whether `path` is a media manifest file."""
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(_HEADER_PREFIX)) != _HEADER_PREFIX:
+                return False
+        read_media_manifest_header(path)
+    except (OSError, UnicodeDecodeError, ValueError):
+        return False
+    return True
+
+
+def iter_media_manifest(path: str, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """Yield the frame URIs of entries `start` to `stop` of a media manifest.
+
+    Raises:
+        ValueError: If the file is not a media manifest.
+    """
+    base = read_media_manifest_header(path)["base"]
+    with open(path, "r", encoding="utf-8") as f:
+        f.readline()
+        for line in islice(f, start, stop):
+            yield base + line.rstrip("\n")
@@ -0,0 +1,95 @@
+"""Request decoding and batch invocation shared by every handler.
+
+`decode_request` turns whatever a handler was called with (a Flask
+`Request`, a dict in local tests or a JSON string) into the payload dict.
+
+`run_batch` backs each handler's `handle_batch` entry point.  Its payload
+holds a list of ordinary job payloads:
+
+```json
+{"jobs": [{"run_id": "a", ...}, {"run_id": "b", ...}]}
+```
+
+The handler's `warm_up()` runs once, then every job goes through the
+handler's `handle` in the same process, so fonts, codecs and storage
+clients are loaded once per batch instead of once per job.  Jobs run one
+after another: handlers keep per-process state (the media sourcing font,
+canvas and rasteriser, tracemalloc) that concurrent jobs would share.  A
+job can still parallelise its own work through the handler's options,
+such as media sourcing's `workers`.  The response has one entry per job,
+in order: the job's response, or `{"error": ...}` if it failed.  A failed
+job does not stop the others.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+
+class PayloadError(ValueError):
+    """The request body is not a JSON object."""
+
+
+def decode_request(request: Any) -> Dict[str, Any]:
+    """Return the JSON payload of a request.
+
+    Args:
+        request: Flask `Request`, dict or JSON string.  A Flask request
+            without a JSON body decodes to an empty payload.
+
+    Raises:
+        PayloadError: If the body is not valid JSON or not a JSON object.
+    """
+    if hasattr(request, "get_json"):
+        data = request.get_json(silent=True) or {}
+    elif isinstance(request, dict):
+        data = request
+    else:
+        try:
+            data = json.loads(request)  # type: ignore
+        except Exception:
+            raise PayloadError("Invalid JSON payload")
+    if not isinstance(data, dict):
+        raise PayloadError("Invalid JSON payload")
+    return data
+
+
+def _run_job(handle: Callable[[Any], Dict[str, Any]], job: Any) -> Dict[str, Any]:
+    if not isinstance(job, dict):
+        return {"error": "Invalid job payload"}
+    try:
+        return handle(job)
+    except Exception as e:  # noqa: BLE001 - one failed job must not stop the batch
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def run_batch(
+    request: Any,
+    handle: Callable[[Any], Dict[str, Any]],
+    warm_up: Optional[Callable[[], None]] = None,
+) -> Dict[str, Any]:
+    """Run every job of a batch request through `handle`.
+
+    Args:
+        request: Flask `Request`, dict or JSON string with:
+            - jobs: List of job payloads, each as `handle` accepts it,
+              run one after another
+        handle: The handler's single-job entry point.
+        warm_up: The handler's warm-up hook, run once before the jobs.
+
+    Returns:
+        `{"results": [...], "succeeded": n, "failed": m}`, with `results`
+        in job order, or `{"error": ...}` if the batch itself is invalid.
+    """
+    try:
+        data = decode_request(request)
+    except PayloadError as e:
+        return {"error": str(e)}
+    jobs = data.get("jobs")
+    if not isinstance(jobs, list):
+        return {"error": "Batch payload needs a list of jobs"}
+
+    if jobs and warm_up is not None:
+        warm_up()
+    results: List[Dict[str, Any]] = [_run_job(handle, job) for job in jobs]
+    failed = sum(1 for result in results if "error" in result)
+    return {"results": results, "succeeded": len(results) - failed, "failed": failed}
@@ -0,0 +1,231 @@
+"""Script index shared by every stage of the pipeline.
+
+The scriptwriter segments its script once and emits a compact index of it:
+the text of each sentence, its character offsets in the script, its word
+count and its estimated speaking duration.  Downstream stages receive the
+index in their payload (or its URI) instead of the script's path, so a long
+script is neither downloaded nor parsed again by every stage, and every
+stage agrees on where the sentence boundaries are.
+
+The index is stored column-wise to keep it small:
+
+```json
+{"version": 1, "script_uri": "outputs/run_script.txt", "words_per_minute": 150,
+ "sentences": ["First one.", "Second one."], "offsets": [[0, 10], [11, 22]],
+ "words": [2, 2], "durations": [0.8, 0.8]}
+```
+
+`segment_sentences` is a single pass over the text.  A sentence ends at
+`.`, `!` or `?` (with any closing quotes or brackets) followed by whitespace,
+or at a blank line.  Punctuation followed by a lower-case word (a
+mid-sentence ellipsis, "e.g. this"), abbreviations in `ABBREVIATIONS`
+("Dr.", "U.S."), dotted acronyms ("N.A.A.C.P.") and decimal points do not
+end a sentence.  A lone capital letter is not taken for an initial, so
+"plan B. The results" is two sentences.  A single newline inside a sentence
+is treated as a space, so wrapped lines stay together, and each sentence's
+text has its runs of whitespace collapsed to single spaces.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .storage import fetch
+
+INDEX_VERSION = 1
+# Average news-reading pace used to estimate each sentence's duration.
+WORDS_PER_MINUTE = 150
+_CLOSERS = "\"')]”’"
+# Sentence punctuation (with closing quotes or brackets) before whitespace,
+# or a blank line.
+_BOUNDARY = re.compile(r"([.!?]+[\"')\]”’]*)(?=\s|$)|\n[ \t\r]*\n")
+# Lower-case abbreviations, without their final period, that do not end a
+# sentence.
+ABBREVIATIONS = frozenset(
+    {
+        "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc",
+        "inc", "ltd", "co", "corp", "dept", "gov", "sen", "rep", "gen", "col",
+        "lt", "sgt", "capt", "jan", "feb", "mar", "apr", "jun", "jul", "aug",
+        "sep", "sept", "oct", "nov", "dec", "approx", "fig", "e.g", "i.e",
+        "u.s", "u.k", "a.m", "p.m",
+    }
+)
+
+
+def _is_abbreviation(text: str, start: int, period: int) -> bool:
+    """Return whether the word ending at `text[period]` is an abbreviation."""
+    word_start = period
+    while word_start > start and not text[word_start - 1].isspace():
+        word_start -= 1
+    word = text[word_start:period].lstrip("\"'([“‘").lower()
+    if word in ABBREVIATIONS:
+        return True
+    # Dotted acronyms such as "N.A.A.C.P."; a lone letter ("plan B.") is not one.
+    parts = word.split(".")
+    return len(parts) > 1 and all(len(part) == 1 and part.isalpha() for part in parts)
+
+
+def _append_span(spans: List[Tuple[int, int]], text: str, start: int, end: int) -> None:
+    """Append `text[start:end]` without surrounding whitespace, if not empty."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if end > start:
+        spans.append((start, end))
+
+
+def _continues(text: str, pos: int) -> bool:
+    """Return whether the next word after `pos` starts in lower case."""
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos < len(text) and text[pos].islower()
+
+
+def segment_sentences(text: str) -> List[Tuple[int, int]]:
+    """Split `text` into sentences in a single pass.
+
+    Args:
+        text: Script text.
+
+    Returns:
+        `(start, end)` character offsets of each sentence, with surrounding
+        whitespace excluded, so `text[start:end]` is the sentence.
+    """
+    spans = []
+    start = 0
+    # The regex jumps between candidate boundaries, so only the characters
+    # around each one are looked at in Python.
+    for match in _BOUNDARY.finditer(text):
+        punctuation = match.group(1)
+        if punctuation:
+            if _continues(text, match.end()):
+                continue
+            if punctuation.rstrip(_CLOSERS) == "." and _is_abbreviation(text, start, match.start()):
+                continue
+            end = match.end()
+        else:
+            end = match.start()
+        _append_span(spans, text, start, end)
+        start = match.end()
+    _append_span(spans, text, start, len(text))
+    return spans
+
+
+class ScriptIndex:
+    """Sentences of a script with their offsets, word counts and durations.
+
+    Build one with `from_text` or `from_dict`; `to_dict` gives the compact
+    JSON form passed between stages.
+    """
+
+    def __init__(
+        self,
+        sentences: Sequence[str],
+        offsets: Sequence[Sequence[int]],
+        words: Sequence[int],
+        durations: Sequence[float],
+        words_per_minute: float = WORDS_PER_MINUTE,
+        script_uri: Optional[str] = None,
+    ) -> None:
+        if not len(sentences) == len(offsets) == len(words) == len(durations):
+            raise ValueError("Script index columns have different lengths")
+        self.sentences = list(sentences)
+        self.offsets = [(int(start), int(end)) for start, end in offsets]
+        self.words = [int(w) for w in words]
+        self.durations = [float(d) for d in durations]
+        self.words_per_minute = float(words_per_minute)
+        self.script_uri = script_uri
+
+    @classmethod
+    def from_text(
+        cls, text: str, words_per_minute: float = WORDS_PER_MINUTE, script_uri: Optional[str] = None
+    ) -> "ScriptIndex":
+        """Segment `text` and estimate each sentence's speaking duration.
+
+        Offsets point into `text`; the sentences themselves have their
+        whitespace, including wrapped lines, collapsed to single spaces.
+        """
+        offsets = segment_sentences(text)
+        sentences = [" ".join(text[start:end].split()) for start, end in offsets]
+        words = [len(sentence.split()) for sentence in sentences]
+        durations = [round(w * 60.0 / words_per_minute, 3) for w in words]
+        return cls(sentences, offsets, words, durations, words_per_minute, script_uri)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScriptIndex":
+        """Load the compact form produced by `to_dict`.
+
+        Raises:
+            ValueError: If the index is malformed or of another version.
+        """
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            raise ValueError("Unsupported script index version")
+        try:
+            return cls(
+                data["sentences"],
+                data["offsets"],
+                data["words"],
+                data["durations"],
+                data.get("words_per_minute", WORDS_PER_MINUTE),
+                data.get("script_uri"),
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Malformed script index: {e}") from e
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the compact, JSON-serialisable form of the index."""
+        return {
+            "version": INDEX_VERSION,
+            "script_uri": self.script_uri,
+            "words_per_minute": self.words_per_minute,
+            "sentences": self.sentences,
+            "offsets": [list(span) for span in self.offsets],
+            "words": self.words,
+            "durations": self.durations,
+        }
+
+    def __len__(self) -> int:
+        """Return the number of sentences."""
+        return len(self.sentences)
+
+    @property
+    def word_count(self) -> int:
+        """Total number of words in the script."""
+        return sum(self.words)
+
+    @property
+    def duration_sec(self) -> float:
+        """Estimated speaking time of the whole script, in seconds."""
+        return sum(self.durations)
+
+
+def load_script_index(value: Any = None, script_uri: Optional[str] = None) -> Optional[ScriptIndex]:
+    """Return the script index a stage was given.
+
+    Args:
+        value: The index itself (as produced by `ScriptIndex.to_dict`) or
+            the URI of a stored index.
+        script_uri: URI of the script, indexed here when no index is given
+            so callers that only pass the script keep working.
+
+    Returns:
+        The index, or `None` when neither the index nor the script exists.
+
+    Raises:
+        ValueError: If the index is malformed.
+    """
+    try:
+        if isinstance(value, dict):
+            return ScriptIndex.from_dict(value)
+        if value:
+            with open(fetch(value), "r", encoding="utf-8") as f:
+                return ScriptIndex.from_dict(json.load(f))
+        if script_uri:
+            with open(fetch(script_uri), "r", encoding="utf-8") as f:
+                return ScriptIndex.from_text(f.read(), script_uri=script_uri)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Malformed script index: {e}") from e
+    return None
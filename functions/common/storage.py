@@ -0,0 +1,383 @@
+"""Storage layer shared by the Cloud Function handlers.
+
+Handlers do their work on local files under `outputs/` and then publish the
+results through a `StorageBackend`.  Inputs named by URI are fetched back to
+a local path before use.  Three backends are available:
+
+* `LocalBackend` keeps everything under `outputs/`.  Its URIs are plain
+  relative paths, so publishing and fetching cost nothing.  This is what the
+  local test harnesses use.
+* `MemoryBackend` is an in-process fake object store with `mem://bucket/key`
+  URIs.  It lets the upload and download paths be exercised without
+  credentials.
+* `GCSBackend` stores objects in Cloud Storage under `gs://bucket/key`.
+
+`get_backend(bucket)` picks the backend for a request's `gcs_bucket` value.
+An empty value or `"local"` selects the local backend, `"mem://name"` the
+in-memory one, and anything else a Cloud Storage bucket.  The
+`STORAGE_BACKEND` environment variable (`local`, `memory` or `gcs`)
+overrides this choice, which lets the deployed workflow definition run
+against local handlers unchanged.  `backend_for_uri(uri)` picks the backend
+from a URI's scheme.
+
+Backends and the Cloud Storage client are created once per process and
+shared by every request.  The Cloud Storage library is imported when the
+client is first needed, so handlers that never touch a bucket do not pay
+for it on a cold start.  `upload_many` and `download_many` move a whole
+frame set on a thread pool rather than one object at a time.
+"""
+
+import abc
+import os
+import shutil
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+BACKEND_ENV = "STORAGE_BACKEND"
+LOCAL_ROOT = "outputs"
+# Where objects fetched from a remote backend are written; a folder in the
+# system temporary directory when unset.
+DOWNLOAD_ROOT: Optional[str] = None
+DEFAULT_TRANSFER_WORKERS = 8
+
+_lock = threading.RLock()
+_backends: Dict[Tuple[str, str], "StorageBackend"] = {}
+_gcs_client = None
+# Objects of every `MemoryBackend`, by bucket and key.
+_memory_objects: Dict[str, Dict[str, bytes]] = {}
+
+
+def gcs_client():
+    """Return the process-wide Cloud Storage client, creating it once."""
+    global _gcs_client
+    with _lock:
+        if _gcs_client is None:
+            try:
+                from google.cloud import storage as gcs  # type: ignore
+            except ImportError:  # pragma: no cover - only needed for the Cloud Storage backend
+                raise RuntimeError("google-cloud-storage is required for the Cloud Storage backend") from None
+            _gcs_client = gcs.Client()
+        return _gcs_client
+
+
+def _key_for(path: str) -> str:
+    """Return the object key for a local working file.
+
+    Files under `outputs/` keep their relative path (`<run_id>_media/...`),
+    and anything else is stored under its base name.
+    """
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(LOCAL_ROOT))
+    if relative.startswith(os.pardir):
+        relative = os.path.basename(path)
+    return relative.replace(os.sep, "/")
+
+
+def _map(fn: Callable, items: List, workers: int) -> List:
+    """Apply `fn` to `items` on up to `workers` threads, keeping the order."""
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+
+class StorageBackend(abc.ABC):
+    """Interface shared by the storage backends.
+
+    Subclasses must implement the abstract `uri`, `put_file`, `fetch`,
+    `put_bytes`, `get_bytes` and `exists`; one that misses any of them
+    cannot be instantiated.  The bulk helpers are built on top of them.
+    """
+
+    scheme = ""
+    bucket = ""
+
+    @abc.abstractmethod
+    def uri(self, key: str) -> str:
+        """Return the URI an object stored under `key` is addressed by."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def put_file(self, path: str, key: Optional[str] = None) -> str:
+        """Store the local file `path` and return its URI.
+
+        Args:
+            path: Local file to store.
+            key: Object key; derived from `path` when omitted.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def fetch(self, uri: str, dest: Optional[str] = None) -> str:
+        """Make the object at `uri` available locally and return its path.
+
+        Args:
+            uri: URI of the object.
+            dest: Where to write it; a path under `DOWNLOAD_ROOT` is used
+                when omitted.  Backends that already hold the object as a
+                local file may return that file instead.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def put_bytes(self, data: bytes, key: str) -> str:
+        """Store `data` under `key` and return its URI."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_bytes(self, uri: str) -> bytes:
+        """Return the contents of the object at `uri`."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def exists(self, uri: str) -> bool:
+        """Return whether an object exists at `uri`."""
+        raise NotImplementedError
+
+    def key_of(self, uri: str) -> str:
+        """Return the object key of a URI belonging to this backend."""
+        prefix = f"{self.scheme}://{self.bucket}/"
+        if not uri.startswith(prefix):
+            raise ValueError(f"{uri!r} does not belong to {prefix}")
+        return uri[len(prefix):]
+
+    def _download_path(self, uri: str) -> str:
+        root = DOWNLOAD_ROOT
+        if root is None:
+            import tempfile
+
+            root = os.path.join(tempfile.gettempdir(), "black_news_storage")
+        return os.path.join(root, self.scheme, self.bucket, *self.key_of(uri).split("/"))
+
+    def upload_many(self, paths: Iterable[str], workers: int = DEFAULT_TRANSFER_WORKERS) -> List[str]:
+        """Store several local files concurrently.
+
+        Returns:
+            The URIs, in the order of `paths`.
+        """
+        return _map(self.put_file, list(paths), workers)
+
+    def download_many(self, uris: Iterable[str], workers: int = DEFAULT_TRANSFER_WORKERS) -> List[str]:
+        """Fetch several objects concurrently.
+
+        Returns:
+            The local paths, in the order of `uris`.
+        """
+        return _map(self.fetch, list(uris), workers)
+
+
+class LocalBackend(StorageBackend):
+    """Files under a local directory, addressed by their relative path.
+
+    Args:
+        root: Directory objects are stored under.
+    """
+
+    scheme = "file"
+
+    def __init__(self, root: str = LOCAL_ROOT) -> None:
+        self.root = root
+        self.bucket = root
+
+    def uri(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def put_file(self, path: str, key: Optional[str] = None) -> str:
+        target = self.uri(key if key is not None else _key_for(path))
+        if os.path.abspath(target) != os.path.abspath(path):
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            shutil.copyfile(path, target)
+        return target
+
+    def fetch(self, uri: str, dest: Optional[str] = None) -> str:
+        if dest is None or os.path.abspath(dest) == os.path.abspath(uri):
+            return uri
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        shutil.copyfile(uri, dest)
+        return dest
+
+    def put_bytes(self, data: bytes, key: str) -> str:
+        target = self.uri(key)
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(data)
+        return target
+
+    def get_bytes(self, uri: str) -> bytes:
+        with open(uri, "rb") as f:
+            return f.read()
+
+    def exists(self, uri: str) -> bool:
+        return os.path.isfile(uri)
+
+    def upload_many(self, paths: Iterable[str], workers: int = DEFAULT_TRANSFER_WORKERS) -> List[str]:
+        # Files already under the root are not copied, so a pool would only
+        # add overhead.
+        return [self.put_file(path) for path in paths]
+
+    def download_many(self, uris: Iterable[str], workers: int = DEFAULT_TRANSFER_WORKERS) -> List[str]:
+        return list(uris)
+
+
+class MemoryBackend(StorageBackend):
+    """In-process fake object store.
+
+    Every instance for the same bucket shares one set of objects, so
+    handlers called in the same process see each other's outputs.
+
+    Args:
+        bucket: Bucket name.
+    """
+
+    scheme = "mem"
+
+    def __init__(self, bucket: str) -> None:
+        self.bucket = bucket
+        with _lock:
+            self.objects = _memory_objects.setdefault(bucket, {})
+
+    def uri(self, key: str) -> str:
+        return f"mem://{self.bucket}/{key}"
+
+    def put_file(self, path: str, key: Optional[str] = None) -> str:
+        with open(path, "rb") as f:
+            return self.put_bytes(f.read(), key if key is not None else _key_for(path))
+
+    def fetch(self, uri: str, dest: Optional[str] = None) -> str:
+        dest = dest or self._download_path(uri)
+        data = self.get_bytes(uri)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(dest, "wb") as f:
+            f.write(data)
+        return dest
+
+    def put_bytes(self, data: bytes, key: str) -> str:
+        self.objects[key] = bytes(data)
+        return self.uri(key)
+
+    def get_bytes(self, uri: str) -> bytes:
+        try:
+            return self.objects[self.key_of(uri)]
+        except KeyError:
+            raise FileNotFoundError(uri) from None
+
+    def exists(self, uri: str) -> bool:
+        return self.key_of(uri) in self.objects
+
+
+class GCSBackend(StorageBackend):
+    """Objects in a Cloud Storage bucket.
+
+    Args:
+        bucket: Bucket name.
+        client: Storage client to use; the shared one when omitted.
+    """
+
+    scheme = "gs"
+
+    def __init__(self, bucket: str, client=None) -> None:
+        self.bucket = bucket
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or gcs_client()
+
+    def _blob(self, key: str):
+        return self.client.bucket(self.bucket).blob(key)
+
+    def uri(self, key: str) -> str:
+        return f"gs://{self.bucket}/{key}"
+
+    def put_file(self, path: str, key: Optional[str] = None) -> str:
+        key = key if key is not None else _key_for(path)
+        self._blob(key).upload_from_filename(path)
+        return self.uri(key)
+
+    def fetch(self, uri: str, dest: Optional[str] = None) -> str:
+        dest = dest or self._download_path(uri)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        self._blob(self.key_of(uri)).download_to_filename(dest)
+        return dest
+
+    def put_bytes(self, data: bytes, key: str) -> str:
+        self._blob(key).upload_from_string(data)
+        return self.uri(key)
+
+    def get_bytes(self, uri: str) -> bytes:
+        return self._blob(self.key_of(uri)).download_as_bytes()
+
+    def exists(self, uri: str) -> bool:
+        return self._blob(self.key_of(uri)).exists()
+
+
+def _shared(kind: str, bucket: str) -> StorageBackend:
+    with _lock:
+        backend = _backends.get((kind, bucket))
+        if backend is None:
+            if kind == "local":
+                backend = LocalBackend()
+            elif kind == "memory":
+                backend = MemoryBackend(bucket)
+            else:
+                backend = GCSBackend(bucket)
+            _backends[(kind, bucket)] = backend
+        return backend
+
+
+def get_backend(bucket: Optional[str] = None) -> StorageBackend:
+    """Return the shared backend for a request's bucket value.
+
+    Raises:
+        ValueError: If `STORAGE_BACKEND` names an unknown backend.
+    """
+    bucket = (bucket or "").strip()
+    kind = os.environ.get(BACKEND_ENV, "").strip().lower()
+    if bucket.startswith("mem://"):
+        bucket = bucket[len("mem://"):]
+        kind = kind or "memory"
+    if not kind:
+        kind = "local" if bucket in ("", "local") else "gcs"
+    if kind not in ("local", "memory", "gcs"):
+        raise ValueError(f"Unknown {BACKEND_ENV} value: {kind!r}")
+    if kind == "gcs" and bucket in ("", "local"):
+        raise ValueError("A Cloud Storage bucket name is required")
+    return _shared(kind, bucket or "local")
+
+
+def backend_for_uri(uri: str) -> StorageBackend:
+    """Return the shared backend that owns `uri`."""
+    if uri.startswith("gs://"):
+        return _shared("gcs", uri[len("gs://"):].split("/", 1)[0])
+    if uri.startswith("mem://"):
+        return _shared("memory", uri[len("mem://"):].split("/", 1)[0])
+    return _shared("local", "local")
+
+
+def fetch(uri: str, dest: Optional[str] = None) -> str:
+    """Return a local path holding the object at `uri`."""
+    return backend_for_uri(uri).fetch(uri, dest)
+
+
+def download_many(uris: List[str], workers: int = DEFAULT_TRANSFER_WORKERS) -> List[str]:
+    """Fetch objects that may live in different backends, keeping the order.
+
+    URIs are grouped by backend so each group is transferred concurrently.
+    """
+    paths: List[Optional[str]] = [None] * len(uris)
+    groups: Dict[int, Tuple[StorageBackend, List[int]]] = {}
+    for i, uri in enumerate(uris):
+        backend = backend_for_uri(uri)
+        groups.setdefault(id(backend), (backend, []))[1].append(i)
+    for backend, indices in groups.values():
+        for i, path in zip(indices, backend.download_many([uris[i] for i in indices], workers)):
+            paths[i] = path
+    return paths  # type: ignore[return-value]
+
+
+def reset_memory_objects() -> None:
+    """Drop every object held by the in-memory backend."""
+    with _lock:
+        for objects in _memory_objects.values():
+            objects.clear()
@@ -0,0 +1,208 @@
+"""Content-addressed on-disk cache of rendered frames.
+
+Many sentences (sign-offs such as "Stay tuned for more details and
+insights.") recur in every run.  `FrameCache` stores each rendered PNG under
+a SHA-256 key derived from everything that affects its pixels: the sentence
+text, frame size, font and colours, plus `RENDER_VERSION`, which should be
+bumped whenever the renderer's output changes.
+
+Cached frames are served into a run's media folder by hard link where the
+filesystem allows it and by copy otherwise.  The store is capped at
+`max_bytes`; when it grows past the cap the least recently used entries
+(oldest modification time, refreshed on every hit) are evicted until it is
+back under `LOW_WATER` of the cap.  Evicting past the cap leaves room for
+many new frames before the next eviction, so the directory scan an
+eviction needs is amortised over them.  The cache's size is scanned once
+per process and then kept up to date in memory, so opening the cache for a
+request does not walk the tree.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+# Bump when `_draw_frame` output changes so stale entries are never served.
+RENDER_VERSION = 1
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Fraction of `max_bytes` an eviction shrinks the cache to.
+LOW_WATER = 0.9
+
+_lock = threading.Lock()
+# Total size of each cache directory, by absolute path, scanned once per
+# process and kept up to date by every `FrameCache` on it.
+_sizes: Dict[str, int] = {}
+
+
+def link_or_copy(src: str, dest: str) -> None:
+    """Place `src` at `dest` by hard link, falling back to a copy.
+
+    Any existing file at `dest` is removed first so that a later write to
+    `dest` can never modify a linked cache entry in place.
+    """
+    directory = os.path.dirname(dest)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if os.path.lexists(dest):
+        os.unlink(dest)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+class FrameCache:
+    """Size-capped LRU store of rendered frames keyed by content.
+
+    Args:
+        root: Directory holding the cache; created if missing.
+        max_bytes: Upper bound on the total size of cached files.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+        self._size_key = os.path.abspath(root)
+        with _lock:
+            if self._size_key not in _sizes:
+                _sizes[self._size_key] = sum(size for _, size, _ in self._entries())
+
+    @property
+    def _total_bytes(self) -> int:
+        return _sizes[self._size_key]
+
+    @staticmethod
+    def key(
+        text: str,
+        size: Tuple[int, int],
+        font: Sequence[Union[str, int, None]],
+        fill: Tuple[int, int, int],
+        background: Tuple[int, int, int],
+    ) -> str:
+        """Return the content address for a frame.
+
+        Args:
+            text: The sentence drawn on the frame.
+            size: `(width, height)` of the frame.
+            font: Identity of the font, as returned by `layout.font_key`:
+                its face name or glyph digest and its size.  Only strings,
+                integers and `None` are accepted, so the address is the same
+                in every process.
+            fill: Text colour.
+            background: Background colour.
+
+        Raises:
+            TypeError: If `font` holds anything else.
+        """
+        font_id = list(font)
+        if not all(part is None or isinstance(part, (str, int)) for part in font_id):
+            raise TypeError(f"Font identity must hold only strings and integers, got {font!r}")
+        payload = json.dumps(
+            [RENDER_VERSION, text, list(size), font_id, list(fill), list(background)],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        """Return the file path of the entry for `key`."""
+        return os.path.join(self.root, key[:2], f"{key}.png")
+
+    def fetch(self, key: str, dest: str) -> bool:
+        """Serve the entry for `key` at `dest` if it is cached.
+
+        Returns:
+            `True` on a hit, `False` on a miss.
+        """
+        path = self.path_for(key)
+        try:
+            link_or_copy(path, dest)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        # Refresh the entry's position in the LRU order.
+        os.utime(path)
+        self.hits += 1
+        return True
+
+    def store(self, key: str, src: str) -> None:
+        """Copy the rendered frame at `src` into the cache under `key`.
+
+        The entry is copied rather than linked so that the run's copy can
+        be overwritten freely, and it is moved into place atomically so
+        concurrent readers never see a partial file.
+        """
+        import tempfile
+
+        path = self.path_for(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(src, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        size = os.path.getsize(path)
+        with _lock:
+            _sizes[self._size_key] += size
+            if _sizes[self._size_key] > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters and the current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self._total_bytes,
+        }
+
+    def _entries(self):
+        """Yield `(path, size, mtime)` for every cached frame."""
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def _evict(self) -> None:
+        """Delete the least recently used entries down to `LOW_WATER` of the cap.
+
+        The tree is scanned afresh, which also picks up entries stored by
+        other processes.  Called with `_lock` held.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * LOW_WATER)
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+        _sizes[self._size_key] = total
+
+
+def open_cache(root: Optional[str], max_bytes: Optional[int] = None) -> Optional[FrameCache]:
+    """Return a `FrameCache` for `root`, or `None` when caching is disabled."""
+    if not root:
+        return None
+    return FrameCache(root, DEFAULT_MAX_BYTES if max_bytes is None else int(max_bytes))
@@ -0,0 +1,174 @@
+"""Cached, incremental text layout for slide frames.
+
+The original wrap loop in `_create_image` re-measured the whole growing line
+for every word and then measured every finished line twice more, which makes
+the number of measurement calls quadratic in the sentence length.  This
+module measures each distinct word once per font, keeps the widths in a
+per-font cache and builds lines by adding cached widths together.  The
+resulting `LineBox` objects carry the final position of every line so that
+centring and drawing reuse them without measuring again.
+
+Line widths are computed as the sum of the word widths plus one space width
+between words.  This is exact for Pillow's built-in bitmap font, which has
+no kerning; for TrueType fonts it can differ from a full-line measurement by
+a pixel or two at most.
+"""
+
+import hashlib
+import os
+import string
+import weakref
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+Size = Tuple[int, int]
+
+
+class LineBox(NamedTuple):
+    """A laid-out line of text and its position on the frame."""
+
+    text: str
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+def _text_size(draw, text: str, font) -> Size:
+    """Measure `text` with whichever API the installed Pillow provides."""
+    if hasattr(draw, "textsize"):
+        return draw.textsize(text, font=font)
+    # Pillow >= 10 removed `textsize`; the bottom-right corner of the
+    # bounding box anchored at the origin is its equivalent.
+    _, _, right, bottom = draw.textbbox((0, 0), text, font=font)
+    return right, bottom
+
+
+class TextLayout:
+    """Word-width cache and line builder for a single font.
+
+    Args:
+        font: Pillow font used for measuring.
+        line_spacing: Extra vertical space added below every line.
+        measure: Optional callable returning the `(width, height)` of a
+            string.  Defaults to measuring on a private 1x1 scratch canvas.
+    """
+
+    def __init__(
+        self,
+        font,
+        line_spacing: int = 10,
+        measure: Optional[Callable[[str], Size]] = None,
+    ) -> None:
+        self.font = font
+        self.line_spacing = line_spacing
+        if measure is None:
+            from PIL import Image, ImageDraw
+
+            scratch = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+            measure = lambda text: _text_size(scratch, text, font)  # noqa: E731
+        self._measure = measure
+        self._sizes: Dict[str, Size] = {}
+        self.measure_calls = 0
+
+    def size(self, word: str) -> Size:
+        """Return the cached `(width, height)` of `word`, measuring it once."""
+        size = self._sizes.get(word)
+        if size is None:
+            size = self._measure(word)
+            self.measure_calls += 1
+            self._sizes[word] = size
+        return size
+
+    def wrap(self, text: str, max_width: int) -> List[Tuple[str, int, int]]:
+        """Greedily wrap `text` into lines no wider than `max_width`.
+
+        Returns:
+            `(line, width, height)` tuples in reading order.  A single word
+            wider than `max_width` gets a line of its own.
+        """
+        space_width = self.size(" ")[0]
+        lines: List[Tuple[str, int, int]] = []
+        words: List[str] = []
+        line_width = line_height = 0
+        for word in text.split():
+            word_width, word_height = self.size(word)
+            candidate = line_width + space_width + word_width if words else word_width
+            if words and candidate > max_width:
+                lines.append((" ".join(words), line_width, line_height))
+                words, line_width, line_height = [word], word_width, word_height
+            else:
+                words.append(word)
+                line_width = candidate
+                line_height = max(line_height, word_height)
+        if words:
+            lines.append((" ".join(words), line_width, line_height))
+        return lines
+
+    def layout(self, text: str, frame_size: Size, margin: int = 50) -> List[LineBox]:
+        """Wrap `text` and centre the lines on a frame of `frame_size`.
+
+        Args:
+            text: The text to lay out.
+            frame_size: `(width, height)` of the target frame.
+            margin: Horizontal margin kept clear on each side.
+
+        Returns:
+            Positioned line boxes, ready to be drawn.
+        """
+        width, height = frame_size
+        lines = self.wrap(text, width - 2 * margin)
+        total_height = sum(h + self.line_spacing for _, _, h in lines)
+        y = (height - total_height) // 2
+        boxes: List[LineBox] = []
+        for line, w, h in lines:
+            boxes.append(LineBox(line, (width - w) // 2, y, w, h))
+            y += h + self.line_spacing
+        return boxes
+
+
+_layouts: Dict[Hashable, TextLayout] = {}
+# Glyph digests of fonts without a file path, computed once per font object.
+_glyph_digests: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_PROBE_TEXT = string.ascii_letters + string.digits + string.punctuation
+
+
+def _glyph_digest(font) -> str:
+    """Return a digest of how `font` draws the printable ASCII characters."""
+    from PIL import Image, ImageDraw
+
+    digest = hashlib.sha256()
+    for char in _PROBE_TEXT:
+        size = _text_size(ImageDraw.Draw(Image.new("L", (1, 1))), char, font)
+        img = Image.new("L", (max(1, size[0]), max(1, size[1])))
+        ImageDraw.Draw(img).text((0, 0), char, font=font, fill=255)
+        digest.update(repr(img.size).encode("ascii"))
+        digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+def font_key(font) -> Tuple:
+    """Identify a font by face and size rather than by object identity.
+
+    Fonts loaded from a file are keyed by its path and the size.  Fonts
+    without one, such as Pillow's bitmap default or a font loaded from a
+    file object (Pillow >= 10.1 loads its default font from a `BytesIO`),
+    are keyed by a digest of their glyphs instead.  The key holds only
+    strings and integers, so different fonts never share a layout and the
+    key is the same in every process (the frame cache relies on that).
+    """
+    path = getattr(font, "path", None)
+    if isinstance(path, (str, bytes, os.PathLike)):
+        return (type(font).__name__, os.fsdecode(path), getattr(font, "size", None))
+    digest = _glyph_digests.get(font)
+    if digest is None:
+        digest = _glyph_digests[font] = _glyph_digest(font)
+    return (type(font).__name__, digest)
+
+
+def get_layout(font) -> TextLayout:
+    """Return the process-wide `TextLayout` for `font`, creating it once."""
+    key = font_key(font)
+    layout = _layouts.get(key)
+    if layout is None:
+        layout = _layouts[key] = TextLayout(font)
+    return layout
@@ -1,66 +1,433 @@
 """Media sourcing Cloud Function stub.
 
-This function accepts a JSON payload with `script` (path to the script
-file) and `gcs_bucket` (ignored in this stub).  It reads the script,
-breaks it into sentences and generates a simple placeholder image for
-each sentence.  The images are saved into an `outputs/<run_id>_media/`
-folder and the function returns a list of file paths.
+This function accepts a JSON payload with `script_index` (the sentence index
+emitted by the scriptwriter, see `functions/common/script_index.py`) and
+`gcs_bucket`.  It generates a simple placeholder image for each sentence of
+the index; callers that only pass `script` (URI of the script file) have it
+indexed here.  The images are rendered into an `outputs/<run_id>_media/`
+folder and then stored through the shared storage layer, which uploads the
+whole frame set concurrently when a bucket is given.  The function returns
+the list of frame URIs.
 
-Pillow is used to render the text; no external images are downloaded.
+Frames can be rendered in parallel by passing `workers` in the payload; each
+pool process loads the font and allocates the blank canvas once and reuses
+them for every frame it renders.  The order of `media_uris` always follows
+the order of the sentences in the script.
+
+With `media_manifest` set, the frame URIs are written to a compact
+manifest, `outputs/<run_id>_media_manifest.txt` (see
+`functions/common/media_manifest.py`), instead of being returned inline.
+The response then holds only its `media_manifest_uri` and `frame_count`,
+so its size no longer grows with the number of sentences.
+
+For in-process pipelines (`test_pipeline.py --handoff memory`) the payload
+may set `output` to `"memory"`.  Frames are then returned as a lazy iterator
+of BGR NumPy arrays under `frames` instead of being PNG-encoded to disk, so
+video assembly can consume them without an encode/decode round trip.  This
+mode is only meaningful when the handlers are called directly in Python; the
+file-based contract remains the default.
+
+`output` may also be `"store"`: the frames are then rendered straight into a
+single memory-mapped frame store, `outputs/<run_id>_frames.bnf` (see
+`functions/common/frame_store.py`), instead of one PNG per sentence.  The
+response carries its `frame_store_uri` and `frame_count`.  With `workers`,
+every pool process writes its frames into the shared file directly.  The
+frame cache only applies to PNG output.
+
+Rendered frames can be shared across runs through a content-addressed cache
+(see `frame_cache.py`).  Set `cache_dir` in the payload or the
+`FRAME_CACHE_DIR` environment variable to enable it; cached frames are hard
+linked (or copied) into the run's media folder instead of being re-rendered.
+
+Pillow is used to render the text; no external images are downloaded.  It
+is imported on first use rather than at module load, so a cold instance only
+pays for it when it renders.  `warm_up()` loads Pillow, the font and the blank
+canvas ahead of time.  It runs when a request sets `warm_up`, or at import
+when the `WARM_UP_ON_LOAD` environment variable is set.
 """
 
+from collections import deque
 import os
-import json
-from typing import List
-from PIL import Image, ImageDraw, ImageFont
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    from .frame_cache import FrameCache, link_or_copy, open_cache
+    from .layout import font_key, get_layout
+    from .raster import FrameRasteriser
+except ImportError:  # pragma: no cover - deployed as a standalone function
+    from frame_cache import FrameCache, link_or_copy, open_cache
+    from layout import font_key, get_layout
+    from raster import FrameRasteriser
 
 try:
     from flask import Request  # type: ignore
 except ImportError:  # pragma: no cover
     Request = object  # type: ignore
 
+try:
+    from functions.common.frame_store import EXTENSION, FrameStoreWriter
+    from functions.common.instrumentation import NULL_METRICS, Metrics
+    from functions.common.media_manifest import write_media_manifest
+    from functions.common.payload import PayloadError, decode_request, run_batch
+    from functions.common.script_index import load_script_index
+    from functions.common.storage import DEFAULT_TRANSFER_WORKERS, get_backend
+except ImportError:  # pragma: no cover - deployed with common/ next to main.py
+    from common.frame_store import EXTENSION, FrameStoreWriter
+    from common.instrumentation import NULL_METRICS, Metrics
+    from common.media_manifest import write_media_manifest
+    from common.payload import PayloadError, decode_request, run_batch
+    from common.script_index import load_script_index
+    from common.storage import DEFAULT_TRANSFER_WORKERS, get_backend
+
+
+FRAME_SIZE = (1280, 720)
+TEXT_COLOR = (255, 255, 255)
+BACKGROUND_COLOR = (0, 0, 0)
+# `"atlas"` composes frames from a glyph atlas (see `raster.py`); `"pil"`
+# draws every line with `ImageDraw.text`.
+RASTERISERS = ("atlas", "pil")
+DEFAULT_RASTERISER = "atlas"
+# Most jobs sent to a pool process at once, and chunks in flight per process.
+# Together they bound how many rendered frames wait for the consumer.
+MAX_CHUNK_JOBS = 8
+CHUNKS_IN_FLIGHT = 2
+
+# Per-process rendering state.  `_init_worker` fills these in once per pool
+# process (or lazily in the calling process for serial rendering).
+_worker_font = None
+_worker_canvas = None
+_worker_atlas = None
+_worker_rasteriser = DEFAULT_RASTERISER
+# Frame store a pool process renders into, opened by `_init_store_worker`.
+_worker_store = None
+
+
+def _init_worker(rasteriser: str = DEFAULT_RASTERISER) -> None:
+    """Load the font and set up `rasteriser` for this process.
+
+    The font, blank canvas and glyph atlas are created once and kept for
+    later calls.
+    """
+    global _worker_font, _worker_canvas, _worker_atlas, _worker_rasteriser
+    from PIL import Image, ImageFont
+
+    if _worker_font is None:
+        # Use a basic Pillow built‑in font; this avoids external dependencies.
+        _worker_font = ImageFont.load_default()
+    if rasteriser == "atlas":
+        if _worker_atlas is None:
+            _worker_atlas = FrameRasteriser(_worker_font, FRAME_SIZE, TEXT_COLOR, BACKGROUND_COLOR)
+    elif _worker_canvas is None:
+        _worker_canvas = Image.new("RGB", FRAME_SIZE, color=BACKGROUND_COLOR)
+    _worker_rasteriser = rasteriser
+
+
+def _draw_frame(text: str, font=None, canvas=None, metrics=NULL_METRICS):
+    """Render `text` as white on black and return the Pillow image.
+
+    Args:
+        text: The text to display.
+        font: Optional preloaded font; the default Pillow font is loaded
+            when omitted.
+        canvas: Optional blank canvas to copy instead of allocating a new
+            image.
+        metrics: Receives `text_layout` and `raster` timings.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    width, height = FRAME_SIZE
+    if canvas is not None:
+        img = canvas.copy()
+    else:
+        img = Image.new("RGB", (width, height), color=BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(img)
+    if font is None:
+        font = ImageFont.load_default()
+
+    # Wrap and centre the text using cached word widths; the line boxes
+    # already carry their final positions.
+    with metrics.span("text_layout"):
+        boxes = get_layout(font).layout(text, (width, height))
+    with metrics.span("raster"):
+        for box in boxes:
+            draw.text((box.x, box.y), box.text, font=font, fill=TEXT_COLOR)
+    return img
 
-def _create_image(text: str, path: str) -> None:
+
+def _create_image(text: str, path: str, font=None, canvas=None, metrics=NULL_METRICS) -> None:
     """Create a simple image with white text on a black background.
 
     Args:
         text: The text to display.
         path: Output file path.
+        font: Optional preloaded font; the default Pillow font is loaded
+            when omitted.
+        canvas: Optional blank canvas to copy instead of allocating a new
+            image.
+        metrics: Receives `text_layout`, `raster` and `png_encode` timings.
     """
-    width, height = 1280, 720
-    img = Image.new("RGB", (width, height), color=(0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    # Use a basic Pillow built‑in font; this avoids external dependencies.
-    font = ImageFont.load_default()
-
-    # Wrap text if it's too long
-    max_width = width - 100
-    lines: List[str] = []
-    words = text.split()
-    current_line = ""
-    for word in words:
-        # Check if adding the next word would exceed the max width
-        test_line = f"{current_line} {word}".strip()
-        w, _ = draw.textsize(test_line, font=font)
-        if w <= max_width:
-            current_line = test_line
-        else:
-            lines.append(current_line)
-            current_line = word
-    if current_line:
-        lines.append(current_line)
-
-    # Calculate starting y position so text is vertically centred
-    total_height = sum(draw.textsize(line, font=font)[1] + 10 for line in lines)
-    y = (height - total_height) // 2
-    for line in lines:
-        w, h = draw.textsize(line, font=font)
-        x = (width - w) // 2
-        draw.text((x, y), line, font=font, fill=(255, 255, 255))
-        y += h + 10
+    _save_png(_draw_frame(text, font=font, canvas=canvas, metrics=metrics), path, metrics)
+
+
+def _draw_frame_array(text: str, metrics=NULL_METRICS, out=None):
+    """Render `text` with this process's glyph atlas as a BGR array.
+
+    Produces the same pixels as `_draw_frame` (see `raster.py`).  The frame
+    is drawn into `out` when given.
+    """
+    with metrics.span("text_layout"):
+        boxes = get_layout(_worker_font).layout(text, FRAME_SIZE)
+    with metrics.span("raster"):
+        return _worker_atlas.render(boxes, out=out)
 
+
+def _save_png(img, path: str, metrics=NULL_METRICS) -> None:
+    """Write a Pillow image, or a BGR frame array, to `path` as a PNG."""
+    if not hasattr(img, "save"):
+        from PIL import Image
+
+        height, width = img.shape[:2]
+        img = Image.frombuffer("RGB", (width, height), img, "raw", "BGR", 0, 1)
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    img.save(path)
+    # The path may be a hard link into the frame cache from an earlier run;
+    # unlink it so saving never rewrites the cached file in place.
+    if os.path.lexists(path):
+        os.unlink(path)
+    with metrics.span("png_encode"):
+        img.save(path)
+
+
+def _to_bgr_array(img):
+    """Convert a Pillow RGB image into a contiguous BGR `uint8` array."""
+    import numpy as np  # type: ignore
+
+    width, height = img.size
+    return np.frombuffer(img.tobytes("raw", "BGR"), dtype=np.uint8).reshape(height, width, 3)
+
+
+def _render_frame(job: Tuple[str, Optional[str]], metrics=NULL_METRICS):
+    """Render a single `(text, path)` job using the per-process state.
+
+    Pool workers call this without `metrics`; only serial rendering in the
+    handler's own process records per-phase timings.
+
+    Returns:
+        `path` once the PNG has been written, or the frame as a BGR array
+        when `path` is `None`.
+    """
+    if _worker_font is None:
+        _init_worker()
+    text, path = job
+    if _worker_rasteriser == "atlas":
+        frame = _draw_frame_array(text, metrics)
+        if path is None:
+            return frame
+        _save_png(frame, path, metrics)
+        return path
+    if path is None:
+        return _to_bgr_array(_draw_frame(text, font=_worker_font, canvas=_worker_canvas, metrics=metrics))
+    _create_image(text, path, font=_worker_font, canvas=_worker_canvas, metrics=metrics)
+    return path
+
+
+def _render_into(text: str, out, metrics=NULL_METRICS) -> None:
+    """Render `text` into the BGR frame array `out` using the per-process state."""
+    if _worker_font is None:
+        _init_worker()
+    if _worker_rasteriser == "atlas":
+        _draw_frame_array(text, metrics, out=out)
+    else:
+        out[...] = _to_bgr_array(_draw_frame(text, font=_worker_font, canvas=_worker_canvas, metrics=metrics))
+
+
+def _init_store_worker(rasteriser: str, store_path: str) -> None:
+    """Set up a pool process to render into the frame store at `store_path`."""
+    global _worker_store
+    _init_worker(rasteriser)
+    _worker_store = FrameStoreWriter(store_path, create=False)
+
+
+def _render_store_frame(job: Tuple[int, str]) -> int:
+    """Render an `(index, text)` job into this process's frame store."""
+    index, text = job
+    _render_into(text, _worker_store.frame(index))
+    return index
+
+
+def _resolve_workers(requested: Optional[int], n_jobs: int) -> int:
+    """Return the number of render processes to use.
+
+    `None` or `1` renders serially in the calling process, `0` sizes the
+    pool to the available cores, and any other value is used as given.  The
+    result never exceeds the number of jobs.
+    """
+    if requested is None:
+        return 1
+    workers = int(requested)
+    if workers <= 0:
+        try:
+            workers = len(os.sched_getaffinity(0))
+        except AttributeError:  # pragma: no cover - not available on all platforms
+            workers = os.cpu_count() or 1
+    return max(1, min(workers, n_jobs))
+
+
+def _render_chunk(jobs: List[Tuple[str, Optional[str]]]) -> list:
+    """Render a chunk of jobs in a pool process."""
+    return [_render_frame(job) for job in jobs]
+
+
+def _iter_rendered(
+    jobs: List[Tuple[str, Optional[str]]],
+    workers: int = 1,
+    metrics=NULL_METRICS,
+    rasteriser: str = DEFAULT_RASTERISER,
+) -> Iterator:
+    """Render frames serially or across a process pool, yielding in order.
+
+    Args:
+        jobs: `(text, path)` pairs in output order; a `None` path renders
+            the frame to an in-memory array instead of a PNG.
+        workers: Number of processes to render with.
+        metrics: Receives per-phase timings when rendering serially.
+        rasteriser: One of `RASTERISERS`.
+
+    Yields:
+        The result of `_render_frame` for each job, in the order of `jobs`.
+        At most `CHUNKS_IN_FLIGHT` chunks per worker are submitted or
+        finished but not yet consumed, so a slow consumer holds a bounded
+        number of frames however many jobs there are.
+    """
+    if workers <= 1:
+        if _worker_font is None or _worker_rasteriser != rasteriser:
+            _init_worker(rasteriser)
+        for job in jobs:
+            yield _render_frame(job, metrics)
+        return
+    # A few chunks per worker keeps IPC overhead low while still balancing
+    # sentences of different lengths.
+    chunksize = max(1, min(MAX_CHUNK_JOBS, len(jobs) // (workers * 4)))
+    chunks = (jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize))
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending: deque = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rasteriser,)) as pool:
+        for chunk in chunks:
+            pending.append(pool.submit(_render_chunk, chunk))
+            if len(pending) >= workers * CHUNKS_IN_FLIGHT:
+                break
+        # Results are consumed in submission order, so `media_uris` stays
+        # deterministic regardless of which worker finishes first.
+        while pending:
+            results = pending.popleft().result()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(pool.submit(_render_chunk, chunk))
+            yield from results
+
+
+def _render_frames(
+    jobs: List[Tuple[str, str]],
+    workers: int = 1,
+    metrics=NULL_METRICS,
+    rasteriser: str = DEFAULT_RASTERISER,
+) -> List[str]:
+    """Render frames to PNG files and return their paths in job order."""
+    return list(_iter_rendered(jobs, workers, metrics, rasteriser))
+
+
+def _render_store(
+    sentences: List[str],
+    path: str,
+    workers: int = 1,
+    metrics=NULL_METRICS,
+    rasteriser: str = DEFAULT_RASTERISER,
+) -> str:
+    """Render one frame per sentence into a new frame store at `path`.
+
+    Frames are drawn in place in the mapped file: serially in this process,
+    or by pool processes that each map the same file and fill the slots of
+    the sentences they are given.
+
+    Returns:
+        `path`.
+    """
+    with FrameStoreWriter(path, len(sentences), FRAME_SIZE) as store:
+        if workers <= 1:
+            if _worker_font is None or _worker_rasteriser != rasteriser:
+                _init_worker(rasteriser)
+            for index, text in enumerate(sentences):
+                _render_into(text, store.frame(index), metrics)
+            return path
+        chunksize = max(1, len(sentences) // (workers * 4))
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_store_worker, initargs=(rasteriser, path)
+        ) as pool:
+            # Only frame indices come back; the pixels are already in the file.
+            for _ in pool.map(_render_store_frame, enumerate(sentences), chunksize=chunksize):
+                pass
+    return path
+
+
+def _render_frames_cached(
+    jobs: List[Tuple[str, str]],
+    workers: int,
+    cache: FrameCache,
+    metrics=NULL_METRICS,
+    rasteriser: str = DEFAULT_RASTERISER,
+) -> List[str]:
+    """Render frames, serving any already in `cache` instead of drawing them.
+
+    Sentences repeated within the run are rendered once and served from the
+    cache for every later occurrence.
+
+    Returns:
+        The output paths in the same order as `jobs`.
+    """
+    _init_worker(rasteriser)
+    font_id = font_key(_worker_font)
+    if rasteriser == "atlas" and not _worker_atlas.exact:
+        # Frames may differ from the Pillow renderer's by a few pixels.
+        font_id = (*font_id, rasteriser)
+    first_path: dict = {}
+    to_render: List[Tuple[str, str, str]] = []
+    repeats: List[Tuple[str, str]] = []
+    with metrics.span("cache_lookup"):
+        for text, path in jobs:
+            key = cache.key(text, FRAME_SIZE, font_id, TEXT_COLOR, BACKGROUND_COLOR)
+            if key in first_path:
+                repeats.append((key, path))
+                continue
+            first_path[key] = path
+            if not cache.fetch(key, path):
+                to_render.append((text, path, key))
+
+    with metrics.span("render"):
+        _render_frames([(text, path) for text, path, _ in to_render], workers, metrics, rasteriser)
+    with metrics.span("cache_store"):
+        for _, path, key in to_render:
+            cache.store(key, path)
+        for key, path in repeats:
+            if not cache.fetch(key, path):
+                # Evicted already because the cap is smaller than this run.
+                link_or_copy(first_path[key], path)
+    return [path for _, path in jobs]
+
+
+def warm_up() -> None:
+    """Do the one-off setup of a cold instance before the first request.
+
+    Imports Pillow and NumPy, loads the font, fills the glyph atlas with
+    the printable ASCII characters and primes the text layout for this
+    process.
+    """
+    import string
+
+    _init_worker()
+    _worker_atlas.line(string.printable.strip())
+    get_layout(_worker_font).layout("Warm up", FRAME_SIZE)
 
 
 def handle(request):  # type: ignore[override]
@@ -68,39 +435,146 @@ def handle(request):  # type: ignore[override]
 
     Args:
         request: Flask `Request` containing JSON with:
-            - script: Path to the script file produced by scriptwriter
-            - gcs_bucket: Unused placeholder for Cloud Storage bucket
+            - script_index: Script index produced by scriptwriter, or its
+              URI
+            - script: URI of the script file, indexed here when
+              `script_index` is omitted
+            - gcs_bucket: Storage bucket for the frames (`"local"` or
+              omitted keeps them under `outputs/`)
+            - transfer_workers: Optional number of concurrent frame uploads
+            - workers: Optional number of render processes (`0` uses
+              every available core; defaults to serial rendering)
+            - output: `"files"` (default), `"memory"` for in-process
+              handoff of frame arrays, or `"store"` for a single frame store
+              file
+            - rasteriser: `"atlas"` (default) or `"pil"`; both produce
+              the same frames with the default font
+            - cache_dir: Optional frame cache directory (defaults to the
+              `FRAME_CACHE_DIR` environment variable; unset disables caching)
+            - cache_max_bytes: Optional size cap for the frame cache
+            - media_manifest: When true, return the frame URIs as a media
+              manifest instead of inline `media_uris`
+            - warm_up: When true, only run `warm_up()` and return
+              `{"status": "warm"}`
+
+    Returns:
+        JSON response with the `frame_count` and a list of `media_uris`
+        pointing to the generated images (with `media_manifest`, the
+        `media_manifest_uri` in place of the list), or, in memory mode, a
+        lazy `frames` iterator and its `frame_count`, or, in store mode,
+        the `frame_store_uri` and its `frame_count`.
+        When the frame cache is enabled the response also includes its
+        `cache` counters.  Phase timings are added under `metrics` when the
+        payload sets `metrics`; in memory mode frames are rendered after the
+        response is returned, so their phases are not included.
+    """
+    metrics = Metrics("media_sourcing")
+    return metrics.finish(_handle(request, metrics))
+
+
+def handle_batch(request):  # type: ignore[override]
+    """Entry point for a batch of media sourcing jobs.
+
+    Runs every job through `handle` in this instance.  `warm_up()` runs once
+    for the whole batch, so every job reuses the loaded font and canvas.
+
+    Args:
+        request: Flask `Request` containing JSON with `jobs`, a list of
+            payloads as accepted by `handle`, run one after another.
 
     Returns:
-        JSON response with a list of `media_uris` pointing to generated images.
+        JSON response with each job's response (or `error`) under
+        `results`, in order, and `succeeded` and `failed` counts.
     """
+    return run_batch(request, handle, warm_up)
+
+
+def _handle(request, metrics: Metrics):
+    """Handle a request, recording phase timings in `metrics`."""
     # Parse input JSON similar to scriptwriter
-    if hasattr(request, "get_json"):
-        data = request.get_json(silent=True) or {}
-    elif isinstance(request, dict):
-        data = request
-    else:
+    with metrics.span("payload_parse"):
         try:
-            data = json.loads(request)  # type: ignore
-        except Exception:
-            return {"error": "Invalid JSON payload"}
-    script_path = data.get("script")
-    run_id = os.path.basename(script_path).split("_")[0] if script_path else "test"
+            data = decode_request(request)
+        except PayloadError as e:
+            return {"error": str(e)}
+    metrics.configure(data)
+    if data.get("warm_up"):
+        with metrics.span("warm_up"):
+            warm_up()
+        return {"status": "warm"}
+    try:
+        storage = get_backend(data.get("gcs_bucket"))
+        transfer_workers = int(data.get("transfer_workers") or DEFAULT_TRANSFER_WORKERS)
+    except ValueError as e:
+        return {"error": str(e)}
 
-    if not script_path or not os.path.exists(script_path):
+    with metrics.span("script_index"):
+        try:
+            index = load_script_index(data.get("script_index"), data.get("script"))
+        except ValueError as e:
+            return {"error": str(e)}
+    if index is None:
         return {"error": "Script file not found"}
+    sentences = index.sentences
+    script_uri = data.get("script") or index.script_uri
+    run_id = os.path.basename(script_uri).split("_")[0] if script_uri else "test"
 
-    # Read the script and split into sentences
-    with open(script_path, "r", encoding="utf-8") as f:
-        script_content = f.read()
-    # Simple split on periods; more robust NLP could be used here
-    sentences = [s.strip() for s in script_content.split(".") if s.strip()]
+    output = data.get("output", "files")
+    if output not in ("files", "memory", "store"):
+        return {"error": "Invalid output mode"}
+    rasteriser = data.get("rasteriser", DEFAULT_RASTERISER)
+    if rasteriser not in RASTERISERS:
+        return {"error": "Invalid rasteriser"}
+    try:
+        workers = _resolve_workers(data.get("workers"), len(sentences))
+    except (TypeError, ValueError):
+        return {"error": "Invalid workers value"}
+
+    if output == "memory":
+        # Rendering happens as the consumer pulls frames, and only a bounded
+        # window of rendered frames waits for it (see `_iter_rendered`).
+        memory_jobs = [(sentence, None) for sentence in sentences]
+        return {"frames": _iter_rendered(memory_jobs, workers, rasteriser=rasteriser), "frame_count": len(memory_jobs)}
+
+    if output == "store":
+        store_path = os.path.join("outputs", f"{run_id}_frames{EXTENSION}")
+        with metrics.span("render"):
+            _render_store(sentences, store_path, workers, metrics, rasteriser)
+        with metrics.span("storage_put"):
+            frame_store_uri = storage.put_file(store_path)
+        return {"frame_store_uri": frame_store_uri, "frame_count": len(sentences)}
 
     output_dir = os.path.join("outputs", f"{run_id}_media")
-    media_uris: List[str] = []
-    for idx, sentence in enumerate(sentences, start=1):
-        image_path = os.path.join(output_dir, f"frame_{idx}.png")
-        _create_image(sentence, image_path)
-        media_uris.append(image_path)
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [
+        (sentence, os.path.join(output_dir, f"frame_{idx}.png"))
+        for idx, sentence in enumerate(sentences, start=1)
+    ]
+    try:
+        cache = open_cache(
+            data.get("cache_dir", os.environ.get("FRAME_CACHE_DIR")),
+            data.get("cache_max_bytes", os.environ.get("FRAME_CACHE_MAX_BYTES")),
+        )
+    except (TypeError, ValueError):
+        return {"error": "Invalid cache_max_bytes value"}
+    if cache is None:
+        with metrics.span("render"):
+            frame_paths = _render_frames(jobs, workers, metrics, rasteriser)
+    else:
+        frame_paths = _render_frames_cached(jobs, workers, cache, metrics, rasteriser)
+
+    with metrics.span("storage_put"):
+        media_uris = storage.upload_many(frame_paths, workers=transfer_workers)
+        if data.get("media_manifest"):
+            manifest_path = os.path.join("outputs", f"{run_id}_media_manifest.txt")
+            write_media_manifest(manifest_path, media_uris)
+            response = {"media_manifest_uri": storage.put_file(manifest_path), "frame_count": len(media_uris)}
+        else:
+            response = {"media_uris": media_uris, "frame_count": len(media_uris)}
+    if cache is not None:
+        response["cache"] = cache.stats()
+    return response
+
 
-    return {"media_uris": media_uris}
\ No newline at end of file
+if os.environ.get("WARM_UP_ON_LOAD"):
+    warm_up()
@@ -0,0 +1,218 @@
+"""Glyph-atlas text rasteriser for slide frames.
+
+`ImageDraw.text` rasterises every glyph of every line again for each frame,
+and the Pillow image then has to be copied off the blank canvas and
+converted to BGR for video assembly.  Every frame uses the same font and
+colours, so `FrameRasteriser` renders each glyph's alpha mask once (the
+glyph atlas) and composes frames straight into a BGR NumPy buffer:
+
+* words are assembled from atlas glyphs at their advance widths and cached,
+  since news scripts repeat most of their vocabulary,
+* each line's alpha mask is built from its word masks with `np.maximum`,
+  the way FreeType glyphs are combined within a Pillow text mask,
+* the line is blended onto the frame in one vectorised step using Pillow's
+  own rounding, or copied through the mask when the font is a 1-bit bitmap.
+
+Accuracy: for bitmap fonts, including Pillow's built-in default font, glyphs
+have integer advances and no kerning, and each glyph is pasted over the
+inked rectangle it covers just as Pillow pastes it, so frames match
+`ImageDraw.text` pixel for pixel (`exact` is true).  For TrueType fonts the
+atlas places each glyph at its whole-pixel advance.  That matches Pillow's
+basic text layout (measured identical with Lato at several sizes), but a
+layout engine that kerns or positions glyphs at sub-pixel offsets (Pillow
+with libraqm) can shift a glyph by a pixel, changing anti-aliased edge
+pixels only.  `benchmarks/raster_throughput.py` reports the difference for
+a given font and fails above a chosen tolerance.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+Color = Tuple[int, int, int]
+# Distinct words kept in the word cache before it is cleared.
+WORD_CACHE_SIZE = 8192
+
+
+class _Mask:
+    """An alpha mask placed relative to a pen position."""
+
+    __slots__ = ("alpha", "x", "y", "advance")
+
+    def __init__(self, alpha, x: int, y: int, advance: float) -> None:
+        self.alpha = alpha
+        self.x = x
+        self.y = y
+        self.advance = advance
+
+
+class FrameRasteriser:
+    """Compose text frames from a glyph atlas of one font.
+
+    Args:
+        font: Pillow font the frames are drawn in.
+        frame_size: `(width, height)` of every frame.
+        text_color: RGB text colour.
+        background_color: RGB background colour.
+    """
+
+    def __init__(self, font, frame_size: Tuple[int, int], text_color: Color, background_color: Color) -> None:
+        import numpy as np  # type: ignore
+
+        self.font = font
+        self.frame_size = frame_size
+        width, height = frame_size
+        self._ink = np.array(text_color[::-1], dtype=np.uint32)
+        self._ink_u8 = np.array(text_color[::-1], dtype=np.uint8)
+        self._blank = np.empty((height, width, 3), dtype=np.uint8)
+        self._blank[:] = background_color[::-1]
+        self._glyphs: Dict[str, _Mask] = {}
+        self._words: Dict[str, _Mask] = {}
+        from PIL import ImageFont
+
+        # Output is guaranteed identical to Pillow's for bitmap fonts, whose
+        # 0/255 masks also let text be copied through them without blending.
+        self.exact = isinstance(font, ImageFont.ImageFont)
+        self._binary = self.exact
+
+    def glyph(self, ch: str) -> _Mask:
+        """Return the atlas entry for `ch`, rendering it on first use."""
+        mask = self._glyphs.get(ch)
+        if mask is None:
+            mask = self._glyphs[ch] = self._render(ch)
+            if self._binary and mask.alpha is not None and ((mask.alpha != 0) & (mask.alpha != 255)).any():
+                self._binary = False
+        return mask
+
+    def _render(self, ch: str) -> _Mask:
+        import numpy as np  # type: ignore
+        from PIL import Image, ImageDraw
+
+        advance = self.font.getlength(ch)
+        if self.exact:
+            # A bitmap glyph alone is cropped to its advance, losing pixels
+            # that overhang its neighbours; spaces on both sides (which
+            # have no pixels) keep them.
+            text, origin = f" {ch} ", (0, 0)
+            _, _, right, bottom = self.font.getbbox(text)
+            size, shift = (right, bottom), (-self.font.getlength(" "), 0)
+        else:
+            text = ch
+            left, top, right, bottom = self.font.getbbox(ch)
+            x0, y0 = min(left, 0), min(top, 0)
+            origin, size, shift = (-x0, -y0), (right - x0, bottom - y0), (x0, y0)
+        canvas = Image.new("L", (max(size[0], 1), max(size[1], 1)), 0)
+        # Drawing white on black in mode "L" yields exactly the alpha that
+        # `ImageDraw.text` blends an RGB frame with.
+        ImageDraw.Draw(canvas).text(origin, text, font=self.font, fill=255)
+        alpha = np.asarray(canvas)
+        rows, cols = np.nonzero(alpha)
+        if not len(rows):
+            return _Mask(None, 0, 0, advance)
+        # Keep only the inked rectangle: bitmap glyphs overwrite exactly
+        # that rectangle when Pillow draws a string.
+        top, bottom, left, right = rows.min(), rows.max() + 1, cols.min(), cols.max() + 1
+        return _Mask(alpha[top:bottom, left:right], int(left + shift[0]), int(top + shift[1]), advance)
+
+    def word(self, text: str) -> _Mask:
+        """Return the mask of a word composed from atlas glyphs."""
+        mask = self._words.get(text)
+        if mask is not None:
+            return mask
+        mask = self._compose([(0.0, self.glyph(ch)) for ch in text], overwrite=self.exact)
+        if len(self._words) >= WORD_CACHE_SIZE:
+            self._words.clear()
+        self._words[text] = mask
+        return mask
+
+    def _compose(self, parts: List[Tuple[float, _Mask]], overwrite: bool = False, crop: bool = False) -> _Mask:
+        """Combine masks at consecutive pen positions into one mask.
+
+        Args:
+            parts: `(gap, mask)` pairs: the pen advances by `gap` before the
+                mask is placed and by the mask's advance after it.
+            overwrite: Let each mask replace the rectangle it covers, as
+                Pillow pastes bitmap glyphs, instead of keeping the maximum
+                alpha, as FreeType glyphs are combined.
+            crop: Clip to the pen's path, as Pillow clips a bitmap-font
+                string to its advance width.
+        """
+        import numpy as np  # type: ignore
+
+        placed, pen = [], 0.0
+        for gap, mask in parts:
+            pen += gap
+            if mask.alpha is not None:
+                placed.append((int(round(pen)) + mask.x, mask.y, mask.alpha))
+            pen += mask.advance
+        if not placed:
+            return _Mask(None, 0, 0, pen)
+        x0 = min(x for x, _, _ in placed)
+        y0 = min(y for _, y, _ in placed)
+        x1 = max(x + a.shape[1] for x, _, a in placed)
+        y1 = max(y + a.shape[0] for _, y, a in placed)
+        if len(placed) == 1 and not crop:
+            return _Mask(placed[0][2], x0, y0, pen)
+        alpha = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        for x, y, a in placed:
+            region = alpha[y - y0:y - y0 + a.shape[0], x - x0:x - x0 + a.shape[1]]
+            if overwrite:
+                region[:] = a
+            else:
+                np.maximum(region, a, out=region)
+        if crop:
+            start, end = max(0, -x0), min(x1, int(round(pen))) - x0
+            if end <= start:
+                return _Mask(None, 0, 0, pen)
+            alpha, x0 = alpha[:, start:end], x0 + start
+        return _Mask(alpha, x0, y0, pen)
+
+    def line(self, text: str) -> _Mask:
+        """Return the mask of a line of space-separated words."""
+        space = self.glyph(" ").advance
+        parts, gap = [], 0.0
+        for word in text.split(" "):
+            if word:
+                parts.append((gap, self.word(word)))
+                gap = 0.0
+            gap += space
+        return self._compose(parts, crop=self.exact)
+
+    def render(self, boxes: Sequence, out=None):
+        """Draw positioned lines onto a blank frame.
+
+        Args:
+            boxes: Line boxes with `text`, `x` and `y`, as produced by
+                `TextLayout.layout`.
+            out: Optional frame buffer to draw into instead of a new array.
+
+        Returns:
+            The frame as a contiguous BGR `uint8` array.
+        """
+        import numpy as np  # type: ignore
+
+        if out is None:
+            frame = self._blank.copy()
+        else:
+            frame = out
+            np.copyto(frame, self._blank)
+        height, width = frame.shape[:2]
+        for box in boxes:
+            mask = self.line(box.text)
+            if mask.alpha is None:
+                continue
+            x, y = box.x + mask.x, box.y + mask.y
+            alpha = mask.alpha
+            # Clip to the frame, as Pillow does.
+            left, top = max(x, 0), max(y, 0)
+            right, bottom = min(x + alpha.shape[1], width), min(y + alpha.shape[0], height)
+            if left >= right or top >= bottom:
+                continue
+            alpha = alpha[top - y:bottom - y, left - x:right - x]
+            region = frame[top:bottom, left:right]
+            if self._binary:
+                np.copyto(region, self._ink_u8, where=alpha[:, :, None] != 0)
+                continue
+            a = alpha[:, :, None].astype(np.uint32)
+            # Pillow's BLEND: DIV255(background * (255 - a) + ink * a).
+            value = region * (255 - a) + self._ink * a + 128
+            region[:] = ((value >> 8) + value) >> 8
+        return frame
@@ -1,40 +1,127 @@
 """Narrator Cloud Function stub.
 
-This function accepts a JSON payload with `script_content` (path to the script
-file), `gcs_bucket` (unused) and `run_id`.  It creates a silent WAV file
-representing the narration.  In a real implementation you would invoke a
-text‑to‑speech API to synthesise speech.
+This function accepts a JSON payload with `script_index` (the sentence index
+emitted by the scriptwriter), `gcs_bucket` and `run_id`.  It narrates the
+script into a WAV file and stores it through the shared storage layer.  In a
+real implementation you would invoke a text‑to‑speech API to synthesise
+speech; here a stub synthesiser produces silence of each sentence's spoken
+length, estimated at a typical speaking rate.
+
+Media sourcing renders one slide per sentence of the same index, so
+sentence *i* is narrated over slide *i*.  Each sentence is an
+independent synthesis job; `segments.synthesise_segments` runs them on a
+bounded pool and `segments.assemble_wav` writes each one into a
+preallocated, memory-mapped WAV at its offset, so memory use does not grow
+with the length of the narration.  The response lists every sentence's
+start and end time, which video assembly uses to time the slides.  The
+timings are also stored as `outputs/<run_id>_timings.json`; with
+`inline_timings` set to false only that file's URI is returned, so the
+response stays the same size however long the script is.
+
+Without a script a default-length silent WAV is streamed to disk by
+`_write_wav_stream`.
 """
 
-import os
 import json
-import struct
+import math
+import os
 import wave
+from typing import Iterable, Iterator, Union
 try:
     from flask import Request  # type: ignore
 except ImportError:  # pragma: no cover
     Request = object  # type: ignore
 
+try:
+    from functions.common.instrumentation import Metrics
+    from functions.common.payload import PayloadError, decode_request, run_batch
+    from functions.common.script_index import WORDS_PER_MINUTE, load_script_index
+    from functions.common.storage import get_backend
+except ImportError:  # pragma: no cover - deployed with common/ next to main.py
+    from common.instrumentation import Metrics
+    from common.payload import PayloadError, decode_request, run_batch
+    from common.script_index import WORDS_PER_MINUTE, load_script_index
+    from common.storage import get_backend
+
+try:
+    from .segments import StubSynthesiser, assemble_wav, synthesise_segments
+except ImportError:  # pragma: no cover - deployed as a standalone function
+    from segments import StubSynthesiser, assemble_wav, synthesise_segments
 
-def _create_silent_wav(path: str, duration_sec: int = 6, sample_rate: int = 44100) -> None:
-    """Generate a silent WAV file.
+SAMPLE_RATE = 44100
+SAMPLE_WIDTH = 2  # 16 bits per sample
+CHANNELS = 1  # mono
+DEFAULT_DURATION_SEC = 6.0
+# Frames per chunk handed to the WAV writer (~1.5 s of mono 44.1 kHz audio).
+CHUNK_FRAMES = 65536
+# Sentences synthesised concurrently by default.
+DEFAULT_SYNTHESIS_WORKERS = 4
+
+
+def _silent_chunks(
+    n_frames: int,
+    chunk_frames: int = CHUNK_FRAMES,
+    sampwidth: int = SAMPLE_WIDTH,
+    channels: int = CHANNELS,
+) -> Iterator[Union[bytes, memoryview]]:
+    """Yield `n_frames` frames of silence as reusable chunks.
+
+    A single zeroed block is allocated up front and yielded repeatedly; the
+    final partial chunk is a view onto the same block.
+    """
+    frame_bytes = sampwidth * channels
+    block = bytes(chunk_frames * frame_bytes)
+    full_chunks, remainder = divmod(n_frames, chunk_frames)
+    for _ in range(full_chunks):
+        yield block
+    if remainder:
+        yield memoryview(block)[: remainder * frame_bytes]
+
+
+def _write_wav_stream(
+    path: str,
+    chunks: Iterable[Union[bytes, bytearray, memoryview]],
+    sample_rate: int = SAMPLE_RATE,
+    sampwidth: int = SAMPLE_WIDTH,
+    channels: int = CHANNELS,
+) -> int:
+    """Stream PCM chunks into a WAV file.
 
     Args:
         path: Output file path.
-        duration_sec: Length of the audio in seconds.
+        chunks: Iterable of little-endian PCM byte chunks.  Each chunk is
+            written as-is, so only one chunk needs to be in memory at a time.
         sample_rate: Samples per second.
+        sampwidth: Bytes per sample.
+        channels: Number of interleaved channels.
+
+    Returns:
+        The number of frames written.
     """
-    n_samples = duration_sec * sample_rate
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with wave.open(path, "w") as wav_file:
-        wav_file.setnchannels(1)  # mono
-        wav_file.setsampwidth(2)  # 16 bits per sample
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(sampwidth)
         wav_file.setframerate(sample_rate)
-        # Write silence
-        silence = (0).to_bytes(2, byteorder="little", signed=True)
-        for _ in range(n_samples):
-            wav_file.writeframesraw(silence)
+        for chunk in chunks:
+            wav_file.writeframesraw(chunk)
+        # Patches the header with the final data length.
         wav_file.writeframes(b"")
+        return wav_file.getnframes()
+
+
+def _create_silent_wav(path: str, duration_sec: float = DEFAULT_DURATION_SEC, sample_rate: int = SAMPLE_RATE) -> None:
+    """Generate a silent WAV file.
+
+    Args:
+        path: Output file path.
+        duration_sec: Length of the audio in seconds.
+        sample_rate: Samples per second.
+    """
+    n_samples = int(round(duration_sec * sample_rate))
+    _write_wav_stream(path, _silent_chunks(n_samples), sample_rate)
 
 
 def handle(request):  # type: ignore[override]
@@ -42,24 +129,131 @@ def handle(request):  # type: ignore[override]
 
     Args:
         request: Flask `Request` containing JSON with:
-            - script_content: Path to the script file (ignored in this stub)
-            - gcs_bucket: Placeholder for bucket name
+            - script_index: Script index produced by scriptwriter, or its
+              URI
+            - script_content: URI of the script file, indexed here when
+              `script_index` is omitted
+            - gcs_bucket: Storage bucket for the narration (`"local"` or
+              omitted keeps it under `outputs/`)
             - run_id: Unique identifier for this run
+            - words_per_minute: Optional speaking rate of the stub
+              synthesiser
+            - synthesis_workers: Sentences synthesised concurrently
+              (default `DEFAULT_SYNTHESIS_WORKERS`)
+            - pause_sec: Silence inserted between sentences (default 0)
+            - inline_timings: When false, leave `sentence_timings` out of
+              the response and return only their URI (default true)
+            - warm_up: When true, return `{"status": "warm"}` without doing
+              any work (this handler has no heavy setup to warm)
 
     Returns:
-        JSON response with an `audio_uri` pointing to the generated WAV file.
+        JSON response with an `audio_uri` pointing to the stored WAV file,
+        its `duration_sec` and `sentence_timings`: one `{"index", "start",
+        "end"}` entry per sentence, in seconds, along with the
+        `sentence_timings_uri` of the stored copy and the `sentence_count`.
+        The list is empty when the script could not be read.  Phase timings
+        are added under `metrics` when the payload sets `metrics`.
     """
-    if hasattr(request, "get_json"):
-        data = request.get_json(silent=True) or {}
-    elif isinstance(request, dict):
-        data = request
-    else:
+    metrics = Metrics("narrator")
+    return metrics.finish(_handle(request, metrics))
+
+
+def handle_batch(request):  # type: ignore[override]
+    """Entry point for a batch of narrator jobs.
+
+    Runs every job through `handle` in this instance.
+
+    Args:
+        request: Flask `Request` containing JSON with `jobs`, a list of
+            payloads as accepted by `handle`, run one after another.
+
+    Returns:
+        JSON response with each job's response (or `error`) under
+        `results`, in order, and `succeeded` and `failed` counts.
+    """
+    return run_batch(request, handle)
+
+
+def _handle(request, metrics: Metrics):
+    """Handle a request, recording phase timings in `metrics`."""
+    with metrics.span("payload_parse"):
         try:
-            data = json.loads(request)  # type: ignore
-        except Exception:
-            return {"error": "Invalid JSON payload"}
+            data = decode_request(request)
+        except PayloadError as e:
+            return {"error": str(e)}
+    metrics.configure(data)
+    if data.get("warm_up"):
+        return {"status": "warm"}
     run_id = data.get("run_id", "test")
+    try:
+        words_per_minute = float(data.get("words_per_minute", WORDS_PER_MINUTE))
+    except (TypeError, ValueError):
+        return {"error": "Invalid words_per_minute value"}
+    if not math.isfinite(words_per_minute) or words_per_minute <= 0:
+        return {"error": "Invalid words_per_minute value"}
+    try:
+        synthesis_workers = int(data.get("synthesis_workers", DEFAULT_SYNTHESIS_WORKERS))
+    except (TypeError, ValueError):
+        return {"error": "Invalid synthesis_workers value"}
+    try:
+        pause_sec = float(data.get("pause_sec", 0.0))
+    except (TypeError, ValueError):
+        return {"error": "Invalid pause_sec value"}
+    if not math.isfinite(pause_sec) or pause_sec < 0:
+        return {"error": "Invalid pause_sec value"}
+    try:
+        storage = get_backend(data.get("gcs_bucket"))
+    except ValueError as e:
+        return {"error": str(e)}
 
+    with metrics.span("script_index"):
+        try:
+            index = load_script_index(data.get("script_index"), data.get("script_content"))
+        except ValueError as e:
+            return {"error": str(e)}
+    # Without a script the narration falls back to default-length silence.
+    sentences = index.sentences if index is not None else []
     audio_path = os.path.join("outputs", f"{run_id}_narration.wav")
-    _create_silent_wav(audio_path)
-    return {"audio_uri": audio_path}
\ No newline at end of file
+    sentence_timings = []
+    if sentences:
+        import tempfile
+
+        synthesise = StubSynthesiser(words_per_minute, SAMPLE_RATE, SAMPLE_WIDTH * CHANNELS)
+        with tempfile.TemporaryDirectory(prefix="narration_segments_") as spool_dir:
+            with metrics.span("synthesis"):
+                segments = synthesise_segments(
+                    sentences, synthesise, spool_dir, workers=synthesis_workers, frame_bytes=SAMPLE_WIDTH * CHANNELS
+                )
+            with metrics.span("wav_write"):
+                ranges = assemble_wav(
+                    audio_path,
+                    segments,
+                    SAMPLE_RATE,
+                    SAMPLE_WIDTH,
+                    CHANNELS,
+                    pause_frames=int(round(pause_sec * SAMPLE_RATE)),
+                )
+        sentence_timings = [
+            {"index": i, "start": start / SAMPLE_RATE, "end": end / SAMPLE_RATE}
+            for i, (start, end) in enumerate(ranges)
+        ]
+        duration_sec = ranges[-1][1] / SAMPLE_RATE
+    else:
+        duration_sec = DEFAULT_DURATION_SEC
+        with metrics.span("wav_write"):
+            _create_silent_wav(audio_path, duration_sec)
+    timings_path = os.path.join("outputs", f"{run_id}_timings.json")
+    with open(timings_path, "w", encoding="utf-8") as f:
+        json.dump(sentence_timings, f, separators=(",", ":"))
+    with metrics.span("storage_put"):
+        audio_uri = storage.put_file(audio_path)
+        timings_uri = storage.put_file(timings_path)
+    response = {
+        "audio_uri": audio_uri,
+        "duration_sec": duration_sec,
+        "sentence_timings_uri": timings_uri,
+        "sentence_count": len(sentence_timings),
+    }
+    if data.get("inline_timings", True):
+        response["sentence_timings"] = sentence_timings
+    return response
@@ -0,0 +1,179 @@
+"""Per-sentence narration segments and memory-mapped WAV assembly.
+
+Text-to-speech services synthesise one request at a time, so a script is
+narrated as one independent job per sentence.  `synthesise_segments` runs
+those jobs concurrently on a bounded thread pool (the work is waiting on the
+synthesiser, not the CPU).  Each segment's PCM is spooled to its own file as
+soon as it arrives, so at most one segment per worker is held in memory.
+
+`assemble_wav` then lays the segments out end to end.  Once every segment's
+length is known their offsets are fixed, so the final WAV is preallocated at
+its full size, memory-mapped and each segment is read straight into its
+slice of the map.  The narration is never concatenated in RAM, and the
+returned frame ranges give each sentence's position for downstream
+alignment.
+
+A synthesiser is any callable that takes a sentence and returns 16-bit
+little-endian PCM bytes in the narration's format.  `StubSynthesiser`
+returns silence of the sentence's spoken length and stands in for a real
+service locally and in tests.
+"""
+
+import mmap
+import os
+import struct
+import time
+from typing import Callable, List, Sequence, Tuple
+
+Synthesiser = Callable[[str], bytes]
+# Bytes copied from a spool file into the map per read.
+_COPY_BYTES = 1024 * 1024
+_WAV_HEADER_BYTES = 44
+
+
+class StubSynthesiser:
+    """Synthesiser that returns silence lasting as long as the sentence.
+
+    Args:
+        words_per_minute: Speaking rate used to turn a word count into a
+            duration.
+        sample_rate: Samples per second of the returned PCM.
+        frame_bytes: Bytes per frame (sample width times channels).
+        latency_sec: Delay added to every call, to imitate a remote service.
+    """
+
+    def __init__(self, words_per_minute: float, sample_rate: int, frame_bytes: int, latency_sec: float = 0.0) -> None:
+        self.words_per_minute = words_per_minute
+        self.sample_rate = sample_rate
+        self.frame_bytes = frame_bytes
+        self.latency_sec = latency_sec
+
+    def duration(self, text: str) -> float:
+        """Return the spoken length of `text` in seconds."""
+        return len(text.split()) * 60.0 / self.words_per_minute
+
+    def __call__(self, text: str) -> bytes:
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+        n_frames = int(round(self.duration(text) * self.sample_rate))
+        return bytes(n_frames * self.frame_bytes)
+
+
+def synthesise_segments(
+    sentences: Sequence[str],
+    synthesise: Synthesiser,
+    spool_dir: str,
+    workers: int = 1,
+    frame_bytes: int = 2,
+) -> List[Tuple[str, int]]:
+    """Synthesise every sentence concurrently and spool each one to disk.
+
+    Args:
+        sentences: Text of each segment, in narration order.
+        synthesise: Synthesiser called once per sentence.
+        spool_dir: Existing directory for the per-segment PCM files.
+        workers: Maximum number of synthesis calls in flight.
+        frame_bytes: Bytes per frame; every segment must be whole frames.
+
+    Returns:
+        `(path, n_bytes)` of each segment's PCM file, in sentence order.
+
+    Raises:
+        ValueError: If a segment is not a whole number of frames.
+    """
+
+    def run(job: Tuple[int, str]) -> Tuple[str, int]:
+        index, text = job
+        pcm = synthesise(text)
+        if len(pcm) % frame_bytes:
+            raise ValueError(f"Segment {index} is {len(pcm)} bytes, not a whole number of {frame_bytes}-byte frames")
+        path = os.path.join(spool_dir, f"segment_{index:05d}.pcm")
+        with open(path, "wb") as f:
+            f.write(pcm)
+        return path, len(pcm)
+
+    jobs = list(enumerate(sentences))
+    if workers <= 1 or len(jobs) <= 1:
+        return [run(job) for job in jobs]
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(run, jobs))
+
+
+def _wav_header(data_bytes: int, sample_rate: int, sampwidth: int, channels: int) -> bytes:
+    block_align = sampwidth * channels
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_bytes,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        sampwidth * 8,
+        b"data",
+        data_bytes,
+    )
+
+
+def assemble_wav(
+    path: str,
+    segments: Sequence[Tuple[str, int]],
+    sample_rate: int,
+    sampwidth: int,
+    channels: int,
+    pause_frames: int = 0,
+) -> List[Tuple[int, int]]:
+    """Write spooled segments into a preallocated, memory-mapped WAV file.
+
+    Args:
+        path: Output WAV path.
+        segments: `(path, n_bytes)` of each segment, in order, as returned
+            by `synthesise_segments`.
+        sample_rate: Samples per second.
+        sampwidth: Bytes per sample.
+        channels: Number of interleaved channels.
+        pause_frames: Frames of silence between consecutive segments.  The
+            preallocated file is zero-filled, so pauses cost no writes.
+
+    Returns:
+        `(start_frame, end_frame)` of each segment in the WAV.
+    """
+    frame_bytes = sampwidth * channels
+    ranges, cursor = [], 0
+    for index, (_, n_bytes) in enumerate(segments):
+        if index:
+            cursor += pause_frames
+        ranges.append((cursor, cursor + n_bytes // frame_bytes))
+        cursor = ranges[-1][1]
+    data_bytes = cursor * frame_bytes
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w+b") as f:
+        f.write(_wav_header(data_bytes, sample_rate, sampwidth, channels))
+        f.truncate(_WAV_HEADER_BYTES + data_bytes)
+        if not data_bytes:
+            return ranges
+        with mmap.mmap(f.fileno(), 0) as mapped:
+            view = memoryview(mapped)
+            try:
+                for (segment_path, n_bytes), (start, _) in zip(segments, ranges):
+                    offset = _WAV_HEADER_BYTES + start * frame_bytes
+                    end = offset + n_bytes
+                    with open(segment_path, "rb") as segment:
+                        while offset < end:
+                            read = segment.readinto(view[offset:min(end, offset + _COPY_BYTES)])
+                            if not read:
+                                raise ValueError(f"{segment_path} is shorter than {n_bytes} bytes")
+                            offset += read
+                mapped.flush()
+            finally:
+                view.release()
+    return ranges
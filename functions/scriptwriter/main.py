@@ -1,10 +1,18 @@
 """Scriptwriter Cloud Function stub.
 
 This function accepts a JSON payload with `topic`, `bucket` and `run_id` keys
-and returns a simple text script.  The script is saved to the local
-`outputs/` directory for inspection.  In a production environment you
-would replace this logic with a call to Gemini or another LLM and upload
-the script to Cloud Storage.
+and returns a simple text script.  The script is written to the local
+`outputs/` directory and then stored through the shared storage layer
+(`functions/common/storage.py`), which leaves it in place for local runs and
+uploads it for a Cloud Storage bucket.  In a production environment you would
+replace the script logic with a call to Gemini or another LLM.
+
+The script is segmented once here into a compact index of its sentences
+(`functions/common/script_index.py`), which is returned inline and stored
+next to the script.  Downstream stages consume the index instead of
+downloading and re-parsing the script.  With `inline_index` set to false only
+the index's URI and sentence count are returned, which keeps the response
+the same size however long the script is.
 """
 
 import os
@@ -16,6 +24,16 @@ try:
 except ImportError:  # pragma: no cover
     Request = object  # type: ignore
 
+try:
+    from functions.common.instrumentation import Metrics
+    from functions.common.payload import PayloadError, decode_request, run_batch
+    from functions.common.script_index import ScriptIndex
+    from functions.common.storage import get_backend
+except ImportError:  # pragma: no cover - deployed with common/ next to main.py
+    from common.instrumentation import Metrics
+    from common.payload import PayloadError, decode_request, run_batch
+    from common.script_index import ScriptIndex
+    from common.storage import get_backend
 
 
 def handle(request):  # type: ignore[override]
@@ -24,26 +42,60 @@ def handle(request):  # type: ignore[override]
     Args:
         request: Flask `Request` object containing JSON with the keys:
             - topic: the topic for the news video
-            - bucket: name of the storage bucket (ignored in this stub)
+            - bucket: storage bucket for the script (`"local"` or omitted
+              keeps it under `outputs/`)
             - run_id: unique identifier for this run
+            - inline_index: When false, leave the `script_index` itself out
+              of the response (default true)
+            - warm_up: When true, return `{"status": "warm"}` without doing
+              any work (this handler has no heavy setup to warm)
 
     Returns:
-        JSON response with a `script_uri` pointing to the saved script file.
+        JSON response with a `script_uri` pointing to the stored script,
+        its `script_index`, the `script_index_uri` of the stored copy and
+        the `sentence_count`.
+        Phase timings are added under `metrics` when the payload sets
+        `metrics` (see `functions/common/instrumentation.py`).
     """
+    metrics = Metrics("scriptwriter")
+    return metrics.finish(_handle(request, metrics))
+
+
+def handle_batch(request):  # type: ignore[override]
+    """Entry point for a batch of scriptwriter jobs.
+
+    Runs every job through `handle` in this instance.
+
+    Args:
+        request: Flask `Request` containing JSON with `jobs`, a list of
+            payloads as accepted by `handle`, run one after another.
+
+    Returns:
+        JSON response with each job's response (or `error`) under
+        `results`, in order, and `succeeded` and `failed` counts.
+    """
+    return run_batch(request, handle)
+
+
+def _handle(request, metrics: Metrics):
+    """Handle a request, recording phase timings in `metrics`."""
     # Extract JSON from the request object.  This allows the handler to be
     # invoked either by Flask (via request.get_json) or directly with a
     # dictionary in local tests.
-    if hasattr(request, "get_json"):
-        data = request.get_json(silent=True) or {}
-    elif isinstance(request, dict):
-        data = request
-    else:
+    with metrics.span("payload_parse"):
         try:
-            data = json.loads(request)  # type: ignore
-        except Exception:
-            return {"error": "Invalid JSON payload"}
+            data = decode_request(request)
+        except PayloadError as e:
+            return {"error": str(e)}
+    metrics.configure(data)
+    if data.get("warm_up"):
+        return {"status": "warm"}
     topic = data.get("topic", "black news")
     run_id = data.get("run_id", "test")
+    try:
+        storage = get_backend(data.get("bucket"))
+    except ValueError as e:
+        return {"error": str(e)}
 
     # Compose a simple script.  In reality you'd call an LLM here.
     lines = [
@@ -56,7 +108,21 @@ def handle(request):  # type: ignore[override]
     # Ensure output directory exists
     os.makedirs("outputs", exist_ok=True)
     script_path = os.path.join("outputs", f"{run_id}_script.txt")
-    with open(script_path, "w", encoding="utf-8") as f:
-        f.write(script_content)
+    with metrics.span("script_write"):
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(script_content)
+    with metrics.span("storage_put"):
+        script_uri = storage.put_file(script_path)
+
+    with metrics.span("script_index"):
+        index = ScriptIndex.from_text(script_content, script_uri=script_uri).to_dict()
+        index_path = os.path.join("outputs", f"{run_id}_script_index.json")
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+    with metrics.span("storage_put"):
+        index_uri = storage.put_file(index_path)
 
-    return {"script_uri": script_path}
\ No newline at end of file
+    response = {"script_uri": script_uri, "script_index_uri": index_uri, "sentence_count": len(index["sentences"])}
+    if data.get("inline_index", True):
+        response["script_index"] = index
+    return response
\ No newline at end of file
@@ -1,47 +1,120 @@
 """Uploader Cloud Function stub.
 
 In a full implementation this function would download the final video from
-Cloud Storage and upload it to Google Drive or YouTube.  In this stub it
-simply acknowledges the upload and echoes back the provided URIs.
-"""
+Cloud Storage and upload it to Google Drive or YouTube (see the streaming
+uploader in the repository's top-level `main.py`).  In this stub it checks
+through the shared storage layer that the video exists, then acknowledges
+the upload and echoes back the provided URIs.
 
-import json
+The video description is built from the scriptwriter's script index, so the
+script itself is not downloaded again.
+"""
 
 try:
     from flask import Request  # type: ignore
 except ImportError:  # pragma: no cover
     Request = object  # type: ignore
 
+try:
+    from functions.common.instrumentation import Metrics
+    from functions.common.payload import PayloadError, decode_request, run_batch
+    from functions.common.script_index import ScriptIndex, load_script_index
+    from functions.common.storage import backend_for_uri
+except ImportError:  # pragma: no cover - deployed with common/ next to main.py
+    from common.instrumentation import Metrics
+    from common.payload import PayloadError, decode_request, run_batch
+    from common.script_index import ScriptIndex, load_script_index
+    from common.storage import backend_for_uri
+
+# Longest description accepted by YouTube.
+DESCRIPTION_MAX_CHARS = 5000
+
+
+def _description(index: ScriptIndex, max_chars: int = DESCRIPTION_MAX_CHARS) -> str:
+    """Join the script's sentences into a description of at most `max_chars`.
+
+    Only whole sentences are included.
+    """
+    parts, length = [], 0
+    for sentence in index.sentences:
+        text = " ".join(sentence.split())
+        added = len(text) + (1 if parts else 0)
+        if length + added > max_chars:
+            break
+        parts.append(text)
+        length += added
+    return " ".join(parts)
+
 
 def handle(request):  # type: ignore[override]
     """Entry point for the uploader service.
 
     Args:
         request: Flask `Request` containing JSON with:
-            - final_uri: Path to the video file produced by video assembly
-            - script_content: Path to the script file
+            - final_uri: URI of the video produced by video assembly
+            - script_index: Script index produced by scriptwriter, or its
+              URI
+            - script_content: Path to the script file, indexed here when
+              `script_index` is omitted
             - run_id: Unique identifier for this run
+            - warm_up: When true, return `{"status": "warm"}` without doing
+              any work (this handler has no heavy setup to warm)
+
+    Returns:
+        JSON response indicating that the upload has completed, with the
+        video `description` when a script was given.  Phase
+        timings are added under `metrics` when the payload sets `metrics`.
+    """
+    metrics = Metrics("uploader")
+    return metrics.finish(_handle(request, metrics))
+
+
+def handle_batch(request):  # type: ignore[override]
+    """Entry point for a batch of uploader jobs.
+
+    Runs every job through `handle` in this instance.  The storage client is
+    shared by every job.
+
+    Args:
+        request: Flask `Request` containing JSON with `jobs`, a list of
+            payloads as accepted by `handle`, run one after another.
 
     Returns:
-        JSON response indicating that the upload has completed.
+        JSON response with each job's response (or `error`) under
+        `results`, in order, and `succeeded` and `failed` counts.
     """
+    return run_batch(request, handle)
+
+
+def _handle(request, metrics: Metrics):
+    """Handle a request, recording phase timings in `metrics`."""
     # Parse input JSON
-    if hasattr(request, "get_json"):
-        data = request.get_json(silent=True) or {}
-    elif isinstance(request, dict):
-        data = request
-    else:
+    with metrics.span("payload_parse"):
         try:
-            data = json.loads(request)  # type: ignore
-        except Exception:
-            return {"error": "Invalid JSON payload"}
+            data = decode_request(request)
+        except PayloadError as e:
+            return {"error": str(e)}
+    metrics.configure(data)
+    if data.get("warm_up"):
+        return {"status": "warm"}
 
     final_uri = data.get("final_uri")
     script_content = data.get("script_content")
     run_id = data.get("run_id")
-    return {
+    with metrics.span("storage_check"):
+        if not final_uri or not backend_for_uri(final_uri).exists(final_uri):
+            return {"error": "Final video not found"}
+    with metrics.span("script_index"):
+        try:
+            index = load_script_index(data.get("script_index"), script_content)
+        except ValueError as e:
+            return {"error": str(e)}
+    response = {
         "status": "uploaded",
         "final_uri": final_uri,
-        "script_content": script_content,
+        "script_content": script_content or (index.script_uri if index is not None else None),
         "run_id": run_id,
-    }
\ No newline at end of file
+    }
+    if index is not None:
+        response["description"] = _description(index)
+    return response
\ No newline at end of file
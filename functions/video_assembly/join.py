@@ -0,0 +1,258 @@
+"""Join MP4 segments into one file without re-encoding.
+
+Segment-parallel encoding (see `main.py`) writes contiguous runs of the
+timeline to separate MP4 files, each starting on a key frame.  `concat_mp4`
+stitches them into one playable MP4:
+
+* the encoded samples of every segment are copied, in order, into a single
+  `mdat`, one chunk per contiguous run of samples,
+* the first segment's `moov` is kept and its sample table is rebuilt from
+  every segment's sample sizes, durations, sync samples and composition
+  offsets,
+* the track and movie durations are then set the same way
+  `apply_frame_durations` sets them (see `timeline.py`).
+
+The segments must be single-track videos with the same codec configuration
+(the same encoder, frame size and rate); only their bitrate fields may
+differ.  No decoder or external tool is needed.
+"""
+
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from .timeline import _Box, _parse_boxes, _retime_track, _set_duration, _top_level_boxes
+except ImportError:  # pragma: no cover - deployed as a standalone function
+    from timeline import _Box, _parse_boxes, _retime_track, _set_duration, _top_level_boxes
+
+_COPY_BYTES = 1024 * 1024
+# Sample table boxes rebuilt from the segments; any other one is refused.
+_SAMPLE_TABLE = {b"stsd", b"stts", b"stss", b"ctts", b"stsc", b"stsz", b"stco", b"co64"}
+
+
+def _full_box_entries(box: _Box, fmt: str) -> List[tuple]:
+    """Return the entries of a full box with an entry count, like `stts`."""
+    count = struct.unpack_from(">I", box.payload, 4)[0]
+    size = struct.calcsize(fmt)
+    return [struct.unpack_from(fmt, box.payload, 8 + size * i) for i in range(count)]
+
+
+def _descriptor(data: bytes, offset: int) -> Tuple[int, int, int]:
+    """Return `(tag, body offset, body length)` of an MPEG-4 descriptor."""
+    tag, offset, length = data[offset], offset + 1, 0
+    for _ in range(4):
+        byte = data[offset]
+        offset += 1
+        length = (length << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            break
+    return tag, offset, length
+
+
+def _codec_key(stsd: _Box) -> bytes:
+    """Return the part of a sample description that must match across segments.
+
+    For MPEG-4 video that is the sample entry's format and frame size plus
+    the decoder specific info (the VOL header); the `esds` and `btrt`
+    bitrate fields describe one segment and are left out.  Other formats are
+    compared in full.
+    """
+    payload = stsd.payload
+    entry = payload[8:]
+    esds = entry.find(b"esds")
+    if esds < 0:
+        return payload
+    head = entry[4:8] + entry[32:36]
+    data = entry[esds + 8:]
+    tag, body, _ = _descriptor(data, 0)
+    if tag != 0x03:
+        return payload
+    flags = data[body + 2]
+    offset = body + 3 + (2 if flags & 0x80 else 0)
+    if flags & 0x40:
+        offset += 1 + data[offset]
+    if flags & 0x20:
+        offset += 2
+    tag, body, _ = _descriptor(data, offset)
+    if tag != 0x04:
+        return payload
+    tag, body, length = _descriptor(data, body + 13)
+    if tag != 0x05:
+        return payload
+    return head + data[body:body + length]
+
+
+class _Segment:
+    """The sample table of one segment file, expanded per sample."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            top = _top_level_boxes(f)
+            moov_entry = next((box for box in top if box[0] == b"moov"), None)
+            if moov_entry is None:
+                raise ValueError(f"{path} has no moov box")
+            f.seek(0)
+            self.ftyp = f.read(top[0][2]) if top[0][0] == b"ftyp" else b""
+            f.seek(moov_entry[1])
+            self.moov = _parse_boxes(f.read(moov_entry[2]))[0]
+        traks = self.moov.find(b"trak")
+        if len(traks) != 1:
+            raise ValueError(f"Expected one track in {path}, found {len(traks)}")
+        self.trak = traks[0]
+        mdhd = self.trak.find(b"mdia", b"mdhd")[0]
+        self.timescale = struct.unpack_from(">I", mdhd.payload, 20 if mdhd.payload[0] == 1 else 12)[0]
+        stbl = self.trak.find(b"mdia", b"minf", b"stbl")[0]
+        tables: Dict[bytes, _Box] = {}
+        for box in stbl.children:
+            if box.kind not in _SAMPLE_TABLE:
+                raise ValueError(f"Unsupported sample table box {box.kind!r} in {path}")
+            tables[box.kind] = box
+        self.stsd = tables[b"stsd"]
+
+        stsz = tables[b"stsz"].payload
+        uniform, count = struct.unpack_from(">II", stsz, 4)
+        self.sizes = [uniform] * count if uniform else list(struct.unpack_from(f">{count}I", stsz, 12))
+        self.deltas = [delta for n, delta in _full_box_entries(tables[b"stts"], ">II") for _ in range(n)]
+        if len(self.deltas) != count:
+            raise ValueError(f"{path} has {count} samples but {len(self.deltas)} durations")
+        # Without `stss` every sample is a sync sample.
+        self.sync: Optional[List[int]] = None
+        if b"stss" in tables:
+            self.sync = [index for (index,) in _full_box_entries(tables[b"stss"], ">I")]
+        self.composition: Optional[List[int]] = None
+        self.ctts_version = 0
+        if b"ctts" in tables:
+            self.ctts_version = tables[b"ctts"].payload[0]
+            self.composition = [offset for n, offset in _full_box_entries(tables[b"ctts"], ">Ii") for _ in range(n)]
+
+        if b"co64" in tables:
+            chunk_offsets = [offset for (offset,) in _full_box_entries(tables[b"co64"], ">Q")]
+        else:
+            chunk_offsets = [offset for (offset,) in _full_box_entries(tables[b"stco"], ">I")]
+        runs = _full_box_entries(tables[b"stsc"], ">III")
+        self.offsets: List[int] = []
+        sample = 0
+        for chunk, offset in enumerate(chunk_offsets, start=1):
+            per_chunk = next(n for first, n, _ in reversed(runs) if first <= chunk)
+            for _ in range(per_chunk):
+                if sample >= count:
+                    break
+                self.offsets.append(offset)
+                offset += self.sizes[sample]
+                sample += 1
+        if sample != count:
+            raise ValueError(f"{path} has chunks for {sample} of its {count} samples")
+
+    def ranges(self) -> List[Tuple[int, int, int]]:
+        """Return `(file offset, byte length, samples)` for each contiguous run."""
+        runs: List[List[int]] = []
+        for offset, size in zip(self.offsets, self.sizes):
+            if runs and runs[-1][0] + runs[-1][1] == offset:
+                runs[-1][1] += size
+                runs[-1][2] += 1
+            else:
+                runs.append([offset, size, 1])
+        return [tuple(run) for run in runs]  # type: ignore[misc]
+
+
+def _run_length(values: Sequence[int]) -> List[List[int]]:
+    entries: List[List[int]] = []
+    for value in values:
+        if entries and entries[-1][1] == value:
+            entries[-1][0] += 1
+        else:
+            entries.append([1, value])
+    return entries
+
+
+def _full_box(kind: bytes, entries: Sequence[Sequence[int]], fmt: str, version: int = 0) -> _Box:
+    body = b"".join(struct.pack(fmt, *entry) for entry in entries)
+    return _Box(kind, payload=struct.pack(">B3xI", version, len(entries)) + body)
+
+
+def concat_mp4(paths: Sequence[str], output_path: str) -> int:
+    """Join single-track MP4 segments, in order, into `output_path`.
+
+    Every sample keeps its duration, so the joined video lasts as long as
+    its segments together.
+
+    Returns:
+        The number of samples (frames) in the joined video.
+
+    Raises:
+        ValueError: If there are no segments, or a segment is not a
+            single-track MP4 or was encoded differently from the first.
+    """
+    if not paths:
+        raise ValueError("No segments to join")
+    segments = [_Segment(path) for path in paths]
+    first = segments[0]
+    key = _codec_key(first.stsd)
+    for segment in segments[1:]:
+        if _codec_key(segment.stsd) != key or segment.timescale != first.timescale:
+            raise ValueError(f"{segment.path} was encoded differently from {first.path}")
+
+    header = first.ftyp
+    payload_size = sum(sum(segment.sizes) for segment in segments)
+    if payload_size + 8 > 0xFFFFFFFF:
+        mdat_header = struct.pack(">I4sQ", 1, b"mdat", payload_size + 16)
+    else:
+        mdat_header = struct.pack(">I4s", payload_size + 8, b"mdat")
+    position = len(header) + len(mdat_header)
+
+    sizes: List[int] = []
+    deltas: List[int] = []
+    sync: List[int] = []
+    composition: List[int] = []
+    chunks: List[Tuple[int, int]] = []  # (file offset, samples)
+    for segment in segments:
+        base = len(sizes)
+        for offset, length, count in segment.ranges():
+            chunks.append((position, count))
+            position += length
+        sync.extend(base + index for index in (segment.sync or range(1, len(segment.sizes) + 1)))
+        composition.extend(segment.composition or [0] * len(segment.sizes))
+        sizes.extend(segment.sizes)
+        deltas.extend(segment.deltas)
+
+    stbl = first.trak.find(b"mdia", b"minf", b"stbl")[0]
+    children = [first.stsd, _full_box(b"stts", _run_length(deltas), ">II")]
+    if any(segment.sync is not None for segment in segments):
+        children.append(_full_box(b"stss", [(index,) for index in sync], ">I"))
+    if any(segment.composition is not None for segment in segments):
+        version = max(segment.ctts_version for segment in segments)
+        children.append(_full_box(b"ctts", _run_length(composition), ">Ii", version))
+    stsc = []
+    for index, (_, count) in enumerate(chunks, start=1):
+        if not stsc or stsc[-1][1] != count:
+            stsc.append((index, count, 1))
+    children.append(_full_box(b"stsc", stsc, ">III"))
+    children.append(_Box(b"stsz", payload=struct.pack(f">4xII{len(sizes)}I", 0, len(sizes), *sizes)))
+    if chunks and chunks[-1][0] > 0xFFFFFFFF:
+        children.append(_full_box(b"co64", [(offset,) for offset, _ in chunks], ">Q"))
+    else:
+        children.append(_full_box(b"stco", [(offset,) for offset, _ in chunks], ">I"))
+    stbl.children = children
+
+    mvhd = first.moov.find(b"mvhd")[0]
+    movie_timescale = struct.unpack_from(">I", mvhd.payload, 20 if mvhd.payload[0] == 1 else 12)[0]
+    durations = [delta / first.timescale for delta in deltas]
+    _retime_track(first.trak, durations, movie_timescale)
+    _set_duration(mvhd, (16, 24), round(sum(durations) * movie_timescale))
+
+    with open(output_path, "wb") as dst:
+        dst.write(header)
+        dst.write(mdat_header)
+        for segment in segments:
+            with open(segment.path, "rb") as src:
+                for offset, length, _ in segment.ranges():
+                    src.seek(offset)
+                    while length:
+                        chunk = src.read(min(_COPY_BYTES, length))
+                        if not chunk:
+                            raise ValueError(f"{segment.path} is truncated")
+                        dst.write(chunk)
+                        length -= len(chunk)
+        dst.write(first.moov.to_bytes())
+    return len(sizes)
@@ -2,19 +2,406 @@
 
 This function accepts a JSON payload with `media_uris` (a list of image
 paths) and `narration_uri` (a WAV file).  It composes the images into
-a simple MP4 video using OpenCV.  Each image is displayed for one second.
+a simple MP4 video using OpenCV.
 
-The output video is saved in the `outputs/` directory.  Audio is not
-embedded in this stub; the resulting video is silent.
+Each image is shown for its entry in a timeline (see `timeline.py`).  The
+timeline comes from `frame_durations`, from per-sentence
+`sentence_timings`, or from the narration WAV's length shared equally
+between the frames.  Without any of these every image lasts one second.  By
+default each image is encoded once, and the MP4's sample durations are then
+rewritten to the timeline (`"timeline": "vfr"`), so the encoding cost does
+not grow with the length of the narration.  `"timeline": "cfr"` writes a
+constant-rate video at `fps` instead.  It repeats the decoded frame as many
+times as its duration needs, without decoding or resizing it again.
+
+Frames named by `gs://` or `mem://` URIs are fetched concurrently through
+the shared storage layer before encoding.  The output video is written to the
+`outputs/` directory and then stored in the request's `gcs_bucket`.  Audio is
+not embedded in this stub; the resulting video is silent.
+
+Passing `decode_workers` in the payload enables a pipelined mode: a bounded
+thread pool decodes and resizes frames ahead of the writer so that PNG
+decoding overlaps with encoding.  At most `max_in_flight` decoded frames are
+held at once, which keeps memory flat however long the timeline is.
+
+When called in-process, `frames` may be passed instead of `media_uris`: an
+iterable of BGR NumPy arrays (for example the lazy iterator returned by
+media sourcing in memory mode).  The frames are written straight to the
+encoder without touching the disk.
+
+`frame_store_uri` names a frame store written by media sourcing in store
+mode (see `functions/common/frame_store.py`): every frame of the run in one
+uncompressed, memory-mapped file.  Frames are handed to the encoder as
+views of the mapping, so nothing is decoded or copied on the way.
+
+`media_manifest_uri` names a media manifest written by media sourcing (see
+`functions/common/media_manifest.py`) in place of an inline `media_uris`
+list.  Its entries are read a line at a time as the encoder consumes them,
+and remote frames are downloaded a batch at a time ahead of it, so neither
+the request nor the handler holds the whole list.
+
+Passing `encode_workers` splits a timeline of `media_uris`, a media manifest
+or a frame store into contiguous segments of similar encoding cost.  Each
+segment is decoded and encoded in its own process, and the segment files are
+then joined into one MP4 without re-encoding (see `join.py`).  The joined
+video has the same frames, in the same order and with the same durations, as
+the single-writer output.  Each segment starts on a key frame, so the encoded
+bytes differ slightly.  Timelines shorter than `MIN_SEGMENT_FRAMES` frames per
+worker use fewer segments.
+
+OpenCV is imported on first use rather than at module load, so importing the
+handler stays cheap on a cold instance.  `warm_up()` imports it and opens the
+MP4 encoder once ahead of time.  It runs when a request sets `warm_up`, or at
+import when the `WARM_UP_ON_LOAD` environment variable is set.
 """
 
+import json
 import os
+from collections import deque
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Tuple
 try:
     from flask import Request  # type: ignore
 except ImportError:  # pragma: no cover
     Request = object  # type: ignore
-import cv2  # type: ignore
-import json
+
+try:
+    from functions.common.frame_store import FrameStore
+    from functions.common.instrumentation import NULL_METRICS, Metrics
+    from functions.common.media_manifest import iter_media_manifest, read_media_manifest_header
+    from functions.common.payload import PayloadError, decode_request, run_batch
+    from functions.common.storage import DEFAULT_TRANSFER_WORKERS, download_many, fetch, get_backend
+except ImportError:  # pragma: no cover - deployed with common/ next to main.py
+    from common.frame_store import FrameStore
+    from common.instrumentation import NULL_METRICS, Metrics
+    from common.media_manifest import iter_media_manifest, read_media_manifest_header
+    from common.payload import PayloadError, decode_request, run_batch
+    from common.storage import DEFAULT_TRANSFER_WORKERS, download_many, fetch, get_backend
+
+try:
+    from .join import concat_mp4
+    from .timeline import apply_frame_durations, build_timeline, wav_duration
+except ImportError:  # pragma: no cover - deployed as a standalone function
+    from join import concat_mp4
+    from timeline import apply_frame_durations, build_timeline, wav_duration
+
+CODEC = "mp4v"
+FPS = 1  # Nominal rate; frame durations come from the timeline
+DEFAULT_CFR_FPS = 25.0
+# Fewest frames worth encoding in a segment of their own.
+MIN_SEGMENT_FRAMES = 8
+# Manifest frames downloaded per transfer worker in each batch.
+FETCH_BATCH = 4
+
+_fourcc = None
+
+
+def _video_fourcc() -> int:
+    """Return the FOURCC code of `CODEC`, computing it once per process."""
+    global _fourcc
+    if _fourcc is None:
+        import cv2  # type: ignore
+
+        _fourcc = cv2.VideoWriter_fourcc(*CODEC)
+    return _fourcc
+
+
+def warm_up() -> None:
+    """Do the one-off setup of a cold instance before the first request.
+
+    Imports OpenCV and NumPy and writes one tiny frame through the MP4
+    encoder, so the codec libraries are loaded before real work arrives.
+    """
+    import tempfile
+
+    import cv2  # type: ignore
+    import numpy as np  # type: ignore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = cv2.VideoWriter(os.path.join(tmp, "warm_up.mp4"), _video_fourcc(), FPS, (16, 16))
+        try:
+            writer.write(np.zeros((16, 16, 3), dtype=np.uint8))
+        finally:
+            writer.release()
+
+
+def _load_frame(uri: str, size: Optional[Tuple[int, int]] = None, metrics=NULL_METRICS):
+    """Decode an image and resize it to `size` (width, height) if needed.
+
+    Decoding time is recorded under `frame_decode` in `metrics`.
+
+    Returns:
+        The BGR frame, or `None` if the file could not be decoded.
+    """
+    import cv2  # type: ignore
+
+    with metrics.span("frame_decode"):
+        img = cv2.imread(uri)
+        if img is None:
+            return None
+        if size is not None and (img.shape[1], img.shape[0]) != size:
+            img = cv2.resize(img, size)
+    return img
+
+
+def _iter_fetched(uris: Iterable[str], workers: int = DEFAULT_TRANSFER_WORKERS) -> Iterator[str]:
+    """Download frames a batch at a time as the consumer reaches them.
+
+    Local paths pass through unchanged.  Each batch holds `FETCH_BATCH`
+    frames per transfer worker, so downloads keep every worker busy without
+    fetching the whole run up front.
+
+    Raises:
+        FileNotFoundError: If a frame does not exist.
+    """
+    batch: List[str] = []
+    for uri in chain(uris, [None]):
+        if uri is not None:
+            batch.append(uri)
+        if batch and (uri is None or len(batch) >= FETCH_BATCH * workers):
+            yield from download_many(batch, workers=workers)
+            batch = []
+
+
+def _iter_frames(uris: Iterable[str], size: Tuple[int, int], metrics=NULL_METRICS) -> Iterator:
+    """Decode frames one at a time in the calling thread.
+
+    Yields `None` in place of any frame that could not be decoded, so the
+    position of every frame in the timeline is preserved.
+    """
+    for uri in uris:
+        yield _load_frame(uri, size, metrics)
+
+
+def _iter_frames_prefetched(
+    uris: Iterable[str],
+    size: Tuple[int, int],
+    workers: int,
+    max_in_flight: int,
+    metrics=NULL_METRICS,
+) -> Iterator:
+    """Decode frames ahead of the consumer on a bounded thread pool.
+
+    OpenCV releases the GIL while decoding and resizing, so the pool runs
+    in parallel with `VideoWriter.write` in the consuming thread.  Frames
+    are yielded in the order of `uris`, with `None` for any that could not
+    be decoded.
+
+    Args:
+        uris: Image paths in output order.
+        size: Target `(width, height)` of every frame.
+        workers: Number of decoder threads.
+        max_in_flight: Maximum number of frames submitted or decoded but not
+            yet consumed.
+        metrics: Receives `frame_decode` timings from the decoder threads.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    pending: deque = deque()
+    uri_iter = iter(uris)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for uri in uri_iter:
+            pending.append(pool.submit(_load_frame, uri, size, metrics))
+            if len(pending) >= max_in_flight:
+                break
+        while pending:
+            img = pending.popleft().result()
+            uri = next(uri_iter, None)
+            if uri is not None:
+                pending.append(pool.submit(_load_frame, uri, size, metrics))
+            yield img
+
+
+def _iter_resized(frames: Iterable, size: Tuple[int, int]) -> Iterator:
+    """Yield in-memory frames, resizing any that do not match `size`."""
+    import cv2  # type: ignore
+
+    for img in frames:
+        if (img.shape[1], img.shape[0]) != size:
+            img = cv2.resize(img, size)
+        yield img
+
+
+def _repeat_counts(durations: List[float], fps: float) -> List[int]:
+    """Return how many times each frame is written in a constant-rate video.
+
+    Rounding the running total keeps the video in sync with the timeline
+    however many frames there are.
+    """
+    counts = []
+    elapsed = 0.0
+    for duration in durations:
+        start = round(elapsed * fps)
+        elapsed += duration
+        counts.append(round(elapsed * fps) - start)
+    return counts
+
+
+def _write_cfr(writer, frames: Iterable, counts: List[int], metrics=NULL_METRICS, held=None) -> int:
+    """Write a constant-rate video, holding each frame for its duration.
+
+    A held frame is the same decoded array submitted again; it is not
+    decoded, resized or converted again.  Undecodable frames (`None`) hold
+    the previous frame instead, or `held` before the first decodable one.
+
+    Args:
+        counts: Times each frame is written, from `_repeat_counts`.
+
+    Returns:
+        The number of frames written.
+    """
+    written = 0
+    for img, count in zip(frames, counts):
+        held = held if img is None else img
+        with metrics.span("video_write"):
+            for _ in range(count):
+                writer.write(held)
+        written += count
+    return written
+
+
+def _write_once(
+    writer, frames: Iterable, metrics=NULL_METRICS, start: int = 0, leading: Optional[List[int]] = None
+) -> List[List[int]]:
+    """Write each decodable frame once.
+
+    Args:
+        start: Timeline position of the first frame.
+        leading: Receives the positions of any undecodable frames before
+            the first one written.
+
+    Returns:
+        For every sample written, the timeline positions it covers: its own
+        and those of any undecodable frames straight after it.
+    """
+    samples: List[List[int]] = []
+    for index, img in enumerate(frames, start=start):
+        if img is None:
+            if samples:
+                samples[-1].append(index)
+            elif leading is not None:
+                leading.append(index)
+            continue
+        with metrics.span("video_write"):
+            writer.write(img)
+        samples.append([index])
+    return samples
+
+
+def _split_segments(costs: List[int], parts: int) -> List[Tuple[int, int]]:
+    """Split timeline positions into at most `parts` contiguous ranges of similar cost.
+
+    Returns:
+        `(start, stop)` position ranges covering the whole timeline.
+    """
+    total = sum(costs)
+    bounds: List[Tuple[int, int]] = []
+    start, done = 0, 0
+    for index, cost in enumerate(costs[:-1]):
+        done += cost
+        if len(bounds) < parts - 1 and done * parts >= total * (len(bounds) + 1):
+            bounds.append((start, index + 1))
+            start = index + 1
+    bounds.append((start, len(costs)))
+    return bounds
+
+
+def _segment_frames(source: Tuple[str, object], start: int, stop: int, size: Tuple[int, int]) -> Iterator:
+    """Yield frames `start` to `stop` of a `("uris", paths)`, `("manifest", path)` or `("store", path)` source."""
+    kind, value = source
+    if kind == "store":
+        store = FrameStore(value)  # type: ignore[arg-type]
+        return _iter_resized((store[i] for i in range(start, stop)), size)
+    if kind == "manifest":
+        return _iter_frames(_iter_fetched(iter_media_manifest(value, start, stop)), size)  # type: ignore[arg-type]
+    return _iter_frames(value[start:stop], size)  # type: ignore[index]
+
+
+def _encode_segment(job: dict) -> dict:
+    """Encode one segment of the timeline to its own MP4 in a pool process.
+
+    Args:
+        job: `source`, `start`, `stop`, `size`, `path`, the writer `fps`
+            and, for a constant-rate video, the segment's repeat `counts`.
+
+    Returns:
+        `path`, whether anything was `written`, and, for a variable-rate
+        video, the `samples` written and the `leading` undecodable positions
+        with timeline positions.
+    """
+    import cv2  # type: ignore
+
+    start, size = job["start"], job["size"]
+    frames = _segment_frames(job["source"], start, job["stop"], size)
+    writer = cv2.VideoWriter(job["path"], _video_fourcc(), job["fps"], size)
+    try:
+        if job["counts"] is None:
+            leading: List[int] = []
+            samples = _write_once(writer, frames, start=start, leading=leading)
+            return {"path": job["path"], "written": bool(samples), "samples": samples, "leading": leading}
+        first = next(frames)
+        held = None
+        # An undecodable first frame holds the last decodable frame of an
+        # earlier segment, as the single writer would.
+        for index in range(start - 1, -1, -1) if first is None else ():
+            held = next(_segment_frames(job["source"], index, index + 1, size))
+            if held is not None:
+                break
+        written = _write_cfr(writer, chain([first], frames), job["counts"], held=held)
+        return {"path": job["path"], "written": written > 0}
+    finally:
+        writer.release()
+
+
+def _encode_segmented(
+    source: Tuple[str, object],
+    size: Tuple[int, int],
+    output_path: str,
+    segments: List[Tuple[int, int]],
+    fps: float,
+    counts: Optional[List[int]],
+    metrics=NULL_METRICS,
+) -> Optional[List[List[int]]]:
+    """Encode timeline segments in parallel processes and join them.
+
+    Returns:
+        For a variable-rate video, the samples written with the timeline
+        positions each covers, as `_write_once` returns them; `None` for a
+        constant-rate video.
+    """
+    import shutil
+    from concurrent.futures import ProcessPoolExecutor
+
+    segment_dir = f"{os.path.splitext(output_path)[0]}_segments"
+    os.makedirs(segment_dir, exist_ok=True)
+    jobs = [
+        {
+            "source": source,
+            "start": start,
+            "stop": stop,
+            "size": size,
+            "path": os.path.join(segment_dir, f"segment_{i}.mp4"),
+            "fps": fps,
+            "counts": None if counts is None else counts[start:stop],
+        }
+        for i, (start, stop) in enumerate(segments)
+    ]
+    try:
+        with metrics.span("segment_encode"):
+            with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+                results = list(pool.map(_encode_segment, jobs))
+        with metrics.span("segment_join"):
+            concat_mp4([r["path"] for r in results if r["written"]], output_path)
+    finally:
+        shutil.rmtree(segment_dir, ignore_errors=True)
+    if counts is not None:
+        return None
+    samples: List[List[int]] = []
+    for result in results:
+        if samples:
+            samples[-1].extend(result["leading"])
+        samples.extend(result["samples"])
+    return samples
 
 
 def handle(request):  # type: ignore[override]
@@ -22,59 +409,297 @@ def handle(request):  # type: ignore[override]
 
     Args:
         request: Flask `Request` containing JSON with:
-            - media_uris: List of file paths to images
-            - narration_uri: Path to a WAV file (ignored in this stub)
-            - gcs_bucket: Placeholder for bucket name
+            - media_uris: List of image URIs
+            - frames: In-process alternative to `media_uris`; an iterable of
+              BGR frame arrays
+            - frame_store_uri: Alternative to `media_uris`; URI of a frame
+              store holding every frame
+            - media_manifest_uri: Alternative to `media_uris`; URI of a
+              media manifest listing every frame
+            - run_id: Optional run identifier; derived from the media
+              folder, frame store or media manifest name when omitted
+            - narration_uri: URI of the narration WAV; its length is shared
+              equally between the frames
+            - frame_durations: Optional seconds to show each frame for
+            - sentence_timings: Optional per-sentence narration timings,
+              each with `start` and `end` in seconds, one per frame, as
+              returned by the narrator
+            - sentence_timings_uri: Alternative to `sentence_timings`; URI
+              of the narrator's stored timings
+            - timeline: `"vfr"` (default) to encode each frame once with
+              its own duration, or `"cfr"` for a constant-rate video
+            - fps: Output rate in `"cfr"` mode (default 25)
+            - frame_count: Number of in-memory frames; needed in `"cfr"`
+              mode when the timeline comes from the narration length
+            - gcs_bucket: Storage bucket for the video (`"local"` or
+              omitted keeps it under `outputs/`)
+            - transfer_workers: Optional number of concurrent frame
+              downloads
             - project_id, region: Unused placeholders
+            - decode_workers: Optional number of decoder threads; enables
+              the pipelined mode when greater than zero
+            - max_in_flight: Optional cap on frames decoded ahead of the
+              writer (defaults to twice `decode_workers`)
+            - encode_workers: Optional number of processes encoding
+              segments of the timeline in parallel; needs `media_uris`,
+              `media_manifest_uri` or `frame_store_uri`
+            - warm_up: When true, only run `warm_up()` and return
+              `{"status": "warm"}`
 
     Returns:
-        JSON response with an `output_uri` pointing to the generated MP4 file.
+        JSON response with an `output_uri` pointing to the stored MP4 file
+        and its `duration_sec`, plus phase timings under `metrics` when the
+        payload sets `metrics`.
     """
+    metrics = Metrics("video_assembly")
+    return metrics.finish(_handle(request, metrics))
+
+
+def handle_batch(request):  # type: ignore[override]
+    """Entry point for a batch of video assembly jobs.
+
+    Runs every job through `handle` in this instance.  `warm_up()` runs once
+    for the whole batch, so every job reuses the loaded encoder.
+
+    Args:
+        request: Flask `Request` containing JSON with `jobs`, a list of
+            payloads as accepted by `handle`, run one after another.
+
+    Returns:
+        JSON response with each job's response (or `error`) under
+        `results`, in order, and `succeeded` and `failed` counts.
+    """
+    return run_batch(request, handle, warm_up)
+
+
+def _handle(request, metrics: Metrics):
+    """Handle a request, recording phase timings in `metrics`."""
     # Parse input JSON
-    if hasattr(request, "get_json"):
-        data = request.get_json(silent=True) or {}
-    elif isinstance(request, dict):
-        data = request
-    else:
+    with metrics.span("payload_parse"):
         try:
-            data = json.loads(request)  # type: ignore
-        except Exception:
-            return {"error": "Invalid JSON payload"}
+            data = decode_request(request)
+        except PayloadError as e:
+            return {"error": str(e)}
+    metrics.configure(data)
+    if data.get("warm_up"):
+        with metrics.span("warm_up"):
+            warm_up()
+        return {"status": "warm"}
 
-    media_uris = data.get("media_uris", [])
+    media_uris = data.get("media_uris") or []
+    in_memory_frames = data.get("frames")
     # Derive run_id from first media URI
-    run_id = "test"
-    if media_uris:
+    run_id = data.get("run_id") or "test"
+    if media_uris and not data.get("run_id"):
         parts = media_uris[0].split(os.sep)
         if len(parts) >= 2:
             parent = parts[-2]
             run_id = parent.replace("_media", "")
 
-    if not media_uris:
+    frame_store_uri = data.get("frame_store_uri")
+    if frame_store_uri and not data.get("run_id"):
+        run_id = os.path.basename(frame_store_uri).rsplit("_frames", 1)[0]
+    media_manifest_uri = data.get("media_manifest_uri")
+    if media_manifest_uri and not data.get("run_id"):
+        run_id = os.path.basename(media_manifest_uri).rsplit("_media_manifest", 1)[0]
+
+    if not media_uris and in_memory_frames is None and not frame_store_uri and not media_manifest_uri:
         return {"error": "No media URIs provided"}
 
-    # Determine frame size from first image
-    first_img = cv2.imread(media_uris[0])
-    if first_img is None:
-        return jsonify({"error": "Unable to read image file"}), 400
+    try:
+        decode_workers = int(data.get("decode_workers") or 0)
+        max_in_flight = int(data.get("max_in_flight") or 2 * decode_workers)
+    except (TypeError, ValueError):
+        return {"error": "Invalid decode_workers or max_in_flight value"}
+    try:
+        encode_workers = int(data.get("encode_workers") or 1)
+    except (TypeError, ValueError):
+        return {"error": "Invalid encode_workers value"}
+    if encode_workers > 1 and in_memory_frames is not None:
+        return {"error": "encode_workers needs media_uris, media_manifest_uri or frame_store_uri"}
+    try:
+        storage = get_backend(data.get("gcs_bucket"))
+        transfer_workers = int(data.get("transfer_workers") or DEFAULT_TRANSFER_WORKERS)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    mode = data.get("timeline", "vfr")
+    if mode not in ("vfr", "cfr"):
+        return {"error": "Invalid timeline mode"}
+    try:
+        fps = float(data.get("fps") or DEFAULT_CFR_FPS)
+    except (TypeError, ValueError):
+        return {"error": "Invalid fps value"}
+    if fps <= 0:
+        return {"error": "Invalid fps value"}
+    frame_durations = data.get("frame_durations")
+    # The narrator returns an empty list when it had no script to time.
+    sentence_timings = data.get("sentence_timings") or None
+    if sentence_timings is None and data.get("sentence_timings_uri"):
+        with metrics.span("storage_fetch"):
+            try:
+                with open(fetch(data["sentence_timings_uri"]), "r", encoding="utf-8") as f:
+                    sentence_timings = json.load(f) or None
+            except FileNotFoundError:
+                return {"error": "Unable to read sentence timings"}
+            except json.JSONDecodeError as e:
+                return {"error": f"Invalid sentence timings: {e}"}
+    narration_total = None
+    if frame_durations is None and sentence_timings is None and data.get("narration_uri"):
+        with metrics.span("narration_read"):
+            try:
+                narration_total = wav_duration(fetch(data["narration_uri"]))
+            except (OSError, EOFError) as e:
+                return {"error": f"Unable to read narration: {e}"}
+    timed = frame_durations is not None or sentence_timings is not None or narration_total is not None
+
+    def timeline(n_frames: int) -> List[float]:
+        return build_timeline(n_frames, durations=frame_durations, timings=sentence_timings, total=narration_total)
+
+    # The number of frames is known up front except for in-memory frames.
+    if frame_store_uri and in_memory_frames is None and not media_uris:
+        with metrics.span("storage_fetch"):
+            try:
+                in_memory_frames = FrameStore(fetch(frame_store_uri))
+            except FileNotFoundError:
+                return {"error": "Unable to read frame store"}
+            except ValueError as e:
+                return {"error": str(e)}
+        n_frames = len(in_memory_frames)
+    elif media_manifest_uri and in_memory_frames is None and not media_uris:
+        with metrics.span("storage_fetch"):
+            try:
+                manifest_path = fetch(media_manifest_uri)
+                n_frames = int(read_media_manifest_header(manifest_path)["count"])
+            except FileNotFoundError:
+                return {"error": "Unable to read media manifest"}
+            except (KeyError, TypeError, ValueError) as e:
+                return {"error": f"Invalid media manifest: {e}"}
+    elif in_memory_frames is None:
+        n_frames = len(media_uris)
+    else:
+        n_frames = data.get("frame_count")
+    if n_frames is None and frame_durations is not None:
+        n_frames = len(frame_durations)
+    elif n_frames is None and sentence_timings is not None:
+        n_frames = len(sentence_timings)
+    durations = None
+    if n_frames is not None:
+        try:
+            durations = timeline(int(n_frames))
+        except (TypeError, ValueError) as e:
+            return {"error": str(e)}
+    elif mode == "cfr":
+        return {"error": "frame_count is required for a cfr timeline of in-memory frames"}
+
+    if media_uris:
+        # Remote frames are downloaded as a batch; local paths pass through.
+        with metrics.span("storage_fetch"):
+            try:
+                media_uris = download_many(media_uris, workers=transfer_workers)
+            except FileNotFoundError:
+                return {"error": "Unable to read image file"}
+
+    # Manifest entries are read, and remote frames downloaded, as the
+    # encoder reaches them.
+    if media_uris:
+        frame_paths: Iterator[str] = iter(media_uris)
+    elif in_memory_frames is None:
+        frame_paths = _iter_fetched(iter_media_manifest(manifest_path), transfer_workers)
+
+    # Determine frame size from first image; the decoded frame is written
+    # as-is rather than being read a second time.
+    if in_memory_frames is not None:
+        frame_iter = iter(in_memory_frames)
+        first_img = next(frame_iter, None)
+        if first_img is None:
+            return {"error": "No frames provided"}
+    else:
+        try:
+            first_path = next(frame_paths, None)
+        except FileNotFoundError:
+            return {"error": "Unable to read image file"}
+        if first_path is None:
+            return {"error": "No media URIs provided"}
+        first_img = _load_frame(first_path, metrics=metrics)
+        if first_img is None:
+            return {"error": "Unable to read image file"}
     height, width, _ = first_img.shape
 
     # Create video writer
     output_path = os.path.join("outputs", f"{run_id}_final.mp4")
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    fps = 1  # 1 frame per second; adjust as needed
-    video_writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    import cv2  # type: ignore
 
-    for uri in media_uris:
-        img = cv2.imread(uri)
-        if img is None:
-            continue
-        # Resize to match first image's dimensions if necessary
-        if img.shape[0] != height or img.shape[1] != width:
-            img = cv2.resize(img, (width, height))
-        video_writer.write(img)
+    writer_fps = fps if mode == "cfr" else FPS
+    counts = _repeat_counts(durations, fps) if mode == "cfr" else None
+    segments: List[Tuple[int, int]] = []
+    if encode_workers > 1:
+        # Segments are balanced by the frames each one writes.
+        parts = min(encode_workers, n_frames // MIN_SEGMENT_FRAMES)
+        if parts > 1:
+            segments = _split_segments(counts if counts is not None else [1] * n_frames, parts)
+
+    if len(segments) > 1:
+        if isinstance(in_memory_frames, FrameStore):
+            source = ("store", in_memory_frames.path)
+        elif media_uris:
+            source = ("uris", media_uris)
+        else:
+            source = ("manifest", manifest_path)
+        del first_img
+        try:
+            samples = _encode_segmented(source, (width, height), output_path, segments, writer_fps, counts, metrics)
+        except FileNotFoundError:
+            return {"error": "Unable to read image file"}
+        except ValueError as e:
+            return {"error": f"Unable to join the segments: {e}"}
+    else:
+        video_writer = cv2.VideoWriter(output_path, _video_fourcc(), writer_fps, (width, height))
+        if in_memory_frames is not None:
+            frames = _iter_resized(frame_iter, (width, height))
+        elif decode_workers > 0:
+            frames = _iter_frames_prefetched(
+                frame_paths, (width, height), decode_workers, max(1, max_in_flight), metrics
+            )
+        else:
+            frames = _iter_frames(frame_paths, (width, height), metrics)
+
+        all_frames = chain([first_img], frames)
+        del first_img
+        try:
+            if mode == "cfr":
+                _write_cfr(video_writer, all_frames, counts, metrics)
+                samples = None
+            else:
+                samples = _write_once(video_writer, all_frames, metrics)
+        except FileNotFoundError:
+            return {"error": "Unable to read image file"}
+        finally:
+            video_writer.release()
+
+    if mode == "cfr":
+        duration_sec = sum(durations)
+    else:
+        n_total = samples[-1][-1] + 1
+        if not timed:
+            # Every written frame already lasts 1 / FPS seconds.
+            duration_sec = len(samples) / FPS
+        else:
+            try:
+                if durations is None or len(durations) != n_total:
+                    durations = timeline(n_total)
+                sample_durations = [sum(durations[i] for i in sample) for sample in samples]
+                with metrics.span("timeline_apply"):
+                    apply_frame_durations(output_path, sample_durations)
+            except ValueError as e:
+                return {"error": f"Unable to apply the timeline: {e}"}
+            duration_sec = sum(sample_durations)
+
+    with metrics.span("storage_put"):
+        output_uri = storage.put_file(output_path)
+    return {"output_uri": output_uri, "duration_sec": duration_sec}
 
-    video_writer.release()
 
-    return {"output_uri": output_path}
\ No newline at end of file
+if os.environ.get("WARM_UP_ON_LOAD"):
+    warm_up()
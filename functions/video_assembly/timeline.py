@@ -0,0 +1,279 @@
+"""Frame timelines and variable-frame-rate MP4 timing.
+
+A timeline is a list with one duration in seconds for each frame of the
+video.  `build_timeline` derives it from explicit per-frame durations, from
+per-sentence narration timings or from the total length of the narration
+WAV.
+
+OpenCV's `VideoWriter` only writes constant-rate video.  Holding a static
+slide for several seconds at a normal frame rate would therefore mean encoding
+the same picture dozens of times per second.  Instead, video assembly writes
+each distinct frame once and then calls `apply_frame_durations`.  That
+rewrites the MP4's time-to-sample table (`stts`) so each sample lasts as long
+as its timeline entry.  Players honour per-sample durations, so encoding
+cost depends on the number of slides and not on the length of the video.
+Only the `moov` metadata is rebuilt; the encoded frames are copied
+unchanged.
+"""
+
+import os
+import struct
+import wave
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_FRAME_SECONDS = 1.0
+# Media timescale written into the rewritten track (ticks per second).
+TIMESCALE = 90000
+# Boxes that only contain other boxes, on the path to the ones rewritten.
+_CONTAINERS = {b"moov", b"trak", b"edts", b"mdia", b"minf", b"stbl"}
+_COPY_BYTES = 1024 * 1024
+
+
+def wav_duration(path: str) -> float:
+    """Return the length of a WAV file in seconds."""
+    with wave.open(path, "rb") as wav:
+        return wav.getnframes() / float(wav.getframerate())
+
+
+def build_timeline(
+    n_frames: int,
+    durations: Optional[Sequence[float]] = None,
+    timings: Optional[Sequence[Dict[str, float]]] = None,
+    total: Optional[float] = None,
+    weights: Optional[Sequence[float]] = None,
+) -> List[float]:
+    """Return the display duration of each of `n_frames` frames.
+
+    The first source given is used:
+
+    Args:
+        n_frames: Number of frames in the video.
+        durations: Explicit seconds per frame.
+        timings: Per-sentence narration timings, each with `start` and
+            `end` in seconds.  A frame is shown from its sentence's start
+            until the next sentence starts, and the last frame until its
+            sentence ends, so pauses between sentences are covered.
+        total: Length of the narration in seconds, shared out in proportion
+            to `weights` (equally when omitted).
+        weights: Relative share of `total` for each frame.
+
+    Without any source every frame lasts `DEFAULT_FRAME_SECONDS`.
+
+    Raises:
+        ValueError: If a source does not have one entry per frame or holds
+            a negative duration.
+    """
+    if durations is not None:
+        result = [float(d) for d in durations]
+    elif timings is not None:
+        if len(timings) != n_frames:
+            raise ValueError(f"Expected {n_frames} sentence timings, got {len(timings)}")
+        starts = [0.0] + [float(t["start"]) for t in timings[1:]]
+        ends = starts[1:] + [float(timings[-1]["end"])] if timings else []
+        result = [end - start for start, end in zip(starts, ends)]
+    elif total is not None:
+        weights = [1.0] * n_frames if weights is None else [float(w) for w in weights]
+        if len(weights) != n_frames:
+            raise ValueError(f"Expected {n_frames} weights, got {len(weights)}")
+        weight_sum = sum(weights) or 1.0
+        result = [float(total) * w / weight_sum for w in weights]
+    else:
+        result = [DEFAULT_FRAME_SECONDS] * n_frames
+    if len(result) != n_frames:
+        raise ValueError(f"Expected {n_frames} frame durations, got {len(result)}")
+    if any(d < 0 for d in result):
+        raise ValueError("Frame durations must not be negative")
+    return result
+
+
+class _Box:
+    """An MP4 box: either raw payload bytes or a list of child boxes."""
+
+    def __init__(self, kind: bytes, payload: bytes = b"", children: Optional[List["_Box"]] = None) -> None:
+        self.kind = kind
+        self.payload = payload
+        self.children = children
+
+    def find(self, *path: bytes) -> List["_Box"]:
+        """Return every descendant reached by following `path`."""
+        found = [self]
+        for kind in path:
+            found = [child for box in found for child in (box.children or []) if child.kind == kind]
+        return found
+
+    def to_bytes(self) -> bytes:
+        body = b"".join(child.to_bytes() for child in self.children) if self.children is not None else self.payload
+        return struct.pack(">I4s", 8 + len(body), self.kind) + body
+
+
+def _parse_boxes(data: bytes) -> List[_Box]:
+    boxes = []
+    offset = 0
+    while offset < len(data):
+        size, kind = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = len(data) - offset
+        body = data[offset + header:offset + size]
+        if kind in _CONTAINERS:
+            boxes.append(_Box(kind, children=_parse_boxes(body)))
+        else:
+            boxes.append(_Box(kind, payload=body))
+        offset += size
+    return boxes
+
+
+def _top_level_boxes(f) -> List[tuple]:
+    """Return `(kind, offset, size)` for each top-level box of an open file."""
+    boxes = []
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    offset = 0
+    while offset < file_size:
+        f.seek(offset)
+        size, kind = struct.unpack(">I4s", f.read(8))
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+        elif size == 0:
+            size = file_size - offset
+        boxes.append((kind, offset, size))
+        offset += size
+    return boxes
+
+
+def _set_duration(box: _Box, duration_offsets: tuple, value: int) -> None:
+    """Write `value` into a full box's duration field for its version."""
+    payload = bytearray(box.payload)
+    if payload[0] == 1:
+        struct.pack_into(">Q", payload, duration_offsets[1], value)
+    else:
+        struct.pack_into(">I", payload, duration_offsets[0], min(value, 0xFFFFFFFF))
+    box.payload = bytes(payload)
+
+
+def _retime_track(trak: _Box, durations: Sequence[float], movie_timescale: int) -> None:
+    mdhd = trak.find(b"mdia", b"mdhd")[0]
+    stts = trak.find(b"mdia", b"minf", b"stbl", b"stts")[0]
+    old_timescale = struct.unpack_from(">I", mdhd.payload, 20 if mdhd.payload[0] == 1 else 12)[0]
+
+    count = struct.unpack_from(">I", stts.payload, 4)[0]
+    samples = sum(struct.unpack_from(">I", stts.payload, 8 + 8 * i)[0] for i in range(count))
+    if samples != len(durations):
+        raise ValueError(f"Track has {samples} frames but the timeline has {len(durations)}")
+
+    # Cumulative rounding keeps the total exact however many frames there
+    # are.  Every sample needs at least one tick.
+    deltas, elapsed, ticks_so_far = [], 0.0, 0
+    for duration in durations:
+        elapsed += duration
+        delta = max(1, round(elapsed * TIMESCALE) - ticks_so_far)
+        deltas.append(delta)
+        ticks_so_far += delta
+    entries = []
+    for delta in deltas:
+        if entries and entries[-1][1] == delta:
+            entries[-1][0] += 1
+        else:
+            entries.append([1, delta])
+    stts.payload = stts.payload[:4] + struct.pack(f">I{2 * len(entries)}I", len(entries), *(v for e in entries for v in e))
+
+    # Composition offsets and the edit list's media time are in media
+    # ticks, so they follow the new timescale.
+    for ctts in trak.find(b"mdia", b"minf", b"stbl", b"ctts"):
+        payload = bytearray(ctts.payload)
+        for i in range(struct.unpack_from(">I", payload, 4)[0]):
+            offset = struct.unpack_from(">i", payload, 12 + 8 * i)[0]
+            struct.pack_into(">i", payload, 12 + 8 * i, round(offset * TIMESCALE / old_timescale))
+        ctts.payload = bytes(payload)
+
+    payload = bytearray(mdhd.payload)
+    if payload[0] == 1:
+        struct.pack_into(">IQ", payload, 20, TIMESCALE, ticks_so_far)
+    else:
+        struct.pack_into(">II", payload, 12, TIMESCALE, min(ticks_so_far, 0xFFFFFFFF))
+    mdhd.payload = bytes(payload)
+
+    movie_duration = round(ticks_so_far / TIMESCALE * movie_timescale)
+    for tkhd in trak.find(b"tkhd"):
+        _set_duration(tkhd, (20, 28), movie_duration)
+    for elst in trak.find(b"edts", b"elst"):
+        payload = bytearray(elst.payload)
+        version = payload[0]
+        if struct.unpack_from(">I", payload, 4)[0] == 1:
+            if version == 1:
+                media_time = struct.unpack_from(">q", payload, 16)[0]
+                new_time = media_time if media_time < 0 else round(media_time * TIMESCALE / old_timescale)
+                struct.pack_into(">Qq", payload, 8, movie_duration, new_time)
+            else:
+                media_time = struct.unpack_from(">i", payload, 12)[0]
+                new_time = media_time if media_time < 0 else round(media_time * TIMESCALE / old_timescale)
+                struct.pack_into(">Ii", payload, 8, min(movie_duration, 0xFFFFFFFF), new_time)
+            elst.payload = bytes(payload)
+        else:
+            raise ValueError("Edit lists with several entries are not supported")
+
+
+def _shift_chunk_offsets(moov: _Box, shift: int) -> None:
+    for stco in moov.find(b"trak", b"mdia", b"minf", b"stbl", b"stco"):
+        count = struct.unpack_from(">I", stco.payload, 4)[0]
+        offsets = struct.unpack_from(f">{count}I", stco.payload, 8)
+        stco.payload = stco.payload[:8] + struct.pack(f">{count}I", *(o + shift for o in offsets))
+    for co64 in moov.find(b"trak", b"mdia", b"minf", b"stbl", b"co64"):
+        count = struct.unpack_from(">I", co64.payload, 4)[0]
+        offsets = struct.unpack_from(f">{count}Q", co64.payload, 8)
+        co64.payload = co64.payload[:8] + struct.pack(f">{count}Q", *(o + shift for o in offsets))
+
+
+def apply_frame_durations(path: str, durations: Sequence[float]) -> None:
+    """Give each frame of a single-track MP4 its own display duration.
+
+    Args:
+        path: MP4 file written with one sample per frame.
+        durations: Seconds each frame is shown for, in order.
+
+    Raises:
+        ValueError: If the file is not a single video track MP4 with one
+            sample per entry of `durations`.
+    """
+    with open(path, "rb") as src:
+        top = _top_level_boxes(src)
+        moov_entry = next((box for box in top if box[0] == b"moov"), None)
+        if moov_entry is None:
+            raise ValueError(f"{path} has no moov box")
+        src.seek(moov_entry[1])
+        moov = _parse_boxes(src.read(moov_entry[2]))[0]
+
+        traks = moov.find(b"trak")
+        if len(traks) != 1:
+            raise ValueError(f"Expected one track in {path}, found {len(traks)}")
+        mvhd = moov.find(b"mvhd")[0]
+        movie_timescale = struct.unpack_from(">I", mvhd.payload, 20 if mvhd.payload[0] == 1 else 12)[0]
+        _retime_track(traks[0], durations, movie_timescale)
+        movie_duration = round(sum(durations) * movie_timescale)
+        _set_duration(mvhd, (16, 24), movie_duration)
+
+        new_moov = moov.to_bytes()
+        shift = len(new_moov) - moov_entry[2]
+        if shift and any(kind == b"mdat" and offset > moov_entry[1] for kind, offset, _ in top):
+            # The frames move by the change in moov's size.
+            _shift_chunk_offsets(moov, shift)
+            new_moov = moov.to_bytes()
+
+        tmp_path = f"{path}.retime.tmp"
+        with open(tmp_path, "wb") as dst:
+            for kind, offset, size in top:
+                if kind == b"moov":
+                    dst.write(new_moov)
+                    continue
+                src.seek(offset)
+                remaining = size
+                while remaining:
+                    chunk = src.read(min(_COPY_BYTES, remaining))
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    remaining -= len(chunk)
+    os.replace(tmp_path, path)
@@ -0,0 +1,718 @@
+"""Durable local job queue driving the pipeline stages.
+
+`trigger_video.py`, `orchestrator.py` and `test_pipeline.py` start runs one
+at a time, with nothing between a producer and the stages.  This module keeps
+a queue of stage jobs in a SQLite database (`outputs/jobs.sqlite` by
+default), so a burst of submissions is stored and worked off at the pace the
+machine allows:
+
+* `submit` adds a run.  Its first job is the scriptwriter.  Each finished
+  stage enqueues the stages that only waited for it (media sourcing and the
+  narrator after the scriptwriter, video assembly once both are done, then
+  the uploader), with the payload built from the earlier responses.
+* Jobs are claimed by priority (higher first), then in submission order.  A
+  run's jobs all have the run's priority.
+* Per-stage concurrency limits (`limits`) cap how many jobs of a stage run
+  at once across every worker process sharing the database.
+* A claimed job is leased for a visibility timeout, which the worker extends
+  while the stage runs.  If a worker crashes, its lease expires and the job
+  is queued again for another worker.  Failed or expired jobs are retried
+  with exponential backoff up to `max_attempts`, after which the run fails.
+* Backpressure: `submit` refuses a run with `QueueFull` while
+  `max_pending` runs are still unfinished, or waits for room with `--wait`.
+
+`stats` reports each stage's queue depth, running and finished jobs, and the
+mean and 95th percentile of its wait time (from being queued to being
+claimed) and service time (from being claimed to finishing).
+
+Stages run the in-process handlers in `functions/` against local storage,
+like `test_pipeline.py`, in the worker's working directory.
+
+Usage:
+
+```bash
+python3 job_queue.py submit "community empowerment" "local elections" --priority 5
+python3 job_queue.py limits media_sourcing=2 video_assembly=1
+python3 job_queue.py worker --threads 4 --exit-when-idle
+python3 job_queue.py stats
+```
+"""
+
+import argparse
+import importlib
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+DEFAULT_DB = os.path.join("outputs", "jobs.sqlite")
+DEFAULT_VISIBILITY_TIMEOUT = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_MAX_PENDING = 100
+# Seconds before the first retry; doubled for every further attempt.
+RETRY_BACKOFF = 5.0
+
+# Each stage's handler module and the stages whose responses it needs.
+STAGES: Dict[str, Dict[str, Any]] = {
+    "scriptwriter": {"module": "functions.scriptwriter.main", "after": ()},
+    "media_sourcing": {"module": "functions.media_sourcing.main", "after": ("scriptwriter",)},
+    "narrator": {"module": "functions.narrator.main", "after": ("scriptwriter",)},
+    "video_assembly": {"module": "functions.video_assembly.main", "after": ("media_sourcing", "narrator")},
+    "uploader": {"module": "functions.uploader.main", "after": ("scriptwriter", "video_assembly")},
+}
+FINAL_STAGE = "uploader"
+# Rendering and encoding use every core they get, so only a few run at once
+# unless `limits` says otherwise.
+DEFAULT_STAGE_LIMITS = {"media_sourcing": 2, "video_assembly": 2}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    enqueued_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    started_at REAL,
+    lease_expires REAL,
+    worker TEXT,
+    finished_at REAL,
+    result TEXT,
+    error TEXT,
+    UNIQUE (run_id, stage)
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, priority DESC, id);
+CREATE TABLE IF NOT EXISTS stage_limits (
+    stage TEXT PRIMARY KEY,
+    max_running INTEGER NOT NULL
+);
+"""
+
+
+class QueueFull(RuntimeError):
+    """The queue already holds `max_pending` unfinished runs."""
+
+
+@dataclass
+class Job:
+    """A stage job claimed by a worker.
+
+    `attempt` fences the lease: a worker whose lease expired and was taken
+    over can no longer extend, complete or fail the job.
+    """
+
+    id: int
+    run_id: str
+    stage: str
+    payload: Dict[str, Any]
+    attempt: int
+    max_attempts: int
+
+
+def stage_payload(stage: str, run_id: str, topic: str, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Return the request body of `stage` from the responses it waited for."""
+    script = results.get("scriptwriter", {})
+    # The index's URI, the media manifest and the timings' URI keep queued
+    # payloads and results small; stages load them themselves.
+    script_index = script.get("script_index_uri") or script.get("script_index")
+    if stage == "scriptwriter":
+        return {"topic": topic, "bucket": "local", "run_id": run_id, "inline_index": False}
+    if stage == "media_sourcing":
+        return {"script_index": script_index, "gcs_bucket": "local", "media_manifest": True}
+    if stage == "narrator":
+        return {"script_index": script_index, "gcs_bucket": "local", "run_id": run_id, "inline_timings": False}
+    if stage == "video_assembly":
+        narrator, media = results["narrator"], results["media_sourcing"]
+        return {
+            "media_manifest_uri": media.get("media_manifest_uri"),
+            "media_uris": media.get("media_uris"),
+            "narration_uri": narrator.get("audio_uri"),
+            "sentence_timings": narrator.get("sentence_timings"),
+            "sentence_timings_uri": narrator.get("sentence_timings_uri"),
+            "gcs_bucket": "local",
+            "run_id": run_id,
+        }
+    if stage == "uploader":
+        final_uri = results["video_assembly"].get("output_uri")
+        return {"final_uri": final_uri, "script_index": script_index, "run_id": run_id}
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class JobQueue:
+    """SQLite-backed queue of pipeline stage jobs.
+
+    Every thread gets its own connection, and every change runs in an
+    immediate transaction, so any number of worker threads and processes
+    can share one database file.
+
+    Args:
+        path: Database file; created with its tables if missing.
+        max_attempts: Attempts allowed per job before its run fails.
+        retry_backoff: Seconds before the first retry of a failed job.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_DB,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_backoff: float = RETRY_BACKOFF,
+    ) -> None:
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        with self._transaction() as conn:
+            # The default limits are set once, when the database is new, so
+            # limits removed later stay removed.
+            if conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO stage_limits (stage, max_running) VALUES (?, ?)",
+                    DEFAULT_STAGE_LIMITS.items(),
+                )
+                conn.execute("PRAGMA user_version = 1")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def set_limit(self, stage: str, max_running: Optional[int]) -> None:
+        """Cap the number of `stage` jobs running at once; `None` removes the cap."""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        with self._transaction() as conn:
+            if max_running is None:
+                conn.execute("DELETE FROM stage_limits WHERE stage = ?", (stage,))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO stage_limits (stage, max_running) VALUES (?, ?)", (stage, max_running)
+                )
+
+    def limits(self) -> Dict[str, int]:
+        """Return the concurrency limit of every capped stage."""
+        return {row["stage"]: row["max_running"] for row in self._conn().execute("SELECT * FROM stage_limits")}
+
+    def submit(
+        self,
+        topic: str,
+        run_id: Optional[str] = None,
+        priority: int = 0,
+        max_pending: Optional[int] = DEFAULT_MAX_PENDING,
+    ) -> str:
+        """Add a run and queue its first stage.
+
+        Args:
+            topic: Topic for the news script.
+            run_id: Unique run identifier; generated when omitted.
+            priority: Jobs with a higher priority are claimed first.
+            max_pending: Most unfinished runs allowed; `None` for no limit.
+
+        Returns:
+            The run ID.
+
+        Raises:
+            QueueFull: If `max_pending` runs are already unfinished.
+            ValueError: If a run with `run_id` already exists.
+        """
+        run_id = run_id or uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._transaction() as conn:
+            if max_pending is not None:
+                (pending,) = conn.execute("SELECT COUNT(*) FROM runs WHERE state = 'pending'").fetchone()
+                if pending >= max_pending:
+                    raise QueueFull(f"{pending} runs are already pending (limit {max_pending})")
+            try:
+                conn.execute(
+                    "INSERT INTO runs (run_id, topic, priority, state, submitted_at) VALUES (?, ?, ?, 'pending', ?)",
+                    (run_id, topic, priority, now),
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Run {run_id} already exists") from None
+            self._enqueue(conn, run_id, "scriptwriter", priority, stage_payload("scriptwriter", run_id, topic, {}), now)
+        return run_id
+
+    def _enqueue(
+        self, conn: sqlite3.Connection, run_id: str, stage: str, priority: int, payload: Dict[str, Any], now: float
+    ) -> None:
+        conn.execute(
+            "INSERT OR IGNORE INTO jobs (run_id, stage, priority, payload, state, max_attempts, enqueued_at, "
+            "available_at) VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+            (run_id, stage, priority, json.dumps(payload), self.max_attempts, now, now),
+        )
+
+    def _recover(self, conn: sqlite3.Connection, now: float) -> None:
+        """Queue again, or fail, the jobs whose lease has expired."""
+        expired = conn.execute(
+            "SELECT id, run_id, attempts, max_attempts FROM jobs WHERE state = 'running' AND lease_expires <= ?",
+            (now,),
+        ).fetchall()
+        for row in expired:
+            self._retry_or_fail(conn, row, "Lease expired before the stage finished", now)
+
+    def _retry_or_fail(self, conn: sqlite3.Connection, row, error: str, now: float) -> None:
+        if row["attempts"] < row["max_attempts"]:
+            delay = self.retry_backoff * 2 ** (row["attempts"] - 1)
+            conn.execute(
+                "UPDATE jobs SET state = 'queued', available_at = ?, lease_expires = NULL, worker = NULL, "
+                "error = ? WHERE id = ?",
+                (now + delay, error, row["id"]),
+            )
+            return
+        conn.execute(
+            "UPDATE jobs SET state = 'failed', finished_at = ?, lease_expires = NULL, error = ? WHERE id = ?",
+            (now, error, row["id"]),
+        )
+        conn.execute(
+            "UPDATE runs SET state = 'failed', finished_at = ? WHERE run_id = ? AND state = 'pending'",
+            (now, row["run_id"]),
+        )
+
+    def claim(
+        self,
+        worker: str,
+        stages: Optional[Sequence[str]] = None,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+    ) -> Optional[Job]:
+        """Lease the most urgent ready job of `stages` (default: every stage).
+
+        Stages already running as many jobs as their limit are skipped.
+
+        Returns:
+            The job, or `None` if no job can be claimed now.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            self._recover(conn, now)
+            running = dict(
+                conn.execute("SELECT stage, COUNT(*) FROM jobs WHERE state = 'running' GROUP BY stage").fetchall()
+            )
+            limits = dict(conn.execute("SELECT stage, max_running FROM stage_limits").fetchall())
+            allowed = [
+                stage for stage in (stages or STAGES) if stage not in limits or running.get(stage, 0) < limits[stage]
+            ]
+            if not allowed:
+                return None
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE state = 'queued' AND available_at <= ? "
+                f"AND stage IN ({', '.join('?' * len(allowed))}) ORDER BY priority DESC, id LIMIT 1",
+                (now, *allowed),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, started_at = ?, lease_expires = ?, "
+                "worker = ? WHERE id = ?",
+                (now, now + visibility_timeout, worker, row["id"]),
+            )
+        return Job(
+            id=row["id"],
+            run_id=row["run_id"],
+            stage=row["stage"],
+            payload=json.loads(row["payload"]),
+            attempt=row["attempts"] + 1,
+            max_attempts=row["max_attempts"],
+        )
+
+    def extend(self, job: Job, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        """Renew the lease on `job`.
+
+        Returns:
+            Whether the worker still holds the job.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND state = 'running' AND attempts = ?",
+                (time.time() + visibility_timeout, job.id, job.attempt),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job: Job, result: Dict[str, Any]) -> bool:
+        """Record the response of `job` and queue the stages now ready.
+
+        Returns:
+            Whether the result was recorded; `False` if the lease was lost.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'done', finished_at = ?, lease_expires = NULL, result = ?, error = NULL "
+                "WHERE id = ? AND state = 'running' AND attempts = ?",
+                (now, json.dumps(result), job.id, job.attempt),
+            )
+            if cursor.rowcount != 1:
+                return False
+            run = conn.execute("SELECT * FROM runs WHERE run_id = ?", (job.run_id,)).fetchone()
+            if job.stage == FINAL_STAGE:
+                conn.execute(
+                    "UPDATE runs SET state = 'succeeded', finished_at = ? WHERE run_id = ?", (now, job.run_id)
+                )
+                return True
+            results = {
+                row["stage"]: json.loads(row["result"])
+                for row in conn.execute(
+                    "SELECT stage, result FROM jobs WHERE run_id = ? AND state = 'done'", (job.run_id,)
+                )
+            }
+            for stage, spec in STAGES.items():
+                if job.stage in spec["after"] and all(dep in results for dep in spec["after"]):
+                    payload = stage_payload(stage, job.run_id, run["topic"], results)
+                    self._enqueue(conn, job.run_id, stage, run["priority"], payload, now)
+        return True
+
+    def fail(self, job: Job, error: str) -> bool:
+        """Record a failed attempt; the job is retried until it runs out of attempts.
+
+        Returns:
+            Whether the failure was recorded; `False` if the lease was lost.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, run_id, attempts, max_attempts FROM jobs WHERE id = ? AND state = 'running' "
+                "AND attempts = ?",
+                (job.id, job.attempt),
+            ).fetchone()
+            if row is None:
+                return False
+            self._retry_or_fail(conn, row, error, now)
+        return True
+
+    def release(self, job: Job) -> None:
+        """Hand an unfinished job back without counting the attempt."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = 'queued', attempts = attempts - 1, available_at = ?, lease_expires = NULL, "
+                "worker = NULL WHERE id = ? AND state = 'running' AND attempts = ?",
+                (time.time(), job.id, job.attempt),
+            )
+
+    def idle(self) -> bool:
+        """Return whether no job is queued or running."""
+        (active,) = self._conn().execute("SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'running')").fetchone()
+        return active == 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and wait and service times for every stage.
+
+        Wait time runs from when a job became claimable to when it was last
+        claimed; service time from that claim to when it finished.
+        """
+        conn = self._conn()
+        limits = self.limits()
+        stages: Dict[str, Dict[str, Any]] = {}
+        for stage in STAGES:
+            rows = conn.execute(
+                "SELECT state, available_at, started_at, finished_at FROM jobs WHERE stage = ?", (stage,)
+            ).fetchall()
+            counts = {
+                state: sum(1 for row in rows if row["state"] == state)
+                for state in ("queued", "running", "done", "failed")
+            }
+            finished = [row for row in rows if row["state"] == "done"]
+            waits = [row["started_at"] - row["available_at"] for row in finished]
+            services = [row["finished_at"] - row["started_at"] for row in finished]
+            stages[stage] = {
+                **counts,
+                "limit": limits.get(stage),
+                "wait_mean": sum(waits) / len(waits) if waits else None,
+                "wait_p95": _percentile(waits, 0.95),
+                "service_mean": sum(services) / len(services) if services else None,
+                "service_p95": _percentile(services, 0.95),
+            }
+        runs = dict(conn.execute("SELECT state, COUNT(*) FROM runs GROUP BY state").fetchall())
+        return {"stages": stages, "runs": {state: runs.get(state, 0) for state in ("pending", "succeeded", "failed")}}
+
+
+def _load_handler(stage: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    return importlib.import_module(STAGES[stage]["module"]).handle
+
+
+def run_job(queue: JobQueue, job: Job, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+    """Run one claimed job, keeping its lease alive until it finishes.
+
+    Returns:
+        Whether the stage succeeded.
+    """
+    stop = threading.Event()
+
+    def heartbeat() -> None:
+        try:
+            while not stop.wait(visibility_timeout / 3):
+                if not queue.extend(job, visibility_timeout):
+                    return
+        finally:
+            queue.close()
+
+    beat = threading.Thread(target=heartbeat, daemon=True)
+    beat.start()
+    try:
+        try:
+            response = _load_handler(job.stage)(dict(job.payload))
+        except Exception:  # noqa: BLE001 - recorded on the job and retried
+            error = traceback.format_exc(limit=5)
+        else:
+            error = response.get("error") if isinstance(response, dict) else "Handler returned no JSON object"
+    except BaseException:
+        # Interrupted: give the job back straight away instead of waiting
+        # for its lease to expire.
+        stop.set()
+        queue.release(job)
+        raise
+    finally:
+        stop.set()
+        beat.join()
+    if error:
+        queue.fail(job, str(error))
+        return False
+    return queue.complete(job, response)
+
+
+def run_worker(
+    queue: JobQueue,
+    threads: int = 1,
+    stages: Optional[Sequence[str]] = None,
+    visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+    poll_interval: float = 0.5,
+    exit_when_idle: bool = False,
+) -> Dict[str, int]:
+    """Claim and run jobs on `threads` threads.
+
+    Args:
+        queue: Queue to work off.
+        threads: Jobs run at a time by this process.
+        stages: Stages this worker runs (default: every stage).
+        visibility_timeout: Lease length; renewed while a stage runs.
+        poll_interval: Seconds to wait when no job can be claimed.
+        exit_when_idle: Return once no job is queued or running instead of
+            waiting for new runs.
+
+    Returns:
+        The number of stage jobs that `succeeded` and `failed`.
+    """
+    counts = {"succeeded": 0, "failed": 0}
+    lock = threading.Lock()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def loop(index: int) -> None:
+        name = f"{worker_id}:{index}"
+        try:
+            while True:
+                job = queue.claim(name, stages, visibility_timeout)
+                if job is None:
+                    if exit_when_idle and queue.idle():
+                        return
+                    time.sleep(poll_interval)
+                    continue
+                start = time.perf_counter()
+                ok = run_job(queue, job, visibility_timeout)
+                seconds = time.perf_counter() - start
+                # Print under the lock so lines from several threads never interleave.
+                with lock:
+                    counts["succeeded" if ok else "failed"] += 1
+                    print(
+                        f"[{'done' if ok else 'failed':>6}] {job.run_id} {job.stage} "
+                        f"(attempt {job.attempt}) in {seconds:.2f} s",
+                        flush=True,
+                    )
+        finally:
+            queue.close()
+
+    if threads <= 1:
+        loop(0)
+        return counts
+    workers = [threading.Thread(target=loop, args=(i,), daemon=True) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        # Joining with a timeout keeps the main thread responsive to Ctrl-C.
+        while thread.is_alive():
+            thread.join(0.5)
+    return counts
+
+
+def print_stats(stats: Dict[str, Any]) -> None:
+    """Print a per-stage table of queue depth, wait time and service time."""
+
+    def seconds(value: Optional[float]) -> str:
+        return f"{value:9.2f}" if value is not None else f"{'-':>9}"
+
+    print(
+        f"{'stage':<16}{'queued':>7}{'running':>8}{'done':>6}{'failed':>7}{'limit':>6}"
+        f"{'wait':>9}{'wait95':>9}{'service':>9}{'svc95':>9}"
+    )
+    for stage, s in stats["stages"].items():
+        limit = s["limit"] if s["limit"] is not None else "-"
+        print(
+            f"{stage:<16}{s['queued']:>7}{s['running']:>8}{s['done']:>6}{s['failed']:>7}{limit:>6}"
+            f"{seconds(s['wait_mean'])}{seconds(s['wait_p95'])}{seconds(s['service_mean'])}{seconds(s['service_p95'])}"
+        )
+    runs = stats["runs"]
+    print(f"\nruns: {runs['pending']} pending, {runs['succeeded']} succeeded, {runs['failed']} failed")
+    print("times in seconds")
+
+
+def _parse_limit(text: str):
+    stage, _, value = text.partition("=")
+    if stage not in STAGES or not value:
+        raise argparse.ArgumentTypeError(f"expected stage=N or stage=none with a stage from {', '.join(STAGES)}")
+    if value.lower() == "none":
+        return stage, None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid limit {value!r}") from None
+    if limit < 1:
+        raise argparse.ArgumentTypeError("limits must be at least 1")
+    return stage, limit
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Durable local job queue for the black news pipeline.")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"Queue database (default: {DEFAULT_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Queue one run per topic")
+    submit.add_argument("topics", nargs="*", help="Topics to queue")
+    submit.add_argument("--topics_file", help="File with one topic (or run_id<TAB>topic) per line")
+    submit.add_argument("--run_id", help="Run ID for a single topic; generated when omitted")
+    submit.add_argument("--priority", type=int, default=0, help="Higher priorities are worked off first (default: 0)")
+    submit.add_argument(
+        "--max_pending",
+        type=int,
+        default=DEFAULT_MAX_PENDING,
+        help=f"Refuse runs while this many are unfinished (default: {DEFAULT_MAX_PENDING})",
+    )
+    submit.add_argument(
+        "--wait",
+        type=float,
+        default=0.0,
+        help="Seconds to wait for room when the queue is full before giving up (default: 0)",
+    )
+
+    worker = commands.add_parser("worker", help="Claim jobs and run their stages")
+    worker.add_argument("--threads", type=int, default=1, help="Jobs run at a time by this worker (default: 1)")
+    worker.add_argument("--stages", nargs="+", choices=list(STAGES), help="Only run these stages")
+    worker.add_argument(
+        "--visibility_timeout",
+        type=float,
+        default=DEFAULT_VISIBILITY_TIMEOUT,
+        help=f"Seconds a claimed job stays leased without a heartbeat (default: {DEFAULT_VISIBILITY_TIMEOUT:g})",
+    )
+    worker.add_argument("--exit-when-idle", action="store_true", help="Stop once no job is queued or running")
+
+    limits = commands.add_parser("limits", help="Show or set per-stage concurrency limits")
+    limits.add_argument("limits", nargs="*", type=_parse_limit, help="stage=N, or stage=none to remove a limit")
+
+    stats = commands.add_parser("stats", help="Report queue depth, wait and service times per stage")
+    stats.add_argument("--json", action="store_true", help="Print the figures as JSON")
+
+    args = parser.parse_args(argv)
+    queue = JobQueue(args.db)
+
+    if args.command == "submit":
+        if args.topics_file:
+            from batch_pipeline import read_topics
+
+            runs = read_topics(args.topics_file)
+        else:
+            runs = [(args.run_id if len(args.topics) == 1 else None, topic) for topic in args.topics]
+        if not runs:
+            parser.error("no topics given")
+        deadline = time.monotonic() + args.wait
+        for run_id, topic in runs:
+            while True:
+                try:
+                    run_id = queue.submit(topic, run_id, args.priority, args.max_pending)
+                    break
+                except QueueFull as e:
+                    if time.monotonic() >= deadline:
+                        print(f"Queue full, not submitted: {topic} ({e})", file=sys.stderr)
+                        sys.exit(2)
+                    time.sleep(1.0)
+                except ValueError as e:
+                    print(e, file=sys.stderr)
+                    sys.exit(1)
+            print(f"Queued {run_id}: {topic}")
+    elif args.command == "worker":
+        if args.threads < 1:
+            parser.error("--threads must be at least 1")
+        try:
+            counts = run_worker(
+                queue,
+                args.threads,
+                args.stages,
+                args.visibility_timeout,
+                exit_when_idle=args.exit_when_idle,
+            )
+        except KeyboardInterrupt:
+            print("Worker stopped")
+            return
+        print(f"{counts['succeeded']} stage jobs succeeded, {counts['failed']} failed")
+    elif args.command == "limits":
+        for stage, limit in args.limits:
+            queue.set_limit(stage, limit)
+        current = queue.limits()
+        for stage in STAGES:
+            print(f"{stage:<16}{current.get(stage, 'unlimited')}")
+    else:
+        figures = queue.stats()
+        if args.json:
+            print(json.dumps(figures, indent=2))
+        else:
+            print_stats(figures)
+
+
+if __name__ == "__main__":
+    main()
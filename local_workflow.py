@@ -0,0 +1,399 @@
+"""Local DAG executor for `workflow.yaml`.
+
+Cloud Workflows (and `test_pipeline.py`) run the steps of `workflow.yaml` one
+after the other, even where a step does not need the result of the one
+before it.  This script parses the workflow, infers each step's data
+dependencies from the variables referenced in its `${...}` expressions and
+runs every step whose inputs are ready concurrently.  `call_media_sourcing`
+and `call_narrator`, for example, both depend only on `scriptwriter_result`
+and so run side by side.
+
+`http.post` steps are dispatched to the in-process handlers in `functions/`
+by default.  Pass `--url stage=http://host:port/` to send a stage to a local
+HTTP stand-in instead.  The workflow names a Cloud Storage bucket; in-process
+handlers store their outputs under `outputs/` instead unless `--storage`
+selects another backend (see `functions/common/storage.py`).  When the run
+finishes, per-step timings and the critical path are printed.
+
+Only the subset of the Workflows syntax used by `workflow.yaml` is supported:
+`assign`, `call` (`http.post` and `sys.log`), `try`/`except` around a call,
+and `return`, with the `default` and `map.get` expression helpers.
+
+Media sourcing hands its frames to video assembly through a compact media
+manifest by default; `--media-handoff inline` runs the workflow with the
+inline `media_uris` list instead.
+
+Usage:
+
+```bash
+python3 local_workflow.py --topic "community empowerment"
+```
+"""
+
+import argparse
+import ast
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set
+
+import yaml
+
+DEFAULT_WORKFLOW = os.path.join(os.path.dirname(os.path.abspath(__file__)), "workflow.yaml")
+
+# Workflow URL variables and the in-process handler each one stands for.
+LOCAL_HANDLERS = {
+    "scriptwriter_url": "functions.scriptwriter.main",
+    "media_sourcing_url": "functions.media_sourcing.main",
+    "narrator_url": "functions.narrator.main",
+    "video_assembly_url": "functions.video_assembly.main",
+    "uploader_url": "functions.uploader.main",
+}
+LOCAL_URL_PREFIX = "local:"
+
+
+class AttrDict(dict):
+    """Dictionary whose keys can also be read as attributes, like `a.b.c`."""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def _wrap(value: Any) -> Any:
+    """Recursively convert dictionaries into `AttrDict` for expression access."""
+    if isinstance(value, dict) and not isinstance(value, AttrDict):
+        return AttrDict((k, _wrap(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_wrap(v) for v in value]
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    """Serialise values that `json` cannot encode natively, such as iterators."""
+    return repr(value)
+
+
+# Standard-library functions available inside `${...}` expressions.
+EXPRESSION_GLOBALS = {
+    "__builtins__": {},
+    "sys": SimpleNamespace(get_uuid=lambda: str(uuid.uuid4())),
+    "json": SimpleNamespace(encode=lambda v: json.dumps(v, default=_json_default)),
+    "string": str,
+    "default": lambda value, fallback: fallback if value is None else value,
+    "map": SimpleNamespace(get=lambda mapping, key: (mapping or {}).get(key)),
+    "true": True,
+    "false": False,
+    "null": None,
+    "True": True,
+    "False": False,
+    "None": None,
+}
+
+
+def _expression(value: Any) -> Optional[str]:
+    """Return the body of a `${...}` expression, or `None` for literals."""
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("${") and text.endswith("}"):
+            return text[2:-1]
+    return None
+
+
+def _referenced_names(value: Any) -> Set[str]:
+    """Collect the top-level variable names used by expressions in `value`."""
+    names: Set[str] = set()
+    if isinstance(value, dict):
+        for v in value.values():
+            names |= _referenced_names(v)
+    elif isinstance(value, list):
+        for v in value:
+            names |= _referenced_names(v)
+    else:
+        expr = _expression(value)
+        if expr is not None:
+            tree = ast.parse(expr, mode="eval")
+            names |= {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+    return names - set(EXPRESSION_GLOBALS)
+
+
+def evaluate(value: Any, variables: Dict[str, Any]) -> Any:
+    """Evaluate every `${...}` expression inside `value`."""
+    if isinstance(value, dict):
+        return {k: evaluate(v, variables) for k, v in value.items()}
+    if isinstance(value, list):
+        return [evaluate(v, variables) for v in value]
+    expr = _expression(value)
+    if expr is None:
+        return value
+    namespace = dict(EXPRESSION_GLOBALS)
+    namespace.update((k, _wrap(v)) for k, v in variables.items())
+    return eval(compile(expr, "<workflow expression>", "eval"), namespace)  # noqa: S307
+
+
+class Step:
+    """One top-level step of the workflow and its inferred dependencies."""
+
+    def __init__(self, name: str, body: Dict[str, Any]) -> None:
+        self.name = name
+        self.body = body
+        call = body.get("try", body)
+        self.call = call.get("call")
+        self.args = call.get("args", {})
+        self.assign = body.get("assign")
+        self.returns = "return" in body
+        self.defines: List[str] = []
+        if call.get("result"):
+            self.defines.append(call["result"])
+        for item in self.assign or []:
+            self.defines.extend(item.keys())
+        if self.assign:
+            # Each assignment may use variables assigned earlier in the list.
+            used: Set[str] = set()
+            for item in self.assign:
+                used |= _referenced_names(list(item.values()))
+            self.uses = used - set(self.defines)
+        elif self.returns:
+            self.uses = _referenced_names(body["return"])
+        else:
+            self.uses = _referenced_names(self.args)
+        self.depends_on: Set[str] = set()
+
+
+class LocalWorkflow:
+    """Parsed `main` workflow with a dependency graph between its steps.
+
+    Args:
+        path: Path to the workflow YAML file.
+        urls: Optional overrides mapping URL variable names (for example
+            `narrator_url`) to HTTP endpoints.
+    """
+
+    def __init__(self, path: str = DEFAULT_WORKFLOW, urls: Optional[Dict[str, str]] = None) -> None:
+        with open(path, "r", encoding="utf-8") as f:
+            definition = yaml.safe_load(f)
+        main = definition["main"]
+        self.params = main.get("params", [])
+        self.steps: List[Step] = []
+        for entry in main["steps"]:
+            (name, body), = entry.items()
+            self.steps.append(Step(name, body))
+        self.urls = urls or {}
+        self._link()
+
+    def _link(self) -> None:
+        """Point every step at the steps defining the variables it reads."""
+        producers: Dict[str, str] = {}
+        for step in self.steps:
+            for var in step.uses:
+                if var in producers:
+                    step.depends_on.add(producers[var])
+                elif var not in self.params:
+                    raise ValueError(f"Step {step.name} uses undefined variable {var}")
+            for var in step.defines:
+                producers[var] = step.name
+
+    # -- step execution -------------------------------------------------
+
+    def _post(self, url_var: Optional[str], url: Optional[str], body: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch an `http.post` to a local handler or an HTTP endpoint."""
+        url = self.urls.get(url_var or "", url)
+        if url and not url.startswith(LOCAL_URL_PREFIX):
+            request = urllib.request.Request(
+                url,
+                data=json.dumps(body).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            with urllib.request.urlopen(request) as response:
+                return {"code": response.status, "body": json.loads(response.read() or b"null")}
+        module_name = url[len(LOCAL_URL_PREFIX):] if url else LOCAL_HANDLERS.get(url_var or "")
+        if not module_name:
+            raise ValueError(f"No local handler for URL variable {url_var}")
+        handler = importlib.import_module(module_name).handle
+        response = handler(body)
+        if isinstance(response, dict) and "error" in response:
+            raise RuntimeError(f"{module_name} returned error: {response['error']}")
+        return {"code": 200, "body": response}
+
+    def _run_step(self, step: Step, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a step and return the variables it defines."""
+        if step.assign:
+            scope = dict(variables)
+            for item in step.assign:
+                for var, expr in item.items():
+                    scope[var] = evaluate(expr, scope)
+            return {var: scope[var] for var in step.defines}
+        if step.returns:
+            return {"__return__": evaluate(step.body["return"], variables)}
+        args = evaluate(step.args, variables)
+        if step.call == "sys.log":
+            print(f"[{args.get('severity', 'INFO')}] {args.get('text')}")
+            return {}
+        if step.call == "http.post":
+            url_expr = _expression(step.args.get("url"))
+            url_var = url_expr.strip() if url_expr else None
+            try:
+                result = self._post(url_var, args.get("url"), args.get("body", {}))
+            except Exception as e:
+                print(f"[ERROR] {step.name} failed: {type(e).__name__}: {e}")
+                raise
+            return {var: result for var in step.defines}
+        raise ValueError(f"Unsupported call {step.call!r} in step {step.name}")
+
+    def run(self, arguments: Dict[str, Any], max_parallel: Optional[int] = None) -> Dict[str, Any]:
+        """Run the workflow, executing ready steps concurrently.
+
+        Args:
+            arguments: The workflow's `args` parameter.
+            max_parallel: Maximum steps running at once (`1` runs serially in
+                file order, like Cloud Workflows).
+
+        Returns:
+            A report with the workflow's return value, per-step `timings`
+            (start offset and duration in seconds) and the `critical_path`.
+        """
+        variables: Dict[str, Any] = {name: _wrap(arguments) for name in self.params}
+        lock = threading.Lock()
+        pending = {step.name: step for step in self.steps}
+        done: Set[str] = set()
+        timings: Dict[str, Dict[str, float]] = {}
+        result: Any = None
+        origin = time.perf_counter()
+
+        def execute(step: Step) -> Dict[str, Any]:
+            with lock:
+                snapshot = dict(variables)
+            start = time.perf_counter()
+            try:
+                return self._run_step(step, snapshot)
+            finally:
+                end = time.perf_counter()
+                timings[step.name] = {"start": start - origin, "seconds": end - start}
+
+        workers = max_parallel or len(self.steps)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            running = {}
+            while pending or running:
+                for name, step in list(pending.items()):
+                    if len(running) >= workers:
+                        break
+                    if step.depends_on <= done:
+                        running[pool.submit(execute, step)] = step
+                        del pending[name]
+                if not running:
+                    raise RuntimeError(f"Unsatisfiable dependencies: {sorted(pending)}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    outputs = future.result()
+                    with lock:
+                        if "__return__" in outputs:
+                            result = outputs.pop("__return__")
+                        variables.update(outputs)
+                    done.add(step.name)
+
+        total = time.perf_counter() - origin
+        return {
+            "result": result,
+            "seconds": total,
+            "timings": timings,
+            "critical_path": self.critical_path(timings),
+        }
+
+    def critical_path(self, timings: Dict[str, Dict[str, float]]) -> List[str]:
+        """Return the chain of steps that determined the total run time.
+
+        Starting from the step that finished last, repeatedly follow the
+        dependency that finished last until a step with no dependencies is
+        reached.
+        """
+        by_name = {step.name: step for step in self.steps}
+
+        def end(name: str) -> float:
+            return timings[name]["start"] + timings[name]["seconds"]
+
+        path: List[str] = []
+        current = max(timings, key=end) if timings else None
+        while current is not None:
+            path.append(current)
+            deps = [d for d in by_name[current].depends_on if d in timings]
+            current = max(deps, key=end) if deps else None
+        return list(reversed(path))
+
+
+def print_report(workflow: LocalWorkflow, report: Dict[str, Any]) -> None:
+    """Print per-step timings, dependencies and the critical path."""
+    timings = report["timings"]
+    print(f"\n{'step':<30}{'start':>8}{'seconds':>9}  depends on")
+    for step in sorted(workflow.steps, key=lambda s: timings[s.name]["start"]):
+        t = timings[step.name]
+        deps = ", ".join(sorted(step.depends_on)) or "-"
+        print(f"{step.name:<30}{t['start']:>8.3f}{t['seconds']:>9.3f}  {deps}")
+    path = report["critical_path"]
+    path_seconds = sum(timings[name]["seconds"] for name in path)
+    print(f"\nCritical path ({path_seconds:.3f} s of {report['seconds']:.3f} s total):")
+    print("  " + " -> ".join(path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run workflow.yaml locally as a dependency graph.")
+    parser.add_argument("--topic", required=True, help="Topic for the news script")
+    parser.add_argument("--env", default="dev", help="Value passed as args.env")
+    parser.add_argument("--workflow", default=DEFAULT_WORKFLOW, help="Path to the workflow YAML")
+    parser.add_argument(
+        "--url",
+        action="append",
+        default=[],
+        metavar="STAGE=URL",
+        help="Send a stage to an HTTP endpoint, e.g. narrator=http://localhost:8083/",
+    )
+    parser.add_argument(
+        "--serial",
+        action="store_true",
+        help="Run one step at a time in file order, for comparison",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=("local", "memory", "gcs"),
+        default="local",
+        help="Storage backend for in-process handlers (default: local files under outputs/)",
+    )
+    parser.add_argument(
+        "--media-handoff",
+        choices=("manifest", "inline"),
+        default="manifest",
+        help="Pass frames to video assembly as a media manifest URI (default) or an inline media_uris list",
+    )
+    args = parser.parse_args()
+    os.environ["STORAGE_BACKEND"] = args.storage
+
+    urls: Dict[str, str] = {}
+    for item in args.url:
+        stage, sep, url = item.partition("=")
+        if not sep:
+            parser.error(f"--url expects STAGE=URL, got {item!r}")
+        urls[stage if stage.endswith("_url") else f"{stage}_url"] = url
+
+    workflow_args = {"env": args.env, "topic": args.topic, "media_manifest": args.media_handoff == "manifest"}
+    workflow_args.update({var: f"{LOCAL_URL_PREFIX}{module}" for var, module in LOCAL_HANDLERS.items()})
+    workflow_args.update({"error_handler_url": None, "logger_url": None})
+
+    workflow = LocalWorkflow(args.workflow, urls)
+    report = workflow.run(workflow_args, max_parallel=1 if args.serial else None)
+    print(f"\nWorkflow result: {json.dumps(report['result'], default=_json_default)}")
+    print_report(workflow, report)
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    main()
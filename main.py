@@ -1,71 +1,328 @@
-import os, json
-from flask import Request, jsonify
+"""Uploader that streams the final video from Cloud Storage to Google Drive.
+
+The video is never held in memory as a whole.  It is read from the source
+object in fixed-size chunks, and each chunk is sent to a Drive resumable
+upload session before the next is read, so memory use stays at about one
+chunk whatever the length of the video.  If a chunk fails with a transient
+error, the session is asked how many bytes it has committed and the transfer
+resumes from there.  If the retries run out, the response carries the session
+URI and the committed byte count.  Passing `upload_session_uri` back in a new
+request continues that upload instead of starting over.
+
+The Cloud Storage client comes from the shared storage layer
+(`functions/common/storage.py`) and the authorised Drive transport is created
+on first use; both are reused by later invocations in the same instance.  Both can be
+passed in explicitly, which is how the fakes in `fakes.py` stand in for the
+real services:
+
+```python
+from fakes import FakeDriveUploadTransport, FakeStorageClient
+from main import upload_to_google_drive
+
+storage_client = FakeStorageClient({"bucket": {"final.mp4": "outputs/demo_final.mp4"}})
+transport = FakeDriveUploadTransport(fail_chunks={2})
+upload_to_google_drive("gs://bucket/final.mp4", "", "demo", storage_client=storage_client, transport=transport)
+```
+"""
+
+import json
 import logging
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from google.cloud import storage
+import time
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from flask import Request  # type: ignore
+except ImportError:  # pragma: no cover
+    Request = object  # type: ignore
+
+try:
+    import google.auth
+    from google.auth.transport.requests import AuthorizedSession
+    from requests.exceptions import RequestException
+except ImportError:  # pragma: no cover - only needed against the real services
+    google = None  # type: ignore
+    AuthorizedSession = None  # type: ignore
+    RequestException = OSError  # type: ignore
+
+try:
+    from functions.common.payload import PayloadError, decode_request
+    from functions.common.storage import gcs_client
+except ImportError:  # pragma: no cover - deployed with common/ next to main.py
+    from common.payload import PayloadError, decode_request
+    from common.storage import gcs_client
+
+SCOPES = ['https://www.googleapis.com/auth/drive.file']
+DRIVE_UPLOAD_URL = "https://www.googleapis.com/upload/drive/v3/files?uploadType=resumable&fields=id"
+# Resumable upload chunks must be a multiple of 256 KiB.
+CHUNK_SIZE = 32 * 256 * 1024
+MAX_RETRIES = 5
+RETRY_BASE_SECONDS = 1.0
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+_drive_transport = None
+
+
+class UploadError(RuntimeError):
+    """Raised when an upload cannot be completed.
+
+    Attributes:
+        session_uri: URI of the resumable session, if one was opened.
+        committed: Number of bytes the session had committed.
+    """
+
+    def __init__(self, message: str, session_uri: Optional[str] = None, committed: int = 0) -> None:
+        super().__init__(message)
+        self.session_uri = session_uri
+        self.committed = committed
+
+
+class _TransientError(Exception):
+    """A chunk request failed in a way that is worth retrying."""
+
+
+def _get_drive_transport():
+    """Return the process-wide authorised HTTP session for Drive, creating it once."""
+    global _drive_transport
+    if _drive_transport is None:
+        if AuthorizedSession is None:
+            raise RuntimeError("google-auth is required to upload to Google Drive")
+        # Uses the function's default service account, which needs the
+        # Drive scope granted.
+        creds, _ = google.auth.default(scopes=SCOPES)
+        _drive_transport = AuthorizedSession(creds)
+    return _drive_transport
+
+
+def _parse_gcs_uri(uri: str) -> Tuple[str, str]:
+    parts = uri.split('/')
+    if len(parts) < 4 or parts[0] != "gs:":
+        raise ValueError(f"Expected a gs://bucket/object URI, got {uri!r}")
+    return parts[2], '/'.join(parts[3:])
+
+
+class ResumableUploadSession:
+    """Client side of a Drive resumable upload session.
 
-def upload_to_google_drive(video_uri: str, script_content: str, run_id: str):
+    Args:
+        transport: Requests-style session (`AuthorizedSession` or a fake)
+            used for every HTTP call.
+        session_uri: URI returned when the session was opened.
+        total_size: Size of the whole upload in bytes.
+    """
+
+    def __init__(self, transport, session_uri: str, total_size: int) -> None:
+        self.transport = transport
+        self.session_uri = session_uri
+        self.total_size = total_size
+
+    @classmethod
+    def start(cls, transport, metadata: Dict[str, Any], total_size: int, url: str = DRIVE_UPLOAD_URL):
+        """Open a new session for `total_size` bytes described by `metadata`."""
+        response = transport.request(
+            "POST",
+            url,
+            data=json.dumps(metadata),
+            headers={
+                "Content-Type": "application/json; charset=UTF-8",
+                "X-Upload-Content-Type": metadata.get("mimeType", "application/octet-stream"),
+                "X-Upload-Content-Length": str(total_size),
+            },
+        )
+        if response.status_code != 200 or "Location" not in response.headers:
+            raise UploadError(f"Could not open upload session: HTTP {response.status_code}")
+        return cls(transport, response.headers["Location"], total_size)
+
+    def _interpret(self, response) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Return `(committed_bytes, result)`; `result` is set once complete."""
+        if response.status_code in (200, 201):
+            return self.total_size, response.json()
+        if response.status_code == 308:
+            # "Range: bytes=0-N" means N + 1 bytes are committed; no header
+            # means none are.
+            committed = response.headers.get("Range")
+            return (int(committed.rsplit("-", 1)[1]) + 1 if committed else 0), None
+        if response.status_code in TRANSIENT_STATUSES:
+            raise _TransientError(f"HTTP {response.status_code}")
+        raise UploadError(
+            f"Upload session rejected the request: HTTP {response.status_code}",
+            session_uri=self.session_uri,
+        )
+
+    def query(self) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Ask the session how many bytes it has committed."""
+        response = self.transport.request(
+            "PUT",
+            self.session_uri,
+            data=b"",
+            headers={"Content-Range": f"bytes */{self.total_size}"},
+        )
+        return self._interpret(response)
+
+    def put(self, chunk: bytes, offset: int) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Send `chunk`, which starts at byte `offset` of the upload.
+
+        An empty upload has no byte range to send, so its only chunk
+        finalises the session with `Content-Range: bytes */0`.
+        """
+        if not chunk and self.total_size == 0:
+            return self.query()
+        end = offset + len(chunk) - 1
+        response = self.transport.request(
+            "PUT",
+            self.session_uri,
+            data=chunk,
+            headers={
+                "Content-Length": str(len(chunk)),
+                "Content-Range": f"bytes {offset}-{end}/{self.total_size}",
+            },
+        )
+        return self._interpret(response)
+
+
+def stream_upload(
+    source,
+    session: ResumableUploadSession,
+    chunk_size: int = CHUNK_SIZE,
+    max_retries: int = MAX_RETRIES,
+    sleep=time.sleep,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """Copy a seekable binary `source` into `session` one chunk at a time.
+
+    After a transient failure (an HTTP status in `TRANSIENT_STATUSES` or a
+    connection error or timeout raised by the transport), it waits with
+    exponential backoff, asks the session for its committed offset, seeks
+    `source` there and carries on.
+    With `resume`, the session is asked for its offset before the first
+    chunk too, so an existing session picks up where it stopped.
+
+    Returns:
+        The JSON body of the completed upload (for Drive, `{"id": ...}`).
+
+    Raises:
+        UploadError: If more than `max_retries` consecutive attempts fail.
+    """
+    failures = 0
+    result = None
+    # `None` means the committed offset is unknown and has to be queried.
+    offset = None if resume else 0
+    committed = 0
+    while result is None:
+        try:
+            if offset is None:
+                offset, result = session.query()
+                committed = offset
+                continue
+            if source.tell() != offset:
+                source.seek(offset)
+            chunk = source.read(chunk_size)
+            offset, result = session.put(chunk, offset)
+            committed = offset
+            failures = 0
+        except (_TransientError, RequestException, OSError) as e:
+            failures += 1
+            if failures > max_retries:
+                raise UploadError(
+                    f"Upload failed after {max_retries} retries: {e}",
+                    session_uri=session.session_uri,
+                    committed=committed,
+                ) from e
+            logging.warning(f"Upload chunk failed ({e}); retry {failures} of {max_retries}")
+            sleep(RETRY_BASE_SECONDS * 2 ** (failures - 1))
+            offset = None
+    return result
+
+
+def upload_to_google_drive(
+    video_uri: str,
+    script_content: str,
+    run_id: str,
+    session_uri: Optional[str] = None,
+    storage_client=None,
+    transport=None,
+    chunk_size: int = CHUNK_SIZE,
+    sleep=time.sleep,
+) -> str:
+    """Stream `video_uri` from Cloud Storage into a new Drive file.
+
+    Args:
+        video_uri: `gs://bucket/object` URI of the final video.
+        script_content: Script for the video (unused for now).
+        run_id: Identifier of the run, used in the Drive file name.
+        session_uri: Resumable session of an earlier, interrupted upload of
+            the same video to continue.
+        storage_client: Cloud Storage client; the shared one when omitted.
+        transport: Authorised HTTP session for Drive; the shared one when
+            omitted.
+        chunk_size: Bytes read and sent per request.
+        sleep: Called with the backoff delay between retries.
+
+    Returns:
+        The ID of the uploaded Drive file.
+    """
     logging.info(f"Uploading {video_uri} to Google Drive...")
-    
-    # Authenticate with service account
-    # The service account key should be stored securely, e.g., in Google Secret Manager
-    # For this example, we assume the service account has access to Google Drive
-    # and the necessary scopes are granted.
-    # Replace 'path/to/your/service_account_key.json' with the actual path or method to access the key
-    # For Cloud Functions, you might use the default service account or fetch from Secret Manager.
-    
-    # For simplicity, assuming the Cloud Function's default service account has Drive access
-    # and the 'drive' scope is enabled for the function.
-    
-    SCOPES = ['https://www.googleapis.com/auth/drive.file']
-    creds = service_account.DefaultCredentials(scopes=SCOPES)
-    
-    drive_service = build('drive', 'v3', credentials=creds)
-
-    # Download video from GCS
-    storage_client = storage.Client()
-    bucket_name = video_uri.split('/')[2]
-    blob_name = '/'.join(video_uri.split('/')[3:])
-    bucket = storage_client.bucket(bucket_name)
-    blob = bucket.blob(blob_name)
-    
-    video_content = blob.download_as_bytes()
-    
-    # Create file metadata
+    storage_client = storage_client or gcs_client()
+    transport = transport or _get_drive_transport()
+
+    bucket_name, blob_name = _parse_gcs_uri(video_uri)
+    blob = storage_client.bucket(bucket_name).blob(blob_name)
+    blob.reload()
+    total_size = blob.size
+
     file_metadata = {
         'name': f'longform_black_news_{run_id}.mp4',
         'mimeType': 'video/mp4'
     }
-    
-    # Upload to Google Drive
-    media = MediaFileUpload(
-        io.BytesIO(video_content),
-        mimetype='video/mp4',
-        resumable=True
-    )
-    
-    file = drive_service.files().create(
-        body=file_metadata,
-        media_body=media,
-        fields='id'
-    ).execute()
-    
+    if session_uri:
+        session = ResumableUploadSession(transport, session_uri, total_size)
+    else:
+        session = ResumableUploadSession.start(transport, file_metadata, total_size)
+
+    with blob.open("rb", chunk_size=chunk_size) as source:
+        file = stream_upload(source, session, chunk_size=chunk_size, sleep=sleep, resume=bool(session_uri))
+
     logging.info(f"Video uploaded to Google Drive with ID: {file.get('id')}")
     return file.get('id')
 
-def handle(request: Request):
-    data = request.get_json()
-    final_uri = data["final_uri"]
-    script_content = data["script_content"]
-    run_id = data["run_id"]
 
-    # Upload to Google Drive
-    google_drive_file_id = upload_to_google_drive(final_uri, script_content, run_id)
+def handle(request):
+    """Entry point for the Drive uploader.
+
+    Args:
+        request: Flask `Request`, dict or JSON string with:
+            - final_uri: `gs://` URI of the final video
+            - script_content: The video's script
+            - run_id: Unique identifier for this run
+            - upload_session_uri: Optional session of an interrupted upload
+              to resume
+
+    Returns:
+        `{"status": "uploaded", "final_uri", "google_drive_file_id"}` on
+        success.  If the upload fails, the response carries an `error`, and
+        once a session was opened it also carries `upload_session_uri` and
+        `committed_bytes` for resuming.
+    """
+    try:
+        data = decode_request(request)
+    except PayloadError as e:
+        return {"error": str(e)}
+
+    final_uri = data.get("final_uri")
+    if not final_uri:
+        return {"error": "No final_uri provided"}
+    script_content = data.get("script_content", "")
+    run_id = data.get("run_id", "test")
 
-    return jsonify({"status": "uploaded", "final_uri": final_uri, "google_drive_file_id": google_drive_file_id})
+    try:
+        google_drive_file_id = upload_to_google_drive(
+            final_uri, script_content, run_id, session_uri=data.get("upload_session_uri")
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+    except UploadError as e:
+        response = {"error": str(e)}
+        if e.session_uri:
+            response.update(upload_session_uri=e.session_uri, committed_bytes=e.committed)
+        return response
 
-    # TODO: Download from GCS final_uri and upload to Google Drive (final destination)
-    # This requires Google Drive API integration and authentication (e.g., using google-api-python-client with a service account).
-    return jsonify({"status": "uploaded", "final_uri": final_uri, "youtube_video_id": youtube_video_id})
+    return {"status": "uploaded", "final_uri": final_uri, "google_drive_file_id": google_drive_file_id}
@@ -1,12 +1,30 @@
 import argparse
+import asyncio
 import json
 import os
+import random
 import sys
 import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
 
-from google.api_core import exceptions
-from google.cloud.workflows import executions_v1
-from google.cloud.workflows.executions_v1.types import Execution
+try:
+    from google.api_core import exceptions
+    from google.cloud.workflows import executions_v1
+    from google.cloud.workflows.executions_v1.types import Execution
+except ImportError:  # pragma: no cover - the async tracker also runs against fakes.py
+    exceptions = executions_v1 = Execution = None  # type: ignore
+
+TERMINAL_STATES = ("SUCCEEDED", "FAILED", "CANCELLED")
+# Status poll errors retried on the next interval instead of ending tracking.
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError, asyncio.TimeoutError)
+if exceptions is not None:
+    TRANSIENT_ERRORS += (
+        exceptions.ServiceUnavailable,
+        exceptions.DeadlineExceeded,
+        exceptions.InternalServerError,
+        exceptions.TooManyRequests,
+    )
 
 
 def execute_workflow(
@@ -14,62 +32,217 @@ def execute_workflow(
     region: str,
     workflow_name: str,
     execution_args: dict,
-    poll_interval_seconds: int = 10,
+    **tracker_options,
 ) -> str:
     """
     Executes a workflow and waits for it to complete.
 
+    A single-execution wrapper around `execute_workflows`.
+
     Args:
         project_id: The Google Cloud project ID.
         region: The region where the workflow is deployed.
         workflow_name: The name of the workflow to execute.
         execution_args: A dictionary of arguments to pass to the workflow.
-        poll_interval_seconds: The interval in seconds to poll for workflow status.
+        **tracker_options: Passed through to `ExecutionTracker`.
 
     Returns:
         The result of the workflow execution as a string.
 
     Raises:
-        RuntimeError: If the workflow execution fails or is cancelled.
+        RuntimeError: If the workflow execution fails, is cancelled or
+            cannot be tracked.
+    """
+    outcome = execute_workflows(project_id, region, workflow_name, [execution_args], **tracker_options)[0]
+    if not outcome.succeeded:
+        error_message = f"Execution {outcome.name} did not succeed. Final state: {outcome.state}"
+        if outcome.error:
+            error_message += f"\nError payload: {outcome.error}"
+        raise RuntimeError(error_message)
+    return outcome.result
+
+
+@dataclass
+class ExecutionOutcome:
+    """Final status of one workflow execution tracked by `ExecutionTracker`."""
+
+    name: str
+    state: str
+    result: Optional[str] = None
+    error: Optional[str] = None
+    polls: int = 0
+    seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.state == "SUCCEEDED"
+
+
+def _state_name(state) -> str:
+    """Return the name of an execution state enum value."""
+    return getattr(state, "name", str(state))
+
+
+class ExecutionTracker:
+    """Submit and follow many workflow executions over one shared client.
+
+    Each execution is polled on its own schedule: the first poll happens
+    after `initial_interval` seconds and every following interval is
+    multiplied by `backoff` up to `max_interval`, with a little random jitter
+    so executions started together do not poll in lockstep.  At most
+    `max_concurrency` executions are submitted and tracked at once.
+
+    A poll that fails with one of `TRANSIENT_ERRORS` is retried on the next
+    interval; tracking gives up only after `max_poll_failures` consecutive
+    failures or on any other error, such as `NotFound`.
+
+    Args:
+        client: An `ExecutionsAsyncClient` or compatible object (for example
+            `fakes.FakeExecutionsClient`).  A real client is created on first
+            use when omitted.
+        max_concurrency: Maximum number of executions in flight.
+        initial_interval: Seconds before the first status poll.
+        max_interval: Upper bound for the poll interval.
+        backoff: Factor applied to the interval after every poll.
+        jitter: Fraction of the interval added or removed at random.
+        max_poll_failures: Consecutive transient poll errors tolerated.
+
+    Raises:
+        ValueError: If `max_concurrency` is less than 1.
     """
-    client = executions_v1.ExecutionsClient()
-    parent = client.workflow_path(project_id, region, workflow_name)
-
-    execution = Execution(argument=json.dumps(execution_args))
-
-    try:
-        response = client.create_execution(parent=parent, execution=execution)
-        print(f"Created execution: {response.name}")
-
-        # Wait for the execution to complete.
-        while response.state not in (
-            Execution.State.SUCCEEDED,
-            Execution.State.FAILED,
-            Execution.State.CANCELLED,
-        ):
-            time.sleep(poll_interval_seconds)
-            try:
-                response = client.get_execution(name=response.name)
-                print(f"Execution state: {Execution.State(response.state).name}")
-            except exceptions.NotFound:
-                # The execution might have been deleted if it completed very quickly.
-                # This is unlikely for a long-running workflow but handled for robustness.
-                print(f"Execution {response.name} not found. It may have completed and been deleted.")
-                break
-
-        if response.state == Execution.State.SUCCEEDED:
-            print(f"Execution {response.name} succeeded.")
-            return response.result
-        else:
-            error_message = f"Execution {response.name} did not succeed. Final state: {Execution.State(response.state).name}"
-            if response.error:
-                error_message += f"\nError payload: {response.error.payload}"
-            print(error_message, file=sys.stderr)
-            raise RuntimeError(error_message)
-
-    except exceptions.GoogleAPICallError as e:
-        print(f"An API error occurred while executing the workflow: {e}", file=sys.stderr)
-        raise
+
+    def __init__(
+        self,
+        client=None,
+        max_concurrency: int = 10,
+        initial_interval: float = 1.0,
+        max_interval: float = 30.0,
+        backoff: float = 2.0,
+        jitter: float = 0.1,
+        max_poll_failures: int = 5,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._client = client
+        self.max_concurrency = max_concurrency
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.max_poll_failures = max_poll_failures
+        self.api_calls = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = executions_v1.ExecutionsAsyncClient()
+        return self._client
+
+    def _intervals(self):
+        """Yield the successive poll intervals for one execution."""
+        interval = self.initial_interval
+        while True:
+            spread = interval * self.jitter
+            yield max(0.0, interval + random.uniform(-spread, spread))
+            interval = min(interval * self.backoff, self.max_interval)
+
+    async def track(self, parent: str, execution_args: dict) -> ExecutionOutcome:
+        """Create one execution under `parent` and wait for it to finish.
+
+        API errors are recorded on the returned outcome instead of being
+        raised, so one failure does not cancel the other executions.
+        """
+        start = time.monotonic()
+        name = ""
+        polls = 0
+        try:
+            self.api_calls += 1
+            response = await self.client.create_execution(
+                parent=parent, execution={"argument": json.dumps(execution_args)}
+            )
+            name = response.name
+            print(f"Created execution: {name}")
+            intervals = self._intervals()
+            failures = 0
+            while _state_name(response.state) not in TERMINAL_STATES:
+                await asyncio.sleep(next(intervals))
+                self.api_calls += 1
+                polls += 1
+                try:
+                    response = await self.client.get_execution(name=name)
+                except TRANSIENT_ERRORS as e:
+                    failures += 1
+                    if failures >= self.max_poll_failures:
+                        raise
+                    print(f"Polling {name} failed ({type(e).__name__}: {e}); retrying")
+                    continue
+                failures = 0
+        except Exception as e:  # noqa: BLE001 - reported per execution
+            return ExecutionOutcome(
+                name=name,
+                state="ERROR",
+                error=f"{type(e).__name__}: {e}",
+                polls=polls,
+                seconds=time.monotonic() - start,
+            )
+
+        state = _state_name(response.state)
+        error = None
+        if state != "SUCCEEDED" and getattr(response, "error", None):
+            error = response.error.payload
+        print(f"Execution {name} finished: {state}")
+        return ExecutionOutcome(
+            name=name,
+            state=state,
+            result=response.result if state == "SUCCEEDED" else None,
+            error=error,
+            polls=polls,
+            seconds=time.monotonic() - start,
+        )
+
+    async def track_many(
+        self,
+        project_id: str,
+        region: str,
+        workflow_name: str,
+        arguments: Iterable[dict],
+    ) -> List[ExecutionOutcome]:
+        """Run one execution per argument dict and wait for all of them.
+
+        Returns:
+            One `ExecutionOutcome` per argument dict, in the same order.
+        """
+        parent = self.client.workflow_path(project_id, region, workflow_name)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def limited(execution_args: dict) -> ExecutionOutcome:
+            async with semaphore:
+                return await self.track(parent, execution_args)
+
+        return list(await asyncio.gather(*(limited(a) for a in arguments)))
+
+
+def execute_workflows(
+    project_id: str,
+    region: str,
+    workflow_name: str,
+    arguments: Iterable[dict],
+    **tracker_options,
+) -> List[ExecutionOutcome]:
+    """Synchronous wrapper that tracks many executions with `ExecutionTracker`.
+
+    Args:
+        project_id: The Google Cloud project ID.
+        region: The region where the workflow is deployed.
+        workflow_name: The name of the workflow to execute.
+        arguments: One dictionary of workflow arguments per execution.
+        **tracker_options: Passed through to `ExecutionTracker`.
+
+    Returns:
+        One `ExecutionOutcome` per execution, in the order of `arguments`.
+    """
+    tracker = ExecutionTracker(**tracker_options)
+    return asyncio.run(tracker.track_many(project_id, region, workflow_name, arguments))
 
 
 def main():
@@ -80,7 +253,11 @@ def main():
         description="Orchestrate the longform news video generation workflow."
     )
     parser.add_argument(
-        "--topic", type=str, required=True, help="The topic for the news video."
+        "--topic",
+        type=str,
+        nargs="+",
+        required=True,
+        help="The topic for the news video.  Several topics run as concurrent executions.",
     )
     parser.add_argument(
         "--env",
@@ -88,8 +265,16 @@ def main():
         default="dev",
         help="The environment to run in (e.g., dev, prod).",
     )
+    parser.add_argument(
+        "--max_concurrency",
+        type=int,
+        default=10,
+        help="Maximum number of executions tracked at once.",
+    )
 
     args = parser.parse_args()
+    if args.max_concurrency < 1:
+        parser.error("--max_concurrency must be at least 1")
 
     # --- Configuration ---
     # It's recommended to manage these configurations via environment variables.
@@ -114,22 +299,28 @@ def main():
         sys.exit(1)
 
     # --- Prepare workflow arguments ---
-    workflow_args = {
-        "env": args.env,
-        "topic": args.topic,
-        **required_urls,
-    }
+    all_workflow_args = [
+        {"env": args.env, "topic": topic, **required_urls} for topic in args.topic
+    ]
 
-    # --- Execute Workflow ---
-    try:
-        result = execute_workflow(project_id, region, workflow_name, workflow_args)
-        print("\nWorkflow finished successfully.")
-        print("Result:")
-        print(json.loads(result))
-    except (RuntimeError, exceptions.GoogleAPICallError) as e:
-        print(f"\nWorkflow execution failed.", file=sys.stderr)
+    # --- Execute Workflows ---
+    outcomes = execute_workflows(
+        project_id,
+        region,
+        workflow_name,
+        all_workflow_args,
+        max_concurrency=args.max_concurrency,
+    )
+    for topic, outcome in zip(args.topic, outcomes):
+        print(f"{topic}: {outcome.state} after {outcome.seconds:.1f} s ({outcome.polls} polls)")
+        if outcome.succeeded:
+            print(f"  Result: {json.loads(outcome.result)}")
+        elif outcome.error:
+            print(f"  Error: {outcome.error}", file=sys.stderr)
+    if not all(outcome.succeeded for outcome in outcomes):
+        print("\nWorkflow execution failed.", file=sys.stderr)
         sys.exit(1)
-
+    print("\nWorkflow finished successfully.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""Per-run manifest for incremental pipeline re-runs.
+
+`RunManifest` records, for every stage of a run, a hash of the stage's
+inputs, the version of the stage's code and the response it produced along
+with content hashes of the files that response points to.  The manifest is
+stored next to the run's other outputs as `outputs/<run_id>_manifest.json`.
+
+When a run is repeated with the same `run_id`, `lookup` returns the recorded
+response for any stage whose request body, input file contents and code are
+unchanged and whose output files still exist with the recorded contents.
+That stage can then be skipped.
+
+The input hash covers the canonical JSON of the request body plus the
+content hash of every existing file named in it, so a stage re-runs when an
+upstream stage rewrites its output with different contents.  The frames
+listed in a media manifest (see `functions/common/media_manifest.py`) count
+as named by whatever names the manifest.  The code
+version is a hash of every `.py` file in the handler's directory and in the
+shared `functions/common` package every handler imports.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from functions.common.media_manifest import is_media_manifest, iter_media_manifest
+
+_CHUNK_BYTES = 1024 * 1024
+COMMON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "functions", "common")
+
+
+def file_hash(path: str) -> str:
+    """Return the SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_paths(value: Any) -> Iterator[str]:
+    """Yield every string in `value` that names an existing file.
+
+    A media manifest yields its own path and then those of its frames.
+    """
+    if isinstance(value, str):
+        if os.path.isfile(value):
+            yield value
+            if is_media_manifest(value):
+                yield from (path for path in iter_media_manifest(value) if os.path.isfile(path))
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _file_paths(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from _file_paths(v)
+
+
+def code_version(handler) -> str:
+    """Hash the source files of the package that defines `handler`.
+
+    The shared `functions/common` package is included, since a change there
+    can alter any stage's output.
+    """
+    module = sys.modules[handler.__module__]
+    directory = os.path.dirname(os.path.abspath(module.__file__))
+    digest = hashlib.sha256()
+    for root in (directory, COMMON_DIR):
+        if not os.path.isdir(root):
+            continue
+        for name in sorted(os.listdir(root)):
+            if name.endswith(".py"):
+                digest.update(os.path.join(os.path.basename(root), name).encode("utf-8"))
+                digest.update(file_hash(os.path.join(root, name)).encode("ascii"))
+    return digest.hexdigest()
+
+
+def input_hash(body: Dict[str, Any]) -> str:
+    """Hash a request body together with the contents of the files it names."""
+    digest = hashlib.sha256(json.dumps(body, sort_keys=True, default=repr).encode("utf-8"))
+    for path in sorted(set(_file_paths(body))):
+        digest.update(path.encode("utf-8"))
+        digest.update(file_hash(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+class RunManifest:
+    """Stage records for one run, persisted as JSON.
+
+    Args:
+        run_id: Identifier of the run.
+        output_dir: Directory holding the run's outputs and manifest.
+    """
+
+    def __init__(self, run_id: str, output_dir: str = "outputs") -> None:
+        self.run_id = run_id
+        self.path = os.path.join(output_dir, f"{run_id}_manifest.json")
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.stages = json.load(f).get("stages", {})
+
+    def lookup(self, stage: str, body: Dict[str, Any], version: str) -> Optional[Dict[str, Any]]:
+        """Return the recorded response if `stage` can be skipped.
+
+        Args:
+            stage: Stage name.
+            body: Request body the stage would be called with.
+            version: Current code version of the stage's handler.
+
+        Returns:
+            The recorded response, or `None` if the stage has to run.
+        """
+        record = self.stages.get(stage)
+        if not record or record["code_version"] != version:
+            return None
+        if record["input_hash"] != input_hash(body):
+            return None
+        for path, digest in record["output_hashes"].items():
+            if not os.path.isfile(path) or file_hash(path) != digest:
+                return None
+        return record["response"]
+
+    def record(self, stage: str, body: Dict[str, Any], version: str, response: Dict[str, Any]) -> None:
+        """Store a stage's inputs and outputs and save the manifest."""
+        self.stages[stage] = {
+            "input_hash": input_hash(body),
+            "code_version": version,
+            "response": response,
+            "output_hashes": {path: file_hash(path) for path in sorted(set(_file_paths(response)))},
+            "completed_at": time.time(),
+        }
+        self.save()
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"run_id": self.run_id, "stages": self.stages}, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -10,11 +10,26 @@ Usage:
 ```bash
 python3 test_pipeline.py --topic "community empowerment" --run_id "demo"
 ```
+
+Pass `--handoff memory` to hand rendered frames from media sourcing to
+video assembly as in-memory arrays instead of PNG files, `--handoff store`
+to pass them in a single memory-mapped frame store file, or `--handoff
+manifest` to pass the PNG files through a compact media manifest instead
+of an inline `media_uris` list.  Per-stage timings are printed at the end
+of every run so the modes can be compared.
+
+Each run records its stages' inputs and outputs in
+`outputs/<run_id>_manifest.json`.  Re-running with the same `--run_id` skips
+every stage whose inputs and code are unchanged and reuses its outputs; pass
+`--force` to run every stage again.
 """
 
 import argparse
 import json
 import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
 
 # Import the micro‑service handlers
 from functions.scriptwriter.main import handle as scriptwriter_handle
@@ -22,6 +37,7 @@ from functions.media_sourcing.main import handle as media_sourcing_handle
 from functions.narrator.main import handle as narrator_handle
 from functions.video_assembly.main import handle as video_assembly_handle
 from functions.uploader.main import handle as uploader_handle
+from run_manifest import RunManifest, code_version
 
 
 class DummyRequest:
@@ -46,57 +62,180 @@ def _parse_response(response):
     return response
 
 
-def main(topic: str, run_id: str) -> None:
+@contextmanager
+def _stage_timer(timings: Dict[str, float], stage: str):
+    """Record the wall-clock time spent in a pipeline stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = time.perf_counter() - start
+
+
+def _run_stage(
+    stage: str,
+    handler,
+    body: dict,
+    manifest: Optional[RunManifest],
+    statuses: Dict[str, str],
+) -> dict:
+    """Call a handler, or reuse its recorded response if nothing changed.
+
+    Args:
+        stage: Stage name used in the manifest and report.
+        handler: The stage's `handle` function.
+        body: JSON body to send to the handler.
+        manifest: Run manifest, or `None` to always run the stage.
+        statuses: Receives `"ran"` or `"skipped"` for the stage.
+    """
+    version = code_version(handler) if manifest is not None else ""
+    if manifest is not None:
+        recorded = manifest.lookup(stage, body, version)
+        if recorded is not None:
+            statuses[stage] = "skipped"
+            return recorded
+    data = _parse_response(handler(DummyRequest(body)))
+    statuses[stage] = "ran"
+    if manifest is not None and "error" not in data:
+        manifest.record(stage, body, version, data)
+    return data
+
+
+def main(
+    topic: str,
+    run_id: str,
+    handoff: str = "files",
+    incremental: bool = True,
+) -> Dict[str, float]:
+    """Run every stage of the pipeline in sequence.
+
+    Args:
+        topic: Topic for the news script.
+        run_id: Unique identifier for this run.
+        handoff: `"files"` to pass frames through PNG files on disk,
+            `"memory"` to pass them to video assembly as in-memory arrays,
+            `"store"` to pass them in one frame store file, or
+            `"manifest"` to pass the PNG files through a media manifest.
+        incremental: Reuse the outputs of stages whose inputs and code are
+            unchanged since the last run with this `run_id`.
+
+    Returns:
+        Wall-clock seconds spent in each stage, plus the `total`.
+    """
+    timings: Dict[str, float] = {}
+    statuses: Dict[str, str] = {}
+    manifest = RunManifest(run_id) if incremental else None
+    # In-memory frames cannot be recorded, so those stages always run.
+    file_manifest = manifest if handoff != "memory" else None
+    pipeline_start = time.perf_counter()
+
     # Step 1: Scriptwriter
-    script_request = DummyRequest({"topic": topic, "bucket": "local", "run_id": run_id})
-    script_response = scriptwriter_handle(script_request)
-    script_data = _parse_response(script_response)
+    with _stage_timer(timings, "scriptwriter"):
+        script_data = _run_stage(
+            "scriptwriter",
+            scriptwriter_handle,
+            {"topic": topic, "bucket": "local", "run_id": run_id},
+            manifest,
+            statuses,
+        )
     script_uri = script_data["script_uri"]
-    print(f"Script generated at: {script_uri}")
+    script_index = script_data["script_index"]
+    print(f"Script generated at: {script_uri} ({len(script_index['sentences'])} sentences)")
 
     # Step 2: Media sourcing
-    media_request = DummyRequest({"script": script_uri, "gcs_bucket": "local"})
-    media_response = media_sourcing_handle(media_request)
-    media_data = _parse_response(media_response)
+    with _stage_timer(timings, "media_sourcing"):
+        media_body = {"script_index": script_index, "gcs_bucket": "local"}
+        if handoff == "manifest":
+            media_body["media_manifest"] = True
+        elif handoff != "files":
+            media_body["output"] = handoff
+        media_data = _run_stage("media_sourcing", media_sourcing_handle, media_body, file_manifest, statuses)
     media_uris = media_data.get("media_uris", [])
-    print(f"Generated {len(media_uris)} media files: {media_uris}")
+    if handoff == "memory":
+        # Frames are rendered lazily while video assembly consumes them, so
+        # rendering time is counted under the video assembly stage.
+        print(f"Handing {media_data.get('frame_count', 0)} frames to video assembly in memory")
+    elif handoff == "store":
+        print(f"Stored {media_data.get('frame_count', 0)} frames in {media_data.get('frame_store_uri')}")
+    elif handoff == "manifest":
+        print(f"Listed {media_data.get('frame_count', 0)} media files in {media_data.get('media_manifest_uri')}")
+    else:
+        print(f"Generated {len(media_uris)} media files: {media_uris}")
 
     # Step 3: Narration
-    narrator_request = DummyRequest({"script_content": script_uri, "gcs_bucket": "local", "run_id": run_id})
-    narrator_response = narrator_handle(narrator_request)
-    narrator_data = _parse_response(narrator_response)
+    with _stage_timer(timings, "narrator"):
+        narrator_data = _run_stage(
+            "narrator",
+            narrator_handle,
+            {"script_index": script_index, "gcs_bucket": "local", "run_id": run_id},
+            manifest,
+            statuses,
+        )
     audio_uri = narrator_data["audio_uri"]
     print(f"Narration audio generated at: {audio_uri}")
 
     # Step 4: Video assembly
-    assembly_request = DummyRequest({
-        "media_uris": media_uris,
-        "narration_uri": audio_uri,
-        "gcs_bucket": "local",
-        "project_id": "local",
-        "region": "local",
-    })
-    assembly_response = video_assembly_handle(assembly_request)
-    assembly_data = _parse_response(assembly_response)
+    with _stage_timer(timings, "video_assembly"):
+        assembly_body = {
+            "media_uris": media_uris,
+            "narration_uri": audio_uri,
+            "sentence_timings": narrator_data.get("sentence_timings"),
+            "gcs_bucket": "local",
+            "project_id": "local",
+            "region": "local",
+        }
+        if handoff == "memory":
+            assembly_body["frames"] = media_data.get("frames", [])
+            assembly_body["frame_count"] = media_data.get("frame_count")
+            assembly_body["run_id"] = run_id
+        elif handoff == "store":
+            assembly_body["frame_store_uri"] = media_data.get("frame_store_uri")
+        elif handoff == "manifest":
+            assembly_body["media_manifest_uri"] = media_data.get("media_manifest_uri")
+        assembly_data = _run_stage("video_assembly", video_assembly_handle, assembly_body, file_manifest, statuses)
     final_uri = assembly_data["output_uri"]
     print(f"Video assembled at: {final_uri}")
 
     # Step 5: Upload
-    uploader_request = DummyRequest({
-        "final_uri": final_uri,
-        "script_content": script_uri,
-        "run_id": run_id,
-    })
-    uploader_response = uploader_handle(uploader_request)
-    uploader_data = _parse_response(uploader_response)
+    with _stage_timer(timings, "uploader"):
+        uploader_data = _run_stage(
+            "uploader",
+            uploader_handle,
+            {"final_uri": final_uri, "script_index": script_index, "run_id": run_id},
+            manifest,
+            statuses,
+        )
     print(f"Upload response: {uploader_data}")
 
+    timings["total"] = time.perf_counter() - pipeline_start
+    print(f"Stage timings ({handoff} handoff):")
+    for stage, seconds in timings.items():
+        print(f"  {stage:<15} {seconds:8.3f} s  {statuses.get(stage, '')}")
+    skipped = [stage for stage, status in statuses.items() if status == "skipped"]
+    if skipped:
+        print(f"Reused unchanged outputs for: {', '.join(skipped)}")
+
     print("Pipeline completed successfully.")
+    return timings
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the black news pipeline locally.")
     parser.add_argument("--topic", required=True, help="Topic for the news script")
     parser.add_argument("--run_id", default="test", help="Unique identifier for this run")
+    parser.add_argument(
+        "--handoff",
+        choices=("files", "memory", "store", "manifest"),
+        default="files",
+        help=(
+            "Pass frames to video assembly as PNG files (default), in-memory arrays, a frame store "
+            "or PNG files listed in a media manifest"
+        ),
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run every stage even if its recorded outputs are still valid",
+    )
     args = parser.parse_args()
-    main(args.topic, args.run_id)
\ No newline at end of file
+    main(args.topic, args.run_id, args.handoff, incremental=not args.force)
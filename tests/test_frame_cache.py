@@ -0,0 +1,71 @@
+"""Tests for `functions.media_sourcing.frame_cache`."""
+
+import io
+import os
+import time
+
+import pytest
+
+from functions.media_sourcing import frame_cache
+from functions.media_sourcing.frame_cache import FrameCache, LOW_WATER
+
+FONT = ("ImageFont", "0" * 64)
+
+
+def _frame(tmp_path, name: str, size: int = 1000) -> str:
+    path = tmp_path / "src" / f"{name}.png"
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def _key(text: str) -> str:
+    return FrameCache.key(text, (64, 36), FONT, (255, 255, 255), (0, 0, 0))
+
+
+def test_key_depends_on_every_input():
+    base = _key("hello")
+    assert _key("hello") == base
+    assert _key("hello!") != base
+    assert FrameCache.key("hello", (64, 36), FONT + ("atlas",), (255, 255, 255), (0, 0, 0)) != base
+
+
+def test_key_rejects_font_identities_that_are_not_serialisable():
+    with pytest.raises(TypeError):
+        FrameCache.key("hello", (64, 36), ("FreeTypeFont", io.BytesIO(), 20), (255, 255, 255), (0, 0, 0))
+
+
+def test_fetch_reports_hits_and_misses(tmp_path):
+    cache = FrameCache(str(tmp_path / "cache"))
+    dest = str(tmp_path / "out" / "frame.png")
+    assert not cache.fetch(_key("a"), dest)
+    src = _frame(tmp_path, "a")
+    cache.store(_key("a"), src)
+    assert cache.fetch(_key("a"), dest)
+    with open(src, "rb") as f, open(dest, "rb") as g:
+        assert f.read() == g.read()
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_eviction_shrinks_to_low_water_oldest_first(tmp_path):
+    cache = FrameCache(str(tmp_path / "cache"), max_bytes=10_000)
+    keys = [_key(str(i)) for i in range(11)]
+    for i, key in enumerate(keys[:10]):
+        cache.store(key, _frame(tmp_path, str(i)))
+        stamp = time.time() - 100 + i
+        os.utime(cache.path_for(key), (stamp, stamp))
+    assert cache.stats()["bytes"] == 10_000 and cache.evictions == 0
+
+    cache.store(keys[10], _frame(tmp_path, "10"))
+    assert cache.stats()["bytes"] <= 10_000 * LOW_WATER
+    assert cache.evictions == 2
+    assert not os.path.exists(cache.path_for(keys[0]))
+    assert not os.path.exists(cache.path_for(keys[1]))
+    assert os.path.exists(cache.path_for(keys[10]))
+
+
+def test_size_is_shared_by_caches_on_the_same_root(tmp_path):
+    root = str(tmp_path / "cache")
+    FrameCache(root).store(_key("a"), _frame(tmp_path, "a", 500))
+    assert FrameCache(root).stats()["bytes"] == 500
+    assert frame_cache.open_cache(None) is None
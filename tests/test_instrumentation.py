@@ -0,0 +1,36 @@
+"""Tests for `functions.common.instrumentation.Metrics`."""
+
+import threading
+import tracemalloc
+
+from functions.common.instrumentation import Metrics
+
+
+def test_worker_thread_spans_do_not_break_nesting():
+    metrics = Metrics("test", sink="")
+    metrics.configure({"trace_memory": True})
+    inside = threading.Event()
+    release = threading.Event()
+
+    def worker():
+        with metrics.span("worker"):
+            inside.set()
+            release.wait(5)
+
+    with metrics.span("outer"):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        inside.wait(5)
+        with metrics.span("inner"):
+            data = bytearray(1_000_000)
+        del data
+        release.set()
+        thread.join()
+
+    phases = metrics.report()["phases"]
+    metrics.finish({})
+    assert phases["outer"]["tracemalloc_peak_bytes"] >= 1_000_000
+    assert "tracemalloc_peak_bytes" not in phases["inner"]
+    assert "tracemalloc_peak_bytes" not in phases["worker"]
+    assert phases["worker"]["count"] == 1
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,86 @@
+"""Tests for the lease, retry and fencing behaviour of `job_queue.JobQueue`."""
+
+import time
+
+import pytest
+
+from job_queue import JobQueue, QueueFull
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.sqlite"), max_attempts=2, retry_backoff=0.0)
+    yield q
+    q.close()
+
+
+def _run_state(queue, run_id):
+    return queue._conn().execute("SELECT state FROM runs WHERE run_id = ?", (run_id,)).fetchone()["state"]
+
+
+def test_expired_lease_is_retried_then_fails_the_run(queue):
+    run_id = queue.submit("topic")
+    first = queue.claim("w1", visibility_timeout=0.01)
+    assert first.attempt == 1
+    time.sleep(0.02)
+
+    second = queue.claim("w2", visibility_timeout=0.01)
+    assert (second.id, second.attempt) == (first.id, 2)
+    time.sleep(0.02)
+
+    assert queue.claim("w3") is None
+    assert _run_state(queue, run_id) == "failed"
+    assert queue.idle()
+
+
+def test_stale_worker_cannot_complete_after_takeover(queue):
+    queue.submit("topic")
+    stale = queue.claim("w1", visibility_timeout=0.01)
+    time.sleep(0.02)
+    current = queue.claim("w2")
+
+    assert not queue.extend(stale)
+    assert not queue.complete(stale, {"script_uri": "stale"})
+    assert not queue.fail(stale, "stale failure")
+    assert queue.complete(current, {"script_uri": "outputs/s.txt"})
+    stages = {job.stage for job in iter(lambda: queue.claim("w3"), None)}
+    assert stages == {"media_sourcing", "narrator"}
+
+
+def test_failed_attempts_are_retried_up_to_max_attempts(queue):
+    run_id = queue.submit("topic")
+    assert queue.fail(queue.claim("w1"), "boom")
+    assert _run_state(queue, run_id) == "pending"
+    assert queue.fail(queue.claim("w1"), "boom again")
+    assert _run_state(queue, run_id) == "failed"
+    assert queue.claim("w1") is None
+
+
+def test_release_does_not_count_an_attempt(queue):
+    queue.submit("topic")
+    job = queue.claim("w1")
+    queue.release(job)
+    assert queue.claim("w1").attempt == 1
+
+
+def test_claims_follow_priority_then_submission_order(queue):
+    low = queue.submit("low")
+    high = queue.submit("high", priority=5)
+    later = queue.submit("later")
+    assert [queue.claim("w").run_id for _ in range(3)] == [high, low, later]
+
+
+def test_stage_limit_caps_running_jobs(queue):
+    queue.set_limit("scriptwriter", 1)
+    queue.submit("a")
+    queue.submit("b")
+    assert queue.claim("w1") is not None
+    assert queue.claim("w2") is None
+
+
+def test_submit_applies_backpressure(queue):
+    queue.submit("a", max_pending=1)
+    with pytest.raises(QueueFull):
+        queue.submit("b", max_pending=1)
+    with pytest.raises(ValueError):
+        queue.submit("c", run_id=queue.submit("d", max_pending=None), max_pending=None)
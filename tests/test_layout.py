@@ -0,0 +1,35 @@
+"""Tests for `functions.media_sourcing.layout.font_key`."""
+
+import glob
+import io
+import json
+
+import pytest
+
+PIL = pytest.importorskip("PIL")
+from PIL import ImageFont  # noqa: E402
+
+from functions.media_sourcing.layout import font_key  # noqa: E402
+
+_TTF = sorted(glob.glob("/usr/share/fonts/**/*.ttf", recursive=True))
+
+
+def test_default_font_key_is_serialisable_and_stable():
+    key = font_key(ImageFont.load_default())
+    assert json.loads(json.dumps(key)) == list(key)
+    assert font_key(ImageFont.load_default()) == key
+
+
+@pytest.mark.skipif(not _TTF, reason="no TrueType font installed")
+def test_file_fonts_are_keyed_by_path_and_size():
+    assert font_key(ImageFont.truetype(_TTF[0], 20)) == ("FreeTypeFont", _TTF[0], 20)
+
+
+@pytest.mark.skipif(not _TTF, reason="no TrueType font installed")
+def test_file_object_fonts_are_keyed_by_glyphs():
+    with open(_TTF[0], "rb") as f:
+        data = f.read()
+    key = font_key(ImageFont.truetype(io.BytesIO(data), 20))
+    assert all(isinstance(part, str) for part in key)
+    assert font_key(ImageFont.truetype(io.BytesIO(data), 20)) == key
+    assert font_key(ImageFont.truetype(io.BytesIO(data), 24)) != key
@@ -0,0 +1,76 @@
+"""Tests for the in-memory frame handoff between media sourcing and video assembly."""
+
+import concurrent.futures
+import os
+
+import pytest
+
+pytest.importorskip("PIL")
+np = pytest.importorskip("numpy")
+
+from functions.common.script_index import ScriptIndex  # noqa: E402
+from functions.media_sourcing import main as media_sourcing  # noqa: E402
+
+SENTENCES = [f"Sentence number {i} of the script." for i in range(40)]
+
+
+def _request(**options):
+    index = ScriptIndex.from_text(" ".join(SENTENCES), script_uri="outputs/t_script.txt")
+    return {"script_index": index.to_dict(), "output": "memory", **options}
+
+
+def test_memory_frames_match_in_order_for_any_worker_count():
+    serial = media_sourcing.handle(_request())
+    assert serial["frame_count"] == len(SENTENCES)
+    expected = list(serial["frames"])
+    assert len(expected) == len(SENTENCES)
+    assert expected[0].shape == (media_sourcing.FRAME_SIZE[1], media_sourcing.FRAME_SIZE[0], 3)
+
+    pooled = media_sourcing.handle(_request(workers=2))
+    frames = list(pooled["frames"])
+    assert all(np.array_equal(a, b) for a, b in zip(expected, frames))
+    assert not np.array_equal(expected[0], expected[1])
+
+
+def test_render_pool_keeps_a_bounded_window(monkeypatch):
+    submitted = []
+
+    class CountingPool(concurrent.futures.ThreadPoolExecutor):
+        def submit(self, fn, *args, **kwargs):
+            submitted.append(args)
+            return super().submit(fn, *args, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", CountingPool)
+    workers = 2
+    jobs = [(text, None) for text in SENTENCES * 5]
+    frames = media_sourcing._iter_rendered(jobs, workers)
+    next(frames)
+    assert len(submitted) <= workers * media_sourcing.CHUNKS_IN_FLIGHT + 1
+    assert 1 + sum(1 for _ in frames) == len(jobs)
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"output": "disk"}, "Invalid output mode"),
+        ({"workers": "many"}, "Invalid workers value"),
+        ({"rasteriser": "gpu"}, "Invalid rasteriser"),
+    ],
+)
+def test_invalid_options_are_reported(options, error):
+    assert media_sourcing.handle(_request(**options)) == {"error": error}
+
+
+def test_video_assembly_encodes_in_memory_frames(tmp_path, monkeypatch):
+    pytest.importorskip("cv2")
+    from functions.video_assembly import main as video_assembly
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("outputs")
+    response = media_sourcing.handle(_request())
+    result = video_assembly.handle(
+        {"run_id": "t", "frames": response["frames"], "frame_durations": [0.1] * response["frame_count"]}
+    )
+    assert "error" not in result
+    assert os.path.getsize(result["output_uri"]) > 0
+    assert result["duration_sec"] == pytest.approx(0.1 * len(SENTENCES), abs=0.1)
@@ -0,0 +1,57 @@
+"""Tests for `orchestrator.ExecutionTracker` against `fakes.FakeExecutionsClient`."""
+
+import asyncio
+
+import pytest
+
+from fakes import FakeExecutionsClient
+from orchestrator import ExecutionTracker
+
+
+def _track(tracker, arguments):
+    return asyncio.run(tracker.track_many("p", "r", "wf", arguments))
+
+
+def _tracker(client, **options):
+    return ExecutionTracker(client=client, initial_interval=0.01, max_interval=0.01, jitter=0, **options)
+
+
+def test_transient_poll_error_is_retried():
+    client = FakeExecutionsClient(duration=lambda args: 0.03, fail_polls=[1])
+    [outcome] = _track(_tracker(client), [{"topic": "a"}])
+    assert outcome.state == "SUCCEEDED"
+    assert client.get_calls > 1
+
+
+def test_gives_up_after_max_poll_failures():
+    client = FakeExecutionsClient(duration=lambda args: 10.0, fail_polls=range(1, 100))
+    [outcome] = _track(_tracker(client, max_poll_failures=3), [{"topic": "a"}])
+    assert outcome.state == "ERROR"
+    assert client.get_calls == 3
+
+
+def test_other_poll_errors_end_tracking():
+    class Missing(FakeExecutionsClient):
+        async def get_execution(self, name):
+            self.get_calls += 1
+            raise KeyError(name)
+
+    client = Missing(duration=lambda args: 10.0)
+    [outcome] = _track(_tracker(client), [{"topic": "a"}])
+    assert outcome.state == "ERROR"
+    assert client.get_calls == 1
+
+
+def test_outcomes_keep_argument_order_and_states():
+    client = FakeExecutionsClient(
+        duration=lambda args: args["d"], outcome=lambda args: "FAILED" if args["topic"] == "b" else "SUCCEEDED"
+    )
+    arguments = [{"topic": "a", "d": 0.05}, {"topic": "b", "d": 0.01}, {"topic": "c", "d": 0.02}]
+    outcomes = _track(_tracker(client, max_concurrency=2), arguments)
+    assert [o.state for o in outcomes] == ["SUCCEEDED", "FAILED", "SUCCEEDED"]
+    assert outcomes[1].error
+
+
+def test_max_concurrency_must_be_positive():
+    with pytest.raises(ValueError):
+        ExecutionTracker(client=FakeExecutionsClient(), max_concurrency=0)
@@ -0,0 +1,76 @@
+"""Tests for `functions.common.script_index`."""
+
+import json
+
+import pytest
+
+from functions.common.script_index import ScriptIndex, load_script_index, segment_sentences
+
+
+def _sentences(text):
+    return [text[start:end] for start, end in segment_sentences(text)]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("One. Two! Three?", ["One.", "Two!", "Three?"]),
+        ('He said "stop." Then left.', ['He said "stop."', "Then left."]),
+        ("Dr. Smith met Mr. Jones. They talked.", ["Dr. Smith met Mr. Jones.", "They talked."]),
+        ("The N.A.A.C.P. met today. It voted.", ["The N.A.A.C.P. met today.", "It voted."]),
+        ("We chose plan B. The results came in.", ["We chose plan B.", "The results came in."]),
+        ("It rose 2.5 percent. Then fell.", ["It rose 2.5 percent.", "Then fell."]),
+        ("Wait... what happened? Nothing.", ["Wait... what happened?", "Nothing."]),
+        ("A heading\n\nBody text here.", ["A heading", "Body text here."]),
+        ("", []),
+        ("   \n\n  ", []),
+    ],
+)
+def test_segment_sentences(text, expected):
+    assert _sentences(text) == expected
+
+
+def test_wrapped_lines_are_collapsed_but_offsets_point_into_the_script():
+    text = "First line\n  wraps   here. Second."
+    index = ScriptIndex.from_text(text)
+    assert index.sentences == ["First line wraps here.", "Second."]
+    start, end = index.offsets[0]
+    assert text[start:end] == "First line\n  wraps   here."
+    assert index.words == [4, 1]
+
+
+def test_round_trip_through_the_compact_form():
+    index = ScriptIndex.from_text("One two three. Four.", words_per_minute=60, script_uri="outputs/s.txt")
+    loaded = ScriptIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+    assert loaded.to_dict() == index.to_dict()
+    assert len(loaded) == 2 and loaded.word_count == 4 and loaded.duration_sec == 4.0
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        None,
+        {"version": 99},
+        {"version": 1, "sentences": ["a"]},
+        {"version": 1, "sentences": ["a"], "offsets": [[0, 1]], "words": [1, 2], "durations": [0.4]},
+    ],
+)
+def test_malformed_indexes_are_rejected(data):
+    with pytest.raises(ValueError):
+        ScriptIndex.from_dict(data)
+
+
+def test_load_script_index_sources(tmp_path):
+    script = tmp_path / "script.txt"
+    script.write_text("One. Two.", encoding="utf-8")
+    stored = tmp_path / "index.json"
+    stored.write_text(json.dumps(ScriptIndex.from_text("Three.").to_dict()), encoding="utf-8")
+    broken = tmp_path / "broken.json"
+    broken.write_text("{", encoding="utf-8")
+
+    assert load_script_index(None, str(script)).sentences == ["One.", "Two."]
+    assert load_script_index(str(stored)).sentences == ["Three."]
+    assert load_script_index(str(tmp_path / "missing.json")) is None
+    assert load_script_index() is None
+    with pytest.raises(ValueError):
+        load_script_index(str(broken))
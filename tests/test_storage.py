@@ -0,0 +1,94 @@
+"""Tests for `functions.common.storage`."""
+
+import os
+
+import pytest
+
+from functions.common import storage
+from functions.common.storage import GCSBackend, LocalBackend, MemoryBackend, StorageBackend
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DOWNLOAD_ROOT", str(tmp_path / "downloads"))
+    monkeypatch.delenv(storage.BACKEND_ENV, raising=False)
+    yield
+    storage.reset_memory_objects()
+
+
+def test_backend_missing_a_method_cannot_be_created():
+    class Partial(StorageBackend):
+        def uri(self, key):
+            return key
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_memory_backend_round_trip(tmp_path):
+    backend = MemoryBackend("bucket")
+    src = tmp_path / "frame.png"
+    src.write_bytes(b"pixels")
+    uri = backend.put_file(str(src), "run_media/frame_1.png")
+    assert uri == "mem://bucket/run_media/frame_1.png"
+    assert backend.exists(uri)
+    assert MemoryBackend("bucket").get_bytes(uri) == b"pixels"
+    with open(storage.fetch(uri), "rb") as f:
+        assert f.read() == b"pixels"
+
+
+def test_memory_backend_missing_objects(tmp_path):
+    backend = MemoryBackend("bucket")
+    assert not backend.exists("mem://bucket/missing")
+    with pytest.raises(FileNotFoundError):
+        backend.get_bytes("mem://bucket/missing")
+    with pytest.raises(ValueError):
+        backend.get_bytes("mem://other/key")
+
+
+def test_local_backend_copies_only_outside_its_root(tmp_path):
+    backend = LocalBackend(str(tmp_path / "root"))
+    src = tmp_path / "a.txt"
+    src.write_text("a", encoding="utf-8")
+    uri = backend.put_file(str(src), "x/a.txt")
+    assert uri == os.path.join(str(tmp_path / "root"), "x", "a.txt") and backend.exists(uri)
+    assert backend.put_file(uri, "x/a.txt") == uri
+    assert backend.fetch(uri) == uri
+    assert backend.get_bytes(backend.put_bytes(b"b", "y/b.bin")) == b"b"
+
+
+def test_download_many_keeps_order_across_backends(tmp_path):
+    local = tmp_path / "local.txt"
+    local.write_text("local", encoding="utf-8")
+    memory = MemoryBackend("bucket")
+    uris = [memory.put_bytes(b"one", "1"), str(local), memory.put_bytes(b"two", "2")]
+    paths = storage.download_many(uris, workers=4)
+    contents = []
+    for path in paths:
+        with open(path, "rb") as f:
+            contents.append(f.read())
+    assert contents == [b"one", b"local", b"two"]
+
+
+@pytest.mark.parametrize(
+    "bucket, env, expected",
+    [
+        (None, None, LocalBackend),
+        ("local", None, LocalBackend),
+        ("mem://bucket", None, MemoryBackend),
+        ("my-bucket", None, GCSBackend),
+        ("my-bucket", "local", LocalBackend),
+        ("my-bucket", "memory", MemoryBackend),
+    ],
+)
+def test_get_backend_selection(monkeypatch, bucket, env, expected):
+    if env:
+        monkeypatch.setenv(storage.BACKEND_ENV, env)
+    assert isinstance(storage.get_backend(bucket), expected)
+
+
+@pytest.mark.parametrize("bucket, env", [("local", "gcs"), ("my-bucket", "ftp")])
+def test_get_backend_rejects_bad_configuration(monkeypatch, bucket, env):
+    monkeypatch.setenv(storage.BACKEND_ENV, env)
+    with pytest.raises(ValueError):
+        storage.get_backend(bucket)